@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark: per-node WorkflowEngine overhead with no-op nodes, long loops and wide parallel blocks."""
+
+import asyncio
+import time
+
+from loguru import logger
+from quantalogic_flow.flow import Nodes, Workflow
+
+CHAIN_LENGTH = 200
+CHAIN_RUNS = 20
+LOOP_ITERATIONS = 10_000
+PARALLEL_WIDTH = 200
+PARALLEL_RUNS = 10
+REPEATS = 5
+
+
+def register_chain() -> Workflow:
+    """A straight line of no-op nodes, each passing `value` on to the next."""
+
+    def passthrough(value):
+        return value
+
+    for i in range(CHAIN_LENGTH):
+        Nodes.define(name=f"chain_{i}", output="value")(passthrough)
+    return Workflow("chain_0").sequence(*(f"chain_{i}" for i in range(1, CHAIN_LENGTH)))
+
+
+def register_template_chain() -> Workflow:
+    """A straight line of template nodes rendering a one-variable template."""
+
+    def render(rendered_content, value):
+        return value
+
+    for i in range(CHAIN_LENGTH):
+        render.__name__ = f"template_{i}"
+        Nodes.template_node(output="value", template="{{ value }}")(render)
+    return Workflow("template_0").sequence(*(f"template_{i}" for i in range(1, CHAIN_LENGTH)))
+
+
+def register_loop() -> Workflow:
+    """One no-op node looping until a counter reaches LOOP_ITERATIONS."""
+
+    @Nodes.define(output="count")
+    def loop_start():
+        return 0
+
+    @Nodes.define(output="count")
+    def loop_step(count):
+        return count + 1
+
+    @Nodes.define(output="done")
+    def loop_done(count):
+        return count
+
+    return (
+        Workflow("loop_start")
+        .loop("loop_step")
+        .end_loop(lambda ctx: ctx["count"] >= LOOP_ITERATIONS, next_node="loop_done")
+    )
+
+
+def register_parallel() -> Workflow:
+    """A source node fanning out to PARALLEL_WIDTH no-op branches that converge."""
+    branches = []
+    for i in range(PARALLEL_WIDTH):
+
+        async def branch():
+            return 0
+
+        Nodes.define(name=f"branch_{i}", output=f"branch_{i}")(branch)
+        branches.append(f"branch_{i}")
+
+    @Nodes.define(output="fan_out")
+    def fan_out():
+        return 0
+
+    @Nodes.define(output="fan_in")
+    def fan_in():
+        return 0
+
+    return Workflow("fan_out").parallel(*branches).then("fan_in")
+
+
+async def measure(workflow: Workflow, runs: int, nodes_per_run: int) -> float:
+    """Engine overhead per executed node (µs), building a new engine per run; best of REPEATS."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(runs):
+            await workflow.build().run({"value": 0})
+        timings.append(time.perf_counter() - start)
+    return min(timings) / (runs * nodes_per_run) * 1e6
+
+
+async def tracing_observer(event):
+    """An async observer yielding to the event loop once per event, like a tracer exporting spans."""
+    await asyncio.sleep(0)
+
+
+def traced(workflow: Workflow) -> Workflow:
+    return workflow.add_observer(tracing_observer)
+
+
+async def run_benchmarks() -> list:
+    return [
+        (f"chain of {CHAIN_LENGTH} nodes", await measure(register_chain(), CHAIN_RUNS, CHAIN_LENGTH)),
+        (f"chain of {CHAIN_LENGTH}, async observer", await measure(traced(register_chain()), CHAIN_RUNS, CHAIN_LENGTH)),
+        (f"chain of {CHAIN_LENGTH} template nodes", await measure(register_template_chain(), CHAIN_RUNS, CHAIN_LENGTH)),
+        (f"loop of {LOOP_ITERATIONS:,} iterations", await measure(register_loop(), 1, LOOP_ITERATIONS + 2)),
+        (f"parallel block of {PARALLEL_WIDTH}", await measure(register_parallel(), PARALLEL_RUNS, PARALLEL_WIDTH + 2)),
+    ]
+
+
+def main():
+    logger.remove()
+    print("📊 Workflow engine overhead benchmark")
+    print("=" * 50)
+    for label, per_node in asyncio.run(run_benchmarks()):
+        print(f"{label:<36}: {per_node:>8.1f} µs/node")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark: EventEmitter creation cost and emit throughput with 0/1/10 listeners."""
+
+import threading
+import time
+
+from loguru import logger
+
+from quantalogic_react.quantalogic.event_emitter import EventEmitter
+
+EMITS = 100_000
+ASYNC_EMITS = 20_000
+EMITTERS = 1000
+
+
+def make_listeners(count: int, is_async: bool) -> list:
+    """Build distinct no-op listeners (the same callable is only registered once per event)."""
+    listeners = []
+    for _ in range(count):
+        if is_async:
+
+            async def listener(event, *args, **kwargs):
+                pass
+
+        else:
+
+            def listener(event, *args, **kwargs):
+                pass
+
+        listeners.append(listener)
+    return listeners
+
+
+def measure_creation() -> tuple[float, int]:
+    """Create many emitters, as a server creating agents per task does (µs per emitter, threads added)."""
+    threads_before = threading.active_count()
+    start = time.perf_counter()
+    emitters = [EventEmitter() for _ in range(EMITTERS)]
+    elapsed = (time.perf_counter() - start) / EMITTERS * 1e6
+    threads_added = threading.active_count() - threads_before
+    del emitters
+    return elapsed, threads_added
+
+
+def measure_emit(listener_count: int, is_async: bool, emits: int) -> float:
+    """Emit throughput (events/s), including completion of async listeners."""
+    emitter = EventEmitter()
+    for listener in make_listeners(listener_count, is_async):
+        emitter.on("chunk", listener)
+    start = time.perf_counter()
+    for _ in range(emits):
+        emitter.emit("chunk", "token")
+    emitter.close()
+    return emits / (time.perf_counter() - start)
+
+
+def main():
+    logger.remove()
+    print("📊 EventEmitter benchmark")
+    print("=" * 50)
+
+    creation, threads = measure_creation()
+    print(f"create {EMITTERS} emitters: {creation:>8.1f}µs each | {threads} threads added")
+
+    for count in (0, 1, 10):
+        rate = measure_emit(count, False, EMITS)
+        print(f"sync listeners  x{count:<3}: {rate:>12,.0f} emits/s")
+    for count in (1, 10):
+        rate = measure_emit(count, True, ASYNC_EMITS)
+        print(f"async listeners x{count:<3}: {rate:>12,.0f} emits/s")
+
+
+if __name__ == "__main__":
+    main()
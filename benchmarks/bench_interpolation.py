@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Benchmark: single-scan VariableMemory.interpolate vs. the per-variable regex loop."""
+
+import re
+import time
+
+from loguru import logger
+
+from quantalogic_react.quantalogic.memory import MAX_INTERPOLATION_DEPTH, VariableMemory
+
+VARIABLES = 1000
+ARGUMENT_SIZE = 1024 * 1024
+
+
+def legacy_interpolate(variable_store: VariableMemory, text: str, depth: int = 0) -> str:
+    """Reproduce the previous Agent._async_interpolate_variables algorithm."""
+    if depth > MAX_INTERPOLATION_DEPTH:
+        return text
+    for var in variable_store.keys():
+        escaped_var = re.escape(var).replace("\\$", "$")
+        pattern = f"\\${escaped_var}\\$"
+        replacement = str(variable_store[var])
+        text = re.sub(pattern, lambda m: replacement, text)
+    if "$" in text and depth < MAX_INTERPOLATION_DEPTH:
+        return legacy_interpolate(variable_store, text, depth + 1)
+    return text
+
+
+def build_inputs() -> tuple[VariableMemory, str]:
+    """1k variables and a 1 MB argument full of shell-style '$' signs and a few references."""
+    variable_store = VariableMemory()
+    for i in range(VARIABLES):
+        variable_store.add(f"tool output {i} costs $${i}")
+    line = 'echo "$HOME costs $5" && export PATH=$PATH:/opt/bin  # $var42$\n'
+    argument = (line * (ARGUMENT_SIZE // len(line) + 1))[:ARGUMENT_SIZE]
+    return variable_store, argument
+
+
+def measure(func, *args) -> float:
+    """Time one call (ms)."""
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    logger.remove()
+    print("📊 Variable interpolation benchmark")
+    print("=" * 50)
+    variable_store, argument = build_inputs()
+    print(f"{VARIABLES} variables, {len(argument) / 1024:.0f} KB argument, {argument.count('$')} '$' signs")
+
+    assert legacy_interpolate(variable_store, argument) == variable_store.interpolate(argument)
+
+    single = measure(variable_store.interpolate, argument)
+    legacy = measure(legacy_interpolate, variable_store, argument)
+    print(f"legacy regex loop: {legacy:>10.1f}ms")
+    print(f"single scan:       {single:>10.1f}ms  (x{legacy / single:,.0f})")
+
+
+if __name__ == "__main__":
+    main()
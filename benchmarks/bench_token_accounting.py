@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark: incremental AgentMemory token accounting vs. re-tokenizing the whole history."""
+
+import time
+from statistics import mean
+
+from quantalogic_react.quantalogic.generative_model import GenerativeModel
+from quantalogic_react.quantalogic.memory import AgentMemory, Message
+
+MODEL = "gpt-4o-mini"
+ITERATIONS = 5
+
+
+def build_history(size: int) -> list[Message]:
+    """Build a synthetic user/assistant history with tool-output sized messages."""
+    body = "The quick brown fox jumps over the lazy dog. " * 40
+    return [Message(role="user" if i % 2 == 0 else "assistant", content=f"{i} {body}") for i in range(size)]
+
+
+def measure_full_recount(model: GenerativeModel, history: list[Message]) -> float:
+    """Time one occupancy check using the legacy whole-history token count (ms)."""
+    start = time.perf_counter()
+    model.token_counter_with_history(history, "next prompt")
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_incremental(model: GenerativeModel, memory: AgentMemory, message: Message) -> float:
+    """Time one occupancy check using the incremental running total (ms)."""
+    start = time.perf_counter()
+    memory.add(message)
+    _ = memory.total_tokens + model.token_counter_with_history([], "next prompt")
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print("📊 AgentMemory token accounting benchmark")
+    print("=" * 50)
+    model = GenerativeModel(model=MODEL)
+
+    for size in (10, 100, 1000):
+        history = build_history(size)
+        memory = AgentMemory(token_counter=model.message_token_counter)
+        memory.memory = history[:-1]
+
+        full = mean(measure_full_recount(model, history) for _ in range(ITERATIONS))
+        incremental = []
+        for _ in range(ITERATIONS):
+            extra = Message(role="user", content=history[-1].content)
+            incremental.append(measure_incremental(model, memory, extra))
+        inc = mean(incremental)
+
+        print(f"{size:>5} messages: full recount {full:>9.2f}ms | incremental {inc:>7.2f}ms | x{full / inc:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
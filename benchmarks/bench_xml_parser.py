@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Benchmark: single-pass ToolCallParser vs. repeated ToleranceXMLParser scans.
+
+Responses are read from benchmarks/data/llm_responses.jsonl (one {"response": ...} per line),
+which holds responses in the agent's action format; append recorded outputs to extend it.
+"""
+
+import json
+import time
+from pathlib import Path
+from statistics import mean
+
+from loguru import logger
+
+from quantalogic_react.quantalogic.xml_parser import ToleranceXMLParser, ToolCallParser, parse_xml_arguments
+
+DATA_FILE = Path(__file__).parent / "data" / "llm_responses.jsonl"
+ITERATIONS = 200
+
+# Typical agent tool set size: a few real names plus filler tools
+TOOL_NAMES = ["read_file", "write_file", "duckduckgo_tool", "task_complete"] + [f"tool_{i}" for i in range(40)]
+
+
+def legacy_parse(content: str) -> dict:
+    """Reproduce the previous Agent._parse_tool_usage + ToolParser pipeline."""
+    xml_parser = ToleranceXMLParser()
+    action = xml_parser.extract_elements(text=content, element_names=["action"])
+    text = action["action"] if action else content
+    tool_data = xml_parser.extract_elements(text=text, element_names=TOOL_NAMES)
+    return {name: ToleranceXMLParser().extract_elements(value, preserve_cdata=True) for name, value in tool_data.items()}
+
+
+def single_pass_parse(parser: ToolCallParser, content: str) -> dict:
+    """Parse with the single-pass tokenizer."""
+    return {call.name: parse_xml_arguments(call.content) for call in parser.parse(content)}
+
+
+def measure(func, *args) -> float:
+    """Average time of one call (ms)."""
+    times = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return mean(times)
+
+
+def main():
+    logger.remove()  # Debug logging of the legacy parser would dominate the timings
+    print("📊 XML tool-call parser benchmark")
+    print("=" * 50)
+    responses = [json.loads(line)["response"] for line in DATA_FILE.read_text().splitlines() if line.strip()]
+    parser = ToolCallParser(TOOL_NAMES)
+
+    for index, response in enumerate(responses, 1):
+        legacy = measure(legacy_parse, response)
+        single = measure(single_pass_parse, parser, response)
+        print(f"response {index} ({len(response):>6} chars): legacy {legacy:>7.3f}ms | single-pass {single:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Load test: hundreds of concurrent SSE subscribers on the agent server's /events endpoint.
+
+Starts the server in-process, connects SUBSCRIBERS idle clients, and reports the server
+process CPU used per idle connection, then the fan-out latency of one broadcast event.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from loguru import logger
+
+SUBSCRIBERS = 300
+IDLE_SECONDS = 10.0
+PORT = 8766
+
+# The server mounts its static files relative to the package root
+os.chdir(Path(__file__).resolve().parents[1] / "quantalogic_react")
+
+from quantalogic_react.quantalogic.server import agent_server  # noqa: E402
+
+agent_state = agent_server.agent_state
+
+
+async def subscribe(client: httpx.AsyncClient, task_id: str, connected: asyncio.Event, received: list[float]):
+    """Hold an SSE connection open and record when the first event frame arrives."""
+    async with client.stream("GET", "/events", params={"task_id": task_id}) as response:
+        connected.set()
+        async for line in response.aiter_lines():
+            if line.startswith("id:"):
+                received.append(time.perf_counter())
+                return
+
+
+async def run_load_test():
+    """Connect the subscribers, measure idle CPU, then time one broadcast."""
+    limits = httpx.Limits(max_connections=SUBSCRIBERS + 10, max_keepalive_connections=SUBSCRIBERS + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None, limits=limits) as client:
+        received: list[float] = []
+        events = [asyncio.Event() for _ in range(SUBSCRIBERS)]
+        readers = [asyncio.create_task(subscribe(client, "load", event, received)) for event in events]
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in events)), 60)
+        while agent_state.event_hub.subscriber_count < SUBSCRIBERS:
+            await asyncio.sleep(0.05)
+        print(f"{SUBSCRIBERS} subscribers connected")
+
+        cpu_start = time.process_time()
+        await asyncio.sleep(IDLE_SECONDS)
+        cpu_idle = time.process_time() - cpu_start
+        print(f"idle CPU over {IDLE_SECONDS:.0f}s: {cpu_idle * 1000:.1f}ms total")
+        print(f"idle CPU per connection: {cpu_idle / SUBSCRIBERS / IDLE_SECONDS * 1e6:.1f}µs/s")
+
+        published = time.perf_counter()
+        agent_state.broadcast_event("load_test", {"message": "ping"}, task_id="load")
+        await asyncio.wait_for(asyncio.gather(*readers), 60)
+        print(f"fan-out to {len(received)} subscribers: {(max(received) - published) * 1000:.1f}ms")
+
+
+def main():
+    logger.remove()
+    print("📊 SSE load test")
+    print("=" * 50)
+    config = uvicorn.Config(agent_server.app, port=PORT, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    # Note: the client runs in the same process, so its CPU is included in the figures
+    asyncio.run(run_load_test())
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,29 @@ from importlib.metadata import version as _version
 try:
     __version__ = _version("quantalogic-flow")
 except PackageNotFoundError:
-    __version__ = "0.7.1"
+    __version__ = "0.8.0"
 
 from loguru import logger
 
 # Expose key components for easy import
 from .flow import Nodes, Workflow, WorkflowEngine
+from .flow.batch import BatchReport, BatchRunner
+from .flow.checkpoint import (
+    Checkpoint,
+    Checkpointer,
+    FileCheckpointBackend,
+    SQLiteCheckpointBackend,
+)
 from .flow.flow_extractor import extract_workflow_from_file
 from .flow.flow_generator import generate_executable_script
 from .flow.flow_manager import WorkflowManager
 from .flow.flow_mermaid import generate_mermaid_diagram
 from .flow.flow_validator import validate_workflow_definition
+from .flow.llm_cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from .flow.node_cache import NodeCache
+from .flow.profiler import WorkflowProfiler
+from .flow.rate_limit import RateLimiter
+from .flow.streaming import TokenStream
 
 __all__ = [
     "WorkflowManager",
@@ -27,6 +39,19 @@ __all__ = [
     "extract_workflow_from_file",
     "generate_executable_script",
     "validate_workflow_definition",
+    "ResponseCache",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "Checkpoint",
+    "Checkpointer",
+    "FileCheckpointBackend",
+    "SQLiteCheckpointBackend",
+    "BatchRunner",
+    "BatchReport",
+    "RateLimiter",
+    "NodeCache",
+    "WorkflowProfiler",
+    "TokenStream",
 ]
 
 logger.info("Initializing Quantalogic Flow Package")
@@ -17,6 +17,13 @@ Key Visualization Utilities:
 from loguru import logger
 
 # Expose key components for easy importing
+from .batch import BatchReport, BatchRunner
+from .checkpoint import (
+    Checkpoint,
+    Checkpointer,
+    FileCheckpointBackend,
+    SQLiteCheckpointBackend,
+)
 from .flow import Nodes, Workflow, WorkflowEngine
 from .flow import WorkflowEvent, WorkflowEventType
 from .flow_extractor import extract_workflow_from_file
@@ -24,6 +31,11 @@ from .flow_generator import generate_executable_script
 from .flow_manager import WorkflowManager
 from .flow_mermaid import generate_mermaid_diagram
 from .flow_validator import validate_workflow_definition
+from .llm_cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from .node_cache import NodeCache
+from .profiler import WorkflowProfiler
+from .rate_limit import RateLimiter
+from .streaming import TokenStream
 
 # Define which symbols are exported when using `from flow import *`
 __all__ = [
@@ -36,7 +48,20 @@ __all__ = [
     "generate_mermaid_diagram",
     "extract_workflow_from_file",
     "generate_executable_script",
-    "validate_workflow_definition"
+    "validate_workflow_definition",
+    "ResponseCache",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "Checkpoint",
+    "Checkpointer",
+    "FileCheckpointBackend",
+    "SQLiteCheckpointBackend",
+    "BatchRunner",
+    "BatchReport",
+    "RateLimiter",
+    "NodeCache",
+    "WorkflowProfiler",
+    "TokenStream",
 ]
 
 # Package-level logger configuration
@@ -0,0 +1,349 @@
+"""
+Batch execution module.
+
+This module runs one workflow over many initial contexts read from a JSONL or Parquet
+file. Contexts are processed concurrently under a global limit and optional per-model
+LLM rate limits, and each result is appended to an output JSONL file as soon as it
+completes.
+
+The output file doubles as the batch state: when a batch is started again with the
+same output file, contexts whose result was already written successfully are skipped,
+so an interrupted batch resumes where it stopped.
+
+Usage:
+    python -m quantalogic_flow.flow.batch workflow.yaml inputs.jsonl -o results.jsonl
+        --concurrency 16 --rate-limit gpt-4o-mini=500 --output-key summary
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+
+from .core.plan import ExecutionPlan
+from .rate_limit import RateLimiter, rate_limited
+
+if TYPE_CHECKING:
+    from .core.workflow import Workflow
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+@dataclass
+class BatchReport:
+    """Progress and outcome counters of a batch."""
+
+    total: Optional[int] = None
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        """Number of contexts run by this invocation, successfully or not."""
+        return self.succeeded + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Contexts processed per second."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        """Return a one-line progress summary."""
+        done = self.processed + self.skipped
+        total = f"/{self.total}" if self.total is not None else ""
+        return (
+            f"{done}{total} done ({self.succeeded} ok, {self.failed} failed, {self.skipped} skipped) "
+            f"in {self.elapsed:.1f}s, {self.throughput:.2f}/s"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary, including the throughput."""
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+        }
+
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet files requires pyarrow. Install with 'pip install pyarrow'")
+    return pq
+
+
+def read_contexts(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Yield the initial contexts stored in a JSONL or Parquet file, one per line or row.
+
+    Raises:
+        ValueError: If the file type is not supported or a line is not a JSON object.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in JSONL_SUFFIXES:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                context = json.loads(line)
+                if not isinstance(context, dict):
+                    raise ValueError(f"Line {line_number} of {path} is not a JSON object")
+                yield context
+    elif suffix in PARQUET_SUFFIXES:
+        parquet_file = _import_parquet().ParquetFile(str(path))
+        for batch in parquet_file.iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported input file '{path}', expected JSONL or Parquet")
+
+
+def count_contexts(path: Union[str, Path]) -> int:
+    """Return the number of contexts in a JSONL or Parquet file."""
+    path = Path(path)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        return _import_parquet().ParquetFile(str(path)).metadata.num_rows
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def load_completed_ids(output: Union[str, Path]) -> Set[str]:
+    """Return the ids of contexts that completed successfully in an existing output file."""
+    output = Path(output)
+    completed: Set[str] = set()
+    if not output.exists():
+        return completed
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves a truncated last record
+                continue
+            if record.get("status") == "ok":
+                completed.add(str(record["id"]))
+    return completed
+
+
+def _ends_with_partial_line(path: Path) -> bool:
+    if not path.exists() or not path.stat().st_size:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+
+class BatchRunner:
+    """Run a workflow over many initial contexts concurrently."""
+
+    def __init__(
+        self,
+        workflow: "Workflow",
+        concurrency: int = 8,
+        rate_limits: Union[Dict[str, float], RateLimiter, None] = None,
+        output_keys: Optional[List[str]] = None,
+        id_key: Optional[str] = None,
+        progress_interval: float = 5.0,
+        on_progress: Optional[Callable[[BatchReport], None]] = None,
+        **engine_options: Any,
+    ):
+        """Initialize the runner.
+
+        Args:
+            workflow: Workflow to run for every context.
+            concurrency: Maximum number of workflow runs in flight.
+            rate_limits: Maximum LLM requests per minute by model name, "*" for any model,
+                or a `RateLimiter` shared by all runs. The workflow's `rate_limiter` by default.
+            output_keys: Context keys written to the output; the whole final context by default.
+            id_key: Context key identifying each input; the input's position by default.
+            progress_interval: Seconds between two progress reports.
+            on_progress: Called with the current report every `progress_interval` seconds
+                and once at the end; progress is logged when not given.
+            **engine_options: Passed to `Workflow.build` for every run.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.workflow = workflow
+        self.concurrency = concurrency
+        if isinstance(rate_limits, RateLimiter):
+            self.limiter: Optional[RateLimiter] = rate_limits
+        else:
+            self.limiter = RateLimiter(rate_limits) if rate_limits else workflow.rate_limiter
+        self.output_keys = output_keys
+        self.id_key = id_key
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress or (lambda report: logger.info(f"Batch progress: {report.format()}"))
+        self.engine_options = engine_options
+
+    def _record_id(self, index: int, context: Dict[str, Any]) -> str:
+        if self.id_key is not None and self.id_key in context:
+            return str(context[self.id_key])
+        return str(index)
+
+    def _result(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        if self.output_keys is None:
+            return dict(context)
+        return {key: context.get(key) for key in self.output_keys}
+
+    async def run(
+        self,
+        inputs: Union[str, Path, Iterable[Dict[str, Any]]],
+        output: Union[str, Path],
+        resume: bool = True,
+    ) -> BatchReport:
+        """Run the workflow over `inputs` and append one JSON line per context to `output`.
+
+        Args:
+            inputs: Path of a JSONL or Parquet file, or an iterable of contexts.
+            output: Path of the output JSONL file.
+            resume: Skip contexts already completed in `output` instead of starting over.
+
+        Returns:
+            The final report of the batch.
+        """
+        output = Path(output)
+        if isinstance(inputs, (str, Path)):
+            report = BatchReport(total=count_contexts(inputs))
+            contexts: Iterable[Dict[str, Any]] = read_contexts(inputs)
+        else:
+            report = BatchReport(total=len(inputs) if hasattr(inputs, "__len__") else None)
+            contexts = inputs
+        if not resume:
+            output.unlink(missing_ok=True)
+        completed = load_completed_ids(output)
+        if completed:
+            logger.info(f"Resuming batch: {len(completed)} contexts already completed in {output}")
+
+        # Compile templates and the execution plan once instead of for every run
+        self.workflow.build(precompile_templates=True)
+        plan = ExecutionPlan.compile(self.workflow)
+        pending: Iterator[Tuple[int, Dict[str, Any]]] = enumerate(contexts)
+        start = time.monotonic()
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "a", encoding="utf-8") as out:
+            if _ends_with_partial_line(output):
+                out.write("\n")
+
+            def write(record: Dict[str, Any]) -> None:
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+
+            async def worker() -> None:
+                for index, context in pending:
+                    record_id = self._record_id(index, context)
+                    if record_id in completed:
+                        report.skipped += 1
+                        continue
+                    run_start = time.monotonic()
+                    record: Dict[str, Any] = {"id": record_id, "index": index}
+                    try:
+                        engine = self.workflow.build(plan=plan, **{"rate_limiter": self.limiter, **self.engine_options})
+                        result = await engine.run(dict(context))
+                        record.update(status="ok", result=self._result(result))
+                        report.succeeded += 1
+                    except Exception as e:
+                        logger.warning(f"Batch context {record_id} failed: {e}")
+                        record.update(status="error", error=f"{type(e).__name__}: {e}")
+                        report.failed += 1
+                    record["elapsed"] = round(time.monotonic() - run_start, 6)
+                    write(record)
+
+            async def report_progress() -> None:
+                while True:
+                    await asyncio.sleep(self.progress_interval)
+                    report.elapsed = time.monotonic() - start
+                    self.on_progress(report)
+
+            progress_task = asyncio.create_task(report_progress())
+            try:
+                with rate_limited(self.limiter):
+                    await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            finally:
+                progress_task.cancel()
+                await asyncio.gather(progress_task, return_exceptions=True)
+                report.elapsed = time.monotonic() - start
+
+        self.on_progress(report)
+        return report
+
+
+def _parse_rate_limits(values: List[str], unit: str = "REQUESTS_PER_MINUTE") -> Dict[str, float]:
+    limits: Dict[str, float] = {}
+    for value in values:
+        model, separator, per_minute = value.rpartition("=")
+        if not separator or not model:
+            raise ValueError(f"Invalid rate limit '{value}', expected MODEL={unit}")
+        limits[model] = float(per_minute)
+    return limits
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a YAML workflow definition over a JSONL or Parquet file of contexts."""
+    import argparse
+
+    from .flow_manager import WorkflowManager
+
+    parser = argparse.ArgumentParser(description="Run a workflow over a batch of input contexts")
+    parser.add_argument("workflow", help="Path to the YAML workflow definition")
+    parser.add_argument("inputs", help="JSONL or Parquet file with one initial context per line or row")
+    parser.add_argument("--output", "-o", required=True, help="Output JSONL file, also used to resume")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Maximum workflow runs in flight")
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="MODEL=RPM",
+        help="Maximum LLM requests per minute for a model ('*' for any model), repeatable",
+    )
+    parser.add_argument(
+        "--token-limit",
+        action="append",
+        default=[],
+        metavar="MODEL=TPM",
+        help="Maximum LLM tokens per minute for a model ('*' for any model), repeatable",
+    )
+    parser.add_argument(
+        "--output-key", action="append", dest="output_keys", help="Context key to write, repeatable"
+    )
+    parser.add_argument("--id-key", help="Context key identifying each input")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress reports")
+    parser.add_argument("--restart", action="store_true", help="Discard the existing output instead of resuming")
+    args = parser.parse_args(argv)
+
+    manager = WorkflowManager()
+    manager.load_from_yaml(args.workflow)
+    workflow = manager.instantiate_workflow()
+    limiter = workflow.rate_limiter
+    if args.rate_limit or args.token_limit:
+        # Limits given on the command line replace those of the workflow definition
+        limiter = RateLimiter(
+            requests_per_minute=_parse_rate_limits(args.rate_limit),
+            tokens_per_minute=_parse_rate_limits(args.token_limit, "TOKENS_PER_MINUTE"),
+        )
+    runner = BatchRunner(
+        workflow,
+        concurrency=args.concurrency,
+        rate_limits=limiter,
+        output_keys=args.output_keys,
+        id_key=args.id_key,
+        progress_interval=args.progress_interval,
+    )
+    report = asyncio.run(runner.run(args.inputs, args.output, resume=not args.restart))
+    print(report.format())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,285 @@
+"""
+Workflow checkpoint module.
+
+This module lets a `WorkflowEngine` persist its context and position after every node so
+that a failed or interrupted run can be resumed by id without re-running completed nodes.
+
+Checkpoints are incremental: only context keys whose serialized value changed since the
+previous checkpoint of the run are written. Two backends are available:
+- FileCheckpointBackend: one append-only JSONL file per run, compacted periodically
+- SQLiteCheckpointBackend: one row per (run, key) in a SQLite database
+
+Context values are stored as JSON when possible and pickled otherwise. Values that can
+be neither are skipped with a warning and will be missing after a resume.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from loguru import logger
+
+_RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+@dataclass
+class Checkpoint:
+    """Saved state of a workflow run."""
+
+    run_id: str
+    context: Dict[str, Any]
+    position: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        """Return True when the run completed."""
+        return bool(self.position.get("done"))
+
+
+class CheckpointBackend(Protocol):
+    """Storage interface of a checkpointer. Values are already serialized to strings."""
+
+    def write(self, run_id: str, changed: Dict[str, str], removed: List[str], position: Dict[str, Any]) -> None:
+        """Store changed values, drop removed keys and replace the position of a run."""
+
+    def read(self, run_id: str) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """Return the serialized values and the position of a run, or None if unknown."""
+
+    def delete(self, run_id: str) -> None:
+        """Remove a run."""
+
+    def list_runs(self) -> List[str]:
+        """Return the ids of stored runs."""
+
+
+def _check_run_id(run_id: str) -> str:
+    if not _RUN_ID_PATTERN.match(run_id):
+        raise ValueError(f"Invalid run id '{run_id}'")
+    return run_id
+
+
+class FileCheckpointBackend:
+    """Backend storing each run as an append-only JSONL file in a directory.
+
+    Every checkpoint appends one record with the changed keys. The file is rewritten
+    with the current state after `compact_every` records to bound replay time.
+    """
+
+    def __init__(self, directory: str | Path, compact_every: int = 100):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compact_every = compact_every
+        self._records: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self.directory / f"{_check_run_id(run_id)}.jsonl"
+
+    def write(self, run_id: str, changed: Dict[str, str], removed: List[str], position: Dict[str, Any]) -> None:
+        record = json.dumps({"values": changed, "removed": removed, "position": position})
+        path = self._path(run_id)
+        with self._lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+            self._records[run_id] = self._records.get(run_id, 0) + 1
+            if self._records[run_id] >= self.compact_every:
+                self._compact(run_id, path)
+
+    def _compact(self, run_id: str, path: Path) -> None:
+        state = self._replay(path)
+        if state is None:
+            return
+        values, position = state
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"values": values, "removed": [], "position": position}) + "\n")
+        os.replace(tmp_path, path)
+        self._records[run_id] = 1
+
+    @staticmethod
+    def _replay(path: Path) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        if not path.exists():
+            return None
+        values: Dict[str, str] = {}
+        position: Dict[str, Any] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves a truncated last record
+                    logger.warning(f"Ignoring truncated checkpoint record in {path}")
+                    break
+                values.update(record["values"])
+                for key in record["removed"]:
+                    values.pop(key, None)
+                position = record["position"]
+        return values, position
+
+    def read(self, run_id: str) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        with self._lock:
+            return self._replay(self._path(run_id))
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._path(run_id).unlink(missing_ok=True)
+            self._records.pop(run_id, None)
+
+    def list_runs(self) -> List[str]:
+        return sorted(path.stem for path in self.directory.glob("*.jsonl"))
+
+
+class SQLiteCheckpointBackend:
+    """Backend storing one row per context key in a SQLite database."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_runs ("
+            "run_id TEXT PRIMARY KEY, position TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_values ("
+            "run_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (run_id, key))"
+        )
+        self._conn.commit()
+
+    def write(self, run_id: str, changed: Dict[str, str], removed: List[str], position: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_values (run_id, key, value) VALUES (?, ?, ?)",
+                [(run_id, key, value) for key, value in changed.items()],
+            )
+            self._conn.executemany(
+                "DELETE FROM checkpoint_values WHERE run_id = ? AND key = ?",
+                [(run_id, key) for key in removed],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_runs (run_id, position, updated_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(position), time.time()),
+            )
+
+    def read(self, run_id: str) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT position FROM checkpoint_runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            values = dict(
+                self._conn.execute(
+                    "SELECT key, value FROM checkpoint_values WHERE run_id = ?", (run_id,)
+                ).fetchall()
+            )
+        return values, json.loads(row[0])
+
+    def delete(self, run_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoint_values WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM checkpoint_runs WHERE run_id = ?", (run_id,))
+
+    def list_runs(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT run_id FROM checkpoint_runs ORDER BY updated_at").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class Checkpointer:
+    """Incremental checkpointing of workflow runs on top of a backend."""
+
+    def __init__(self, backend: CheckpointBackend):
+        self.backend = backend
+        # Fingerprints of the values last written, per run
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def file(cls, directory: str | Path, **kwargs) -> "Checkpointer":
+        """Create a checkpointer writing JSONL files into `directory`."""
+        return cls(FileCheckpointBackend(directory, **kwargs))
+
+    @classmethod
+    def sqlite(cls, path: str | Path) -> "Checkpointer":
+        """Create a checkpointer writing to a SQLite database at `path`."""
+        return cls(SQLiteCheckpointBackend(path))
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        try:
+            return json.dumps({"json": value}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return json.dumps({"pickle": base64.b64encode(pickle.dumps(value)).decode("ascii")})
+
+    @staticmethod
+    def _decode(encoded: str) -> Any:
+        payload = json.loads(encoded)
+        if "pickle" in payload:
+            return pickle.loads(base64.b64decode(payload["pickle"]))
+        return payload["json"]
+
+    @staticmethod
+    def _fingerprint(encoded: str) -> str:
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+    def save(self, run_id: str, context: Dict[str, Any], position: Dict[str, Any]) -> int:
+        """Write the keys of `context` that changed since the last save, and the position.
+
+        Returns:
+            The number of keys written.
+        """
+        previous = self._fingerprints.setdefault(run_id, {})
+        changed: Dict[str, str] = {}
+        current: Dict[str, str] = {}
+        for key, value in context.items():
+            try:
+                encoded = self._encode(value)
+            except Exception as e:
+                logger.warning(f"Context key '{key}' cannot be checkpointed: {e}")
+                continue
+            fingerprint = self._fingerprint(encoded)
+            current[key] = fingerprint
+            if previous.get(key) != fingerprint:
+                changed[key] = encoded
+        removed = [key for key in previous if key not in current]
+        self.backend.write(run_id, changed, removed, position)
+        self._fingerprints[run_id] = current
+        logger.debug(f"Checkpointed run {run_id}: {len(changed)} changed, {len(removed)} removed")
+        return len(changed)
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        """Return the last checkpoint of a run, or None if the run is unknown."""
+        state = self.backend.read(run_id)
+        if state is None:
+            return None
+        values, position = state
+        self._fingerprints[run_id] = {key: self._fingerprint(encoded) for key, encoded in values.items()}
+        context = {key: self._decode(encoded) for key, encoded in values.items()}
+        return Checkpoint(run_id=run_id, context=context, position=position)
+
+    def delete(self, run_id: str) -> None:
+        """Remove the checkpoints of a run."""
+        self.backend.delete(run_id)
+        self._fingerprints.pop(run_id, None)
+
+    def list_runs(self) -> List[str]:
+        """Return the ids of checkpointed runs."""
+        return self.backend.list_runs()
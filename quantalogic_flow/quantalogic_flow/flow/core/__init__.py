@@ -2,6 +2,7 @@
 
 from .engine import WorkflowEngine
 from .events import WorkflowEvent, WorkflowEventType, WorkflowObserver
+from .map_node import MapNode
 from .sub_workflow import SubWorkflowNode
 from .workflow import Workflow
 
@@ -11,5 +12,6 @@ __all__ = [
     "WorkflowEventType", 
     "WorkflowObserver",
     "SubWorkflowNode",
+    "MapNode",
     "Workflow"
 ]
@@ -0,0 +1,133 @@
+"""
+Branch context module.
+
+This module contains the ContextOverlay class giving each parallel branch a private,
+copy-on-write view of the workflow context, and the merge of branch writes at convergence.
+"""
+
+from collections.abc import Iterator, MutableMapping
+from typing import Any, Dict, List, Set, Tuple
+
+from loguru import logger
+
+CONFLICT_POLICIES = ("warn", "error")
+
+_MISSING = object()
+
+
+class ContextOverlay(MutableMapping):
+    """A mapping reading through to a base context and keeping its own writes.
+
+    Writes and deletions stay in the overlay, so concurrent branches never see each
+    other's outputs. The base is not copied; values are shared until a key is written,
+    so in-place mutation of a shared value is still visible to every branch.
+    """
+
+    def __init__(self, base: MutableMapping):
+        """Create an overlay over `base`, which is read but never modified."""
+        self.base = base
+        self.writes: Dict[str, Any] = {}
+        self.deleted: Set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the branch's value for a key, falling back to the base context."""
+        if key in self.writes:
+            return self.writes[key]
+        if key in self.deleted:
+            raise KeyError(key)
+        return self.base[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Write a key in the overlay only."""
+        self.writes[key] = value
+        self.deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        """Hide a key from the branch without touching the base context."""
+        if key not in self:
+            raise KeyError(key)
+        self.writes.pop(key, None)
+        self.deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a key is visible to the branch."""
+        if key in self.writes:
+            return True
+        return key not in self.deleted and key in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys visible to the branch."""
+        yield from self.writes
+        for key in self.base:
+            if key not in self.writes and key not in self.deleted:
+                yield key
+
+    def __len__(self) -> int:
+        """Return the number of keys visible to the branch."""
+        return sum(1 for _ in self)
+
+    def changes(self) -> Dict[str, Any]:
+        """Return the keys changed by the branch, with `_MISSING` marking deletions."""
+        return {**{key: _MISSING for key in self.deleted}, **self.writes}
+
+    def apply_to(self, context: MutableMapping) -> None:
+        """Write the branch's changes into `context` without conflict checks."""
+        for key, value in self.changes().items():
+            if value is _MISSING:
+                context.pop(key, None)
+            else:
+                context[key] = value
+
+    def __repr__(self) -> str:
+        """Return a short description of the branch's changes."""
+        return f"ContextOverlay(writes={list(self.writes)}, deleted={sorted(self.deleted)})"
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def merge_overlays(
+    context: MutableMapping,
+    overlays: List[Tuple[str, ContextOverlay]],
+    on_conflict: str = "warn",
+) -> List[str]:
+    """Apply branch overlays to `context` in the given branch order.
+
+    Two branches conflict when they change the same key to different values. The
+    branch listed last wins; with `on_conflict="error"` a ValueError is raised before
+    anything is written instead.
+
+    Returns:
+        The conflicting keys, in order of first appearance.
+
+    Raises:
+        ValueError: If branches conflict and `on_conflict` is "error".
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy '{on_conflict}', expected one of {CONFLICT_POLICIES}")
+    merged: Dict[str, Any] = {}
+    writers: Dict[str, str] = {}
+    conflicts: List[str] = []
+    for branch, overlay in overlays:
+        for key, value in overlay.changes().items():
+            if key in merged and not _same_value(merged[key], value):
+                message = f"Parallel branches '{writers[key]}' and '{branch}' both write context key '{key}'"
+                if on_conflict == "error":
+                    raise ValueError(message)
+                logger.warning(f"{message}; keeping the value from '{branch}'")
+                if key not in conflicts:
+                    conflicts.append(key)
+            merged[key] = value
+            writers[key] = branch
+    for key, value in merged.items():
+        if value is _MISSING:
+            context.pop(key, None)
+        else:
+            context[key] = value
+    return conflicts
@@ -0,0 +1,96 @@
+"""
+Dataflow scheduling module.
+
+This module derives data dependencies between workflow nodes from their declared
+inputs, input mappings and outputs, for the engine's dataflow scheduler.
+"""
+
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+# Footprint of a node: (context keys read, context key written, is_barrier)
+NodeFootprint = Tuple[FrozenSet[str], Optional[str], bool]
+
+
+def linear_segment(workflow: "Workflow", start_node: str) -> List[str]:
+    """Collect the straight-line run of nodes starting at `start_node`.
+
+    The run follows single unconditional transitions and stops before anything that
+    needs control flow: conditional or multiple transitions, parallel blocks, nodes
+    that belong to a parallel block, and cycles. Every node of the run is therefore
+    executed exactly once whenever `start_node` is reached.
+    """
+    segment = [start_node]
+    current = start_node
+    while True:
+        if current in workflow.parallel_blocks:
+            break
+        transitions = workflow.transitions.get(current, [])
+        if len(transitions) != 1:
+            break
+        next_node, condition = transitions[0]
+        if (
+            condition is not None
+            or next_node in segment
+            or next_node not in workflow.nodes
+            or workflow.is_parallel_node(next_node)
+        ):
+            break
+        segment.append(next_node)
+        current = next_node
+    return segment
+
+
+def node_footprint(workflow: "Workflow", node_name: str) -> NodeFootprint:
+    """Return the context keys a node reads, the key it writes and whether it is a barrier.
+
+    A node is a barrier when its reads or writes cannot be known ahead of time: a
+    callable input mapping can read anything, a node without a declared output may
+    merge a returned dict into the context, and a map node's reducer writes its own key.
+    """
+    mappings = workflow.node_input_mappings.get(node_name, {})
+    reads: Set[str] = set()
+    barrier = False
+    for mapping in mappings.values():
+        if callable(mapping):
+            barrier = True
+        elif isinstance(mapping, str):
+            reads.add(mapping)
+    for param in workflow.node_inputs.get(node_name, []):
+        if param not in mappings:
+            reads.add(param)
+    output = workflow.node_outputs.get(node_name)
+    if not output:
+        barrier = True
+    # A reducer writes a second context key while the map node runs
+    if getattr(workflow.nodes.get(node_name), "reducer", None):
+        barrier = True
+    return frozenset(reads), output, barrier
+
+
+def build_dependencies(workflow: "Workflow", segment: List[str]) -> Dict[str, Set[str]]:
+    """Map each node of a segment to the earlier nodes it must wait for.
+
+    A later node depends on an earlier one when it reads the earlier node's output,
+    overwrites a key the earlier node reads, writes the same key, or when either node
+    is a barrier. Nodes with no such conflict may run concurrently.
+    """
+    footprints = {name: node_footprint(workflow, name) for name in segment}
+    dependencies: Dict[str, Set[str]] = {}
+    for index, name in enumerate(segment):
+        reads, output, barrier = footprints[name]
+        deps: Set[str] = set()
+        for earlier in segment[:index]:
+            earlier_reads, earlier_output, earlier_barrier = footprints[earlier]
+            if (
+                barrier
+                or earlier_barrier
+                or (earlier_output is not None and earlier_output in reads)
+                or (output is not None and output in earlier_reads)
+                or (output is not None and output == earlier_output)
+            ):
+                deps.add(earlier)
+        dependencies[name] = deps
+    return dependencies
@@ -5,43 +5,161 @@ This module contains the WorkflowEngine class for executing workflows.
 """
 
 import asyncio
-from typing import Any, Dict, List, Tuple
+import time
+import uuid
+from collections.abc import Iterable, MutableMapping
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Set, Tuple
 
 from loguru import logger
 
-from .events import WorkflowEvent, WorkflowEventType, WorkflowObserver
+from ..nodes.base import capture_usage
+from ..rate_limit import rate_limited
+from ..streaming import TokenStream, close_streams, finish_streams, resolve_streams
+from .context import CONFLICT_POLICIES, ContextOverlay, merge_overlays
+from .dataflow import build_dependencies, linear_segment
+from .events import ObserverQueue, WorkflowEvent, WorkflowEventType, WorkflowObserver
+from .map_node import MapNode
+from .plan import ExecutionPlan
 from .sub_workflow import SubWorkflowNode
 
+if TYPE_CHECKING:
+    from ..checkpoint import Checkpointer
+    from ..rate_limit import RateLimiter
+
+SCHEDULERS = ("sequential", "dataflow")
+
 
 class WorkflowEngine:
     """Engine for executing workflows with event monitoring and context management."""
     
-    def __init__(self, workflow, parent_engine: "WorkflowEngine | None" = None, instance: Any | None = None, observers: List[WorkflowObserver] | None = None):
-        """Initialize the WorkflowEngine with a workflow and optional parent for sub-workflows."""
+    def __init__(
+        self,
+        workflow,
+        parent_engine: "WorkflowEngine | None" = None,
+        instance: Any | None = None,
+        observers: List[WorkflowObserver] | None = None,
+        scheduler: str = "sequential",
+        max_concurrency: int = 4,
+        checkpointer: "Checkpointer | None" = None,
+        run_id: str | None = None,
+        on_conflict: str = "warn",
+        plan: ExecutionPlan | None = None,
+        event_filters: Dict[int, FrozenSet[WorkflowEventType]] | None = None,
+        observer_queue_size: int = 1000,
+        rate_limiter: "RateLimiter | None" = None,
+    ):
+        """Initialize the WorkflowEngine with a workflow and optional parent for sub-workflows.
+
+        Args:
+            workflow: Workflow to execute.
+            parent_engine: Engine of the parent workflow when running as a sub-workflow.
+            instance: Object passed as `instance` to the nodes; its `context` attribute is kept
+                in sync with the run context.
+            observers: Observers notified of the run's events.
+            scheduler: "sequential" runs one node at a time along the transitions. "dataflow"
+                also overlaps nodes of a straight-line run whose declared inputs and outputs
+                do not depend on each other; branches, loops and parallel blocks keep their
+                usual semantics.
+            max_concurrency: Maximum number of nodes the dataflow scheduler runs at once.
+            checkpointer: Saves the context and position after every node so the run can
+                be continued with `resume`.
+            run_id: Id of the run in the checkpointer. Generated when not given.
+            on_conflict: What to do when parallel branches write different values to the
+                same context key: "warn" keeps the value of the branch declared last,
+                "error" fails the parallel block.
+            plan: Execution plan compiled from `workflow` by `Workflow.build()`. Compiled
+                on first use when not given.
+            event_filters: Event types each observer subscribed to, keyed by `id(observer)`.
+                Observers without an entry receive every event.
+            observer_queue_size: Maximum number of async observer calls queued during a
+                run; the run waits when the queue is full. 0 awaits async observers inline.
+            rate_limiter: Limits applied to the LLM calls of the run's nodes. Without it,
+                the limiter active where the run was started, if any, applies.
+        """
+        if scheduler not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduler '{scheduler}', expected one of {SCHEDULERS}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy '{on_conflict}', expected one of {CONFLICT_POLICIES}")
+        if observer_queue_size < 0:
+            raise ValueError("observer_queue_size cannot be negative")
         self.workflow = workflow
         self.context: Dict[str, Any] = {}
         self.observers: List[WorkflowObserver] = observers or []
         self.parent_engine = parent_engine
         self.instance = instance
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency
+        self._segments: Dict[str, Tuple[List[str], Dict[str, Set[str]]]] = {}
+        self.checkpointer = checkpointer
+        self.run_id = run_id
+        self.on_conflict = on_conflict
+        self._plan = plan
+        self.event_filters = event_filters if event_filters is not None else {}
+        self.observer_queue_size = observer_queue_size
+        self._observer_queue: ObserverQueue | None = None
+        self.rate_limiter = rate_limiter
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        """The execution plan of the workflow, compiled on first use."""
+        if self._plan is None:
+            self._plan = ExecutionPlan.compile(self.workflow)
+        return self._plan
 
-    def add_observer(self, observer: WorkflowObserver) -> None:
-        """Register an event observer callback."""
+    def add_observer(
+        self, observer: WorkflowObserver, event_types: Iterable[WorkflowEventType] | None = None
+    ) -> None:
+        """Register an event observer callback.
+
+        Args:
+            observer: Callable receiving the events.
+            event_types: Event types the observer subscribes to; all events when None.
+        """
         if observer not in self.observers:
             self.observers.append(observer)
             logger.debug(f"Added observer: {observer}")
+        if event_types is None:
+            self.event_filters.pop(id(observer), None)
+        else:
+            self.event_filters[id(observer)] = frozenset(event_types)
         if self.parent_engine:
-            self.parent_engine.add_observer(observer)
+            self.parent_engine.add_observer(observer, event_types)
 
     def remove_observer(self, observer: WorkflowObserver) -> None:
         """Remove an event observer callback."""
         if observer in self.observers:
             self.observers.remove(observer)
+            self.event_filters.pop(id(observer), None)
             logger.debug(f"Removed observer: {observer}")
 
+    def _subscribers(self, event_type: WorkflowEventType) -> List[WorkflowObserver]:
+        """Return the observers subscribed to an event type."""
+        if not self.event_filters:
+            return self.observers
+        return [
+            observer
+            for observer in self.observers
+            if event_type in self.event_filters.get(id(observer), (event_type,))
+        ]
+
+    async def _emit(self, event_type: WorkflowEventType, node_name: str | None, context: Any, **fields: Any) -> None:
+        """Notify the observers subscribed to `event_type`, building the event only if there is one."""
+        observers = self._subscribers(event_type)
+        if observers:
+            event = WorkflowEvent(event_type=event_type, node_name=node_name, context=context, **fields)
+            await self._deliver(event, observers)
+
     async def _notify_observers(self, event: WorkflowEvent) -> None:
-        """Asynchronously notify all observers of an event."""
+        """Asynchronously notify the observers subscribed to an event."""
+        await self._deliver(event, self._subscribers(event.event_type))
+
+    async def _deliver(self, event: WorkflowEvent, observers: List[WorkflowObserver]) -> None:
+        """Call sync observers now; queue async ones during a run, or await them otherwise."""
         tasks = []
-        for observer in self.observers:
+        for observer in observers:
             try:
                 if asyncio.iscoroutinefunction(observer):
                     tasks.append(observer(event))
@@ -49,8 +167,31 @@ class WorkflowEngine:
                     observer(event)
             except Exception as e:
                 logger.error(f"Observer {observer} failed for {event.event_type.value}: {e}")
-        if tasks:
+        if not tasks:
+            return
+        if self._observer_queue is None:
             await asyncio.gather(*tasks)
+            return
+        for task in tasks:
+            await self._observer_queue.put(task)
+
+    async def _run_observed(self, start_node: str | None, **position: Any) -> Dict[str, Any]:
+        """Run from a node, delivering async observer calls through a bounded queue until the run ends."""
+        if self.observer_queue_size:
+            self._observer_queue = ObserverQueue(self.observer_queue_size)
+        limits = rate_limited(self.rate_limiter) if self.rate_limiter is not None else nullcontext()
+        try:
+            with limits:
+                await self._emit(WorkflowEventType.WORKFLOW_STARTED, None, self.context)
+                return await self._run_from(start_node, **position)
+        except BaseException:
+            if self.plan.streaming:
+                await close_streams(self.context)
+            raise
+        finally:
+            observer_queue, self._observer_queue = self._observer_queue, None
+            if observer_queue is not None:
+                await observer_queue.drain()
 
     async def run(self, initial_context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the workflow starting from the entry node with event notifications."""
@@ -60,96 +201,217 @@ class WorkflowEngine:
         
         if self.instance:
             self.instance.context = self.context
-            
-        await self._notify_observers(
-            WorkflowEvent(event_type=WorkflowEventType.WORKFLOW_STARTED, node_name=None, context=self.context)
+        if self.checkpointer is not None and self.run_id is None:
+            self.run_id = uuid.uuid4().hex
+
+        return await self._run_observed(self.workflow.start_node)
+
+    async def resume(self, run_id: str) -> Dict[str, Any]:
+        """Continue a checkpointed run from the node after the last completed one.
+
+        Raises:
+            ValueError: If the engine has no checkpointer or the run is unknown.
+        """
+        if self.checkpointer is None:
+            raise ValueError("Cannot resume a run without a checkpointer")
+        checkpoint = self.checkpointer.load(run_id)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint found for run {run_id}")
+
+        self.run_id = run_id
+        self.context = {**self.context, **checkpoint.context}
+        if self.instance:
+            self.instance.context = self.context
+        if checkpoint.done:
+            logger.info(f"Run {run_id} already completed")
+            return self.context
+
+        position = checkpoint.position
+        logger.info(f"Resuming run {run_id} at {position}")
+        return await self._run_observed(
+            position.get("next_node"),
+            parallel_source=position.get("parallel_source"),
+            parallel_nodes=position.get("parallel_nodes"),
+            completed_branches=position.get("completed_branches"),
         )
 
-        current_node = self.workflow.start_node
+    def _save_checkpoint(
+        self,
+        next_node: str | None,
+        done: bool = False,
+        context: Dict[str, Any] | None = None,
+        **parallel_state: Any,
+    ) -> None:
+        """Persist the context and the position of the run when checkpointing is enabled."""
+        if self.checkpointer is None:
+            return
+        position = {"next_node": next_node, "done": done, **parallel_state}
+        self.checkpointer.save(self.run_id, self.context if context is None else context, position)
+
+    async def _run_from(
+        self,
+        current_node: str | None,
+        parallel_source: str | None = None,
+        parallel_nodes: List[str] | None = None,
+        completed_branches: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        """Walk the workflow from a node, or finish an interrupted parallel block first."""
+        plan = self.plan
+        if parallel_source is not None:
+            await self._execute_parallel_nodes(parallel_source, parallel_nodes or [], completed_branches)
+            current_node = plan.convergence_nodes.get(parallel_source)
+            self._save_checkpoint(current_node)
+
         while current_node:
             # Execute the current node before handling transitions
-            if self.workflow.is_parallel_node(current_node):
+            source_node = plan.parallel_source_of.get(current_node)
+            if source_node is not None:
                 # This node is part of a parallel block that has already been executed
                 # We just need to find the convergence point.
-                source_node = self.workflow.get_parallel_source_for_node(current_node)
-                current_node = self.workflow.convergence_nodes.get(source_node)
+                current_node = plan.convergence_nodes.get(source_node)
                 continue
 
-            await self._execute_single_node(current_node)
-
-            # Get next transitions after executing the node
-            next_transitions = self.workflow.transitions.get(current_node, [])
+            if self.scheduler == "dataflow":
+                current_node = await self._execute_segment(current_node)
+            else:
+                await self._execute_single_node(current_node)
 
             # Determine the next step
-            if self._has_parallel_transitions(current_node, next_transitions):
-                # Execute parallel nodes - get them from the parallel block
-                if current_node in self.workflow.parallel_blocks:
-                    parallel_nodes = self.workflow.parallel_blocks[current_node]
-                else:
-                    # Fallback to traditional parallel detection
-                    parallel_nodes = [node for node, condition in next_transitions if condition is None]
+            if current_node in plan.parallel_sources:
+                # Execute the parallel block, or the unconditional transitions of the node
+                parallel_nodes = list(plan.parallel_nodes_from(current_node))
+                self._save_checkpoint(
+                    None, parallel_source=current_node, parallel_nodes=parallel_nodes, completed_branches=[]
+                )
                 await self._execute_parallel_nodes(current_node, parallel_nodes)
                 
                 # After parallel execution, find the convergence node
                 # If no convergence node exists, the workflow ends after parallel execution
-                current_node = self.workflow.convergence_nodes.get(current_node)
+                current_node = plan.convergence_nodes.get(current_node)
             else:
                 # Determine the next node for sequential execution
                 next_node_candidate = None
-                for next_node, condition in next_transitions:
-                    await self._notify_observers(
-                        WorkflowEvent(
-                            event_type=WorkflowEventType.TRANSITION_EVALUATED,
-                            node_name=current_node,
-                            context=self.context,
-                            transition_from=current_node,
-                            transition_to=next_node,
-                        )
+                for next_node, condition in plan.successors.get(current_node, ()):
+                    await self._emit(
+                        WorkflowEventType.TRANSITION_EVALUATED,
+                        current_node,
+                        self.context,
+                        transition_from=current_node,
+                        transition_to=next_node,
                     )
                     if condition is None or condition(self.context):
                         next_node_candidate = next_node
                         break
                 current_node = next_node_candidate
 
+            if current_node:
+                self._save_checkpoint(current_node)
+
+        if plan.streaming:
+            await finish_streams(self.context)
+        self._save_checkpoint(None, done=True)
         logger.info("Workflow execution completed")
-        await self._notify_observers(
-            WorkflowEvent(event_type=WorkflowEventType.WORKFLOW_COMPLETED, node_name=None, context=self.context)
-        )
+        await self._emit(WorkflowEventType.WORKFLOW_COMPLETED, None, self.context)
         return self.context
 
-    def _has_parallel_transitions(self, current_node: str, transitions: List[Tuple[str, Any]]) -> bool:
-        """Check if transitions represent parallel execution.
-        
-        Args:
-            current_node: The current node name
-            transitions: List of (node_name, condition) tuples
-            
+    async def _execute_segment(self, start_node: str) -> str:
+        """Execute the straight-line run starting at a node, overlapping independent nodes.
+
+        Only nodes of one run of single unconditional transitions are overlapped, since
+        they are all known to execute; conditions, loops and parallel blocks between runs
+        are evaluated as in the sequential scheduler.
+
         Returns:
-            True if this node is a source for parallel execution
+            The last node of the run, whose transitions the caller evaluates next.
         """
-        # Check if this node is a source for a parallel block
-        if current_node in self.workflow.parallel_blocks:
-            return True
-        
-        # Also check for multiple unconditional transitions (traditional parallel)
-        unconditional_transitions = [t for t in transitions if t[1] is None]
-        return len(unconditional_transitions) > 1
+        if start_node not in self._segments:
+            segment = linear_segment(self.workflow, start_node)
+            self._segments[start_node] = (segment, build_dependencies(self.workflow, segment))
+        segment, dependencies = self._segments[start_node]
+        if len(segment) == 1:
+            await self._execute_single_node(start_node)
+            return start_node
+
+        logger.debug(f"Dataflow scheduling of {segment}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(node_name: str) -> None:
+            if dependencies[node_name]:
+                await asyncio.gather(*(tasks[dep] for dep in dependencies[node_name]))
+            queued_at = time.perf_counter()
+            async with semaphore:
+                await self._execute_single_node(node_name, queued_at=queued_at)
+
+        for node_name in segment:
+            tasks[node_name] = asyncio.create_task(run_node(node_name))
+        try:
+            # Report transitions in segment order, as the sequential scheduler does
+            for node_name, next_node in zip(segment, segment[1:]):
+                await tasks[node_name]
+                await self._emit(
+                    WorkflowEventType.TRANSITION_EVALUATED,
+                    node_name,
+                    self.context,
+                    transition_from=node_name,
+                    transition_to=next_node,
+                )
+            await tasks[segment[-1]]
+        except BaseException:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return segment[-1]
+
+    async def _execute_parallel_nodes(
+        self, source_node_name: str, parallel_nodes: List[str], completed: List[str] | None = None
+    ) -> None:
+        """Execute nodes in true parallel, with proper cancellation and error handling.
 
-    async def _execute_parallel_nodes(self, source_node_name: str, parallel_nodes: List[str]) -> None:
-        """Execute nodes in true parallel, with proper cancellation and error handling."""
+        Each branch reads and writes its own copy-on-write overlay of the context, so
+        branches never observe each other's outputs. Once all branches succeed, their
+        writes are merged into the context in the order the branches were declared,
+        reporting keys written differently by several branches per `on_conflict`.
+
+        Branches listed in `completed` were finished before a resume and are skipped;
+        their outputs are already part of the restored context.
+        """
         if not parallel_nodes:
             return
+        completed = list(completed or [])
+        # A node may appear in several branches, so overlays are kept per branch position
+        overlays = [(node_name, ContextOverlay(self.context)) for node_name in parallel_nodes if node_name not in completed]
+        finished: Set[int] = set()
 
-        await self._notify_observers(
-            WorkflowEvent(
-                event_type=WorkflowEventType.PARALLEL_EXECUTION_STARTED,
-                node_name=source_node_name,
-                context=self.context,
-                parallel_nodes=parallel_nodes,
-            )
+        async def run_branch(node_name: str, overlay: ContextOverlay) -> Any:
+            result = await self._execute_single_node(node_name, overlay, queued_at)
+            completed.append(node_name)
+            finished.add(id(overlay))
+            if self.checkpointer is not None:
+                snapshot = dict(self.context)
+                for _, branch_overlay in overlays:
+                    if id(branch_overlay) in finished:
+                        branch_overlay.apply_to(snapshot)
+                self._save_checkpoint(
+                    None,
+                    context=snapshot,
+                    parallel_source=source_node_name,
+                    parallel_nodes=parallel_nodes,
+                    completed_branches=list(completed),
+                )
+            return result
+
+        await self._emit(
+            WorkflowEventType.PARALLEL_EXECUTION_STARTED,
+            source_node_name,
+            self.context,
+            parallel_nodes=parallel_nodes,
         )
 
-        tasks = [asyncio.create_task(self._execute_single_node(n)) for n in parallel_nodes]
+        queued_at = time.perf_counter()
+        tasks = [asyncio.create_task(run_branch(n, overlay)) for n, overlay in overlays]
         exception = None
         
         try:
@@ -162,6 +424,8 @@ class WorkflowEngine:
                     exception = result
                     raise exception
 
+            merge_overlays(self.context, overlays, self.on_conflict)
+
         except Exception as e:
             exception = e
             # If any task fails, we cancel any remaining tasks.
@@ -177,21 +441,64 @@ class WorkflowEngine:
                 if exception
                 else WorkflowEventType.PARALLEL_EXECUTION_COMPLETED
             )
-            await self._notify_observers(
-                WorkflowEvent(
-                    event_type=event_type,
-                    node_name=source_node_name,
-                    context=self.context,
-                    parallel_nodes=parallel_nodes,
-                    exception=exception,
-                )
+            await self._emit(
+                event_type,
+                source_node_name,
+                self.context,
+                parallel_nodes=parallel_nodes,
+                exception=exception,
             )
 
-    async def _execute_single_node(self, node_name: str) -> Any:
+    def _watch_stream(self, node_name: str, stream: TokenStream, context: MutableMapping) -> None:
+        """Report the chunks of a streaming node's output to observers, then start the stream."""
+
+        async def on_delta(delta: str) -> None:
+            await self._emit(WorkflowEventType.NODE_STREAM_DELTA, node_name, context, delta=delta)
+
+        async def on_complete(stream: TokenStream) -> None:
+            await self._emit(
+                WorkflowEventType.NODE_STREAM_COMPLETED,
+                node_name,
+                context,
+                result="".join(stream.chunks),
+                usage=stream.usage or None,
+                exception=stream.error,
+            )
+
+        stream.add_listener(on_delta, on_complete)
+        stream.start()
+
+    async def _lookup_node_cache(
+        self, node_name: str, node_func: Any, inputs: Dict[str, Any], context: MutableMapping
+    ) -> Tuple[bool, Any, str]:
+        """Look up a memoized node's result and report the hit or miss.
+
+        Returns:
+            Whether the result was cached, the cached result, and the key to store a new
+            result under.
+        """
+        node_cache = node_func.node_cache
+        cache_key = node_cache.make_key(node_name, node_func.cache_fingerprint(), inputs)
+        found, result = node_cache.lookup(cache_key)
+        await self._emit(
+            WorkflowEventType.NODE_CACHE_HIT if found else WorkflowEventType.NODE_CACHE_MISS,
+            node_name,
+            context,
+            result=result,
+        )
+        return found, result, cache_key
+
+    async def _execute_single_node(
+        self, node_name: str, context: MutableMapping | None = None, queued_at: float | None = None
+    ) -> Any:
         """Execute a single node with proper error handling and notifications.
         
         Args:
             node_name: Name of the node to execute
+            context: Context the node reads and writes; the engine's context by default,
+                the branch overlay inside a parallel block
+            queued_at: `time.perf_counter()` when the node became ready to run, for nodes
+                waiting on the event loop or a concurrency slot before they start
             
         Returns:
             Result of the node execution
@@ -199,109 +506,86 @@ class WorkflowEngine:
         Raises:
             NodeNotFoundError: If the node is not found (for parallel execution)
         """
+        if context is None:
+            context = self.context
         logger.info(f"Executing node: {node_name}")
-        await self._notify_observers(
-            WorkflowEvent(event_type=WorkflowEventType.NODE_STARTED, node_name=node_name, context=self.context)
-        )
+        await self._emit(WorkflowEventType.NODE_STARTED, node_name, context, queued_at=queued_at)
 
-        node_func = self.workflow.nodes.get(node_name)
+        plan = self.plan
+        node_func = plan.nodes.get(node_name)
         if not node_func:
             logger.error(f"Node {node_name} not found")
             exc = ValueError(f"Node {node_name} not found")
-            await self._notify_observers(
-                WorkflowEvent(
-                    event_type=WorkflowEventType.NODE_FAILED,
-                    node_name=node_name,
-                    context=self.context,
-                    exception=exc,
-                )
-            )
+            await self._emit(WorkflowEventType.NODE_FAILED, node_name, context, exception=exc)
             # For backward compatibility, we raise the exception so it can be caught by the caller
             raise exc
 
-        # ...existing input preparation code...
-        input_mappings = self.workflow.node_input_mappings.get(node_name, {})
-        inputs = {}
-        
-        # Process input mappings first
-        for key, mapping in input_mappings.items():
-            if callable(mapping):
-                inputs[key] = mapping(self.context)
-            elif isinstance(mapping, str) and mapping in self.context:
-                inputs[key] = self.context[mapping]
-            else:
-                inputs[key] = mapping
-
-        # Then, fill in any missing inputs from the context
-        for param in self.workflow.node_inputs.get(node_name, []):
-            if param not in inputs and param in self.context:
-                inputs[param] = self.context[param]
+        inputs = plan.input_resolvers[node_name](context)
+        if plan.streaming and node_name not in plan.stream_consumers:
+            inputs = await resolve_streams(inputs)
 
         result = None
         exception = None
+        is_sub_workflow = isinstance(node_func, SubWorkflowNode)
 
-        if isinstance(node_func, SubWorkflowNode):
-            await self._notify_observers(
-                WorkflowEvent(
-                    event_type=WorkflowEventType.SUB_WORKFLOW_ENTERED,
-                    node_name=node_name,
-                    context=self.context,
-                    sub_workflow_name=node_name,
-                )
+        if is_sub_workflow:
+            await self._emit(
+                WorkflowEventType.SUB_WORKFLOW_ENTERED,
+                node_name,
+                context,
+                sub_workflow_name=node_name,
             )
 
         try:
-            if isinstance(node_func, SubWorkflowNode):
-                result = await node_func(self)
+            if is_sub_workflow:
+                result = await node_func(self, context)
                 # If sub-workflow result is a dict with one item, unpack it to match test expectations.
                 if isinstance(result, dict) and len(result) == 1:
                     result = list(result.values())[0]
                 usage = None
             else:
-                result = await node_func(instance=self.instance, **inputs)
-                usage = getattr(node_func, "usage", None)
+                found, cached, cache_key = False, None, None
+                if node_name in plan.memoized:
+                    found, cached, cache_key = await self._lookup_node_cache(node_name, node_func, inputs, context)
+                if found:
+                    result, usage = cached, None
+                else:
+                    # Usage is captured per invocation, so concurrent calls of a node don't mix
+                    with capture_usage() as captured:
+                        if isinstance(node_func, MapNode):
+                            result = await node_func(self, context)
+                        else:
+                            result = await node_func(instance=self.instance, **inputs)
+                    usage = captured or None
+                    if node_name in plan.streaming and isinstance(result, TokenStream):
+                        self._watch_stream(node_name, result, context)
+                    elif cache_key is not None:
+                        node_func.node_cache.store(cache_key, result)
             
             # Update context with result
-            if node_name in self.workflow.node_outputs:
-                output_key = self.workflow.node_outputs[node_name]
+            if node_name in plan.outputs:
+                output_key = plan.outputs[node_name]
                 if output_key:
-                    self.context[output_key] = result
+                    context[output_key] = result
             elif isinstance(result, dict):
-                self.context.update(result)
+                context.update(result)
                 logger.debug(f"Updated context with {result} from node {node_name}")
             
-            await self._notify_observers(
-                WorkflowEvent(
-                    event_type=WorkflowEventType.NODE_COMPLETED,
-                    node_name=node_name,
-                    context=self.context,
-                    result=result,
-                    usage=usage,
-                )
-            )
+            await self._emit(WorkflowEventType.NODE_COMPLETED, node_name, context, result=result, usage=usage)
         except Exception as e:
             logger.error(f"Error executing node {node_name}: {e}")
             exception = e
-            await self._notify_observers(
-                WorkflowEvent(
-                    event_type=WorkflowEventType.NODE_FAILED,
-                    node_name=node_name,
-                    context=self.context,
-                    exception=e,
-                )
-            )
+            await self._emit(WorkflowEventType.NODE_FAILED, node_name, context, exception=e)
             raise
         finally:
-            if isinstance(node_func, SubWorkflowNode):
-                await self._notify_observers(
-                    WorkflowEvent(
-                        event_type=WorkflowEventType.SUB_WORKFLOW_EXITED,
-                        node_name=node_name,
-                        context=self.context,
-                        sub_workflow_name=node_name,
-                        result=result,
-                        exception=exception,
-                    )
+            if is_sub_workflow:
+                await self._emit(
+                    WorkflowEventType.SUB_WORKFLOW_EXITED,
+                    node_name,
+                    context,
+                    sub_workflow_name=node_name,
+                    result=result,
+                    exception=exception,
                 )
 
         return result
@@ -4,11 +4,14 @@ Core events module for workflow system.
 This module contains the event system components for workflow execution monitoring.
 """
 
-from collections.abc import Callable
+import asyncio
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+from loguru import logger
+
 
 class WorkflowEventType(Enum):
     """Defines the types of events that can occur during workflow execution."""
@@ -24,6 +27,10 @@ class WorkflowEventType(Enum):
     PARALLEL_EXECUTION_STARTED = "PARALLEL_EXECUTION_STARTED"
     PARALLEL_EXECUTION_COMPLETED = "PARALLEL_EXECUTION_COMPLETED"
     PARALLEL_EXECUTION_FAILED = "PARALLEL_EXECUTION_FAILED"
+    NODE_CACHE_HIT = "NODE_CACHE_HIT"
+    NODE_CACHE_MISS = "NODE_CACHE_MISS"
+    NODE_STREAM_DELTA = "NODE_STREAM_DELTA"
+    NODE_STREAM_COMPLETED = "NODE_STREAM_COMPLETED"
 
 
 class WorkflowEvent:
@@ -41,6 +48,8 @@ class WorkflowEvent:
         sub_workflow_name: Optional[str] = None,
         usage: Optional[Dict[str, Any]] = None,
         parallel_nodes: Optional[List[str]] = None,
+        queued_at: Optional[float] = None,
+        delta: Optional[str] = None,
     ):
         self.event_type = event_type
         self.node_name = node_name
@@ -52,6 +61,10 @@ class WorkflowEvent:
         self.sub_workflow_name = sub_workflow_name
         self.usage = usage
         self.parallel_nodes = parallel_nodes
+        # time.perf_counter() when a node started by a parallel block or the dataflow scheduler became ready to run
+        self.queued_at = queued_at
+        # Text chunk generated by a streaming node, on NODE_STREAM_DELTA
+        self.delta = delta
 
     def __repr__(self):
         return f"WorkflowEvent({self.event_type.value}, node={self.node_name}, ...)"
@@ -59,3 +72,47 @@ class WorkflowEvent:
 
 # Type alias for observer functions
 WorkflowObserver = Callable[[WorkflowEvent], None]
+
+
+class ObserverQueue:
+    """Bounded queue running async observer calls in order, off the engine's critical path.
+
+    The engine enqueues the coroutine of each async observer call and continues; a
+    single worker task awaits them one after the other. When the queue is full the
+    engine waits for room, so a slow observer slows the run down instead of growing
+    the queue without bound. Observers see the live context, which may have moved on
+    by the time they run.
+    """
+
+    def __init__(self, maxsize: int):
+        """Create a queue holding at most `maxsize` pending observer calls."""
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._worker: Optional[asyncio.Task] = None
+
+    async def put(self, call: Awaitable[Any]) -> None:
+        """Queue an observer call, waiting while the queue is full."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._deliver())
+        await self._queue.put(call)
+
+    async def _deliver(self) -> None:
+        while True:
+            call = await self._queue.get()
+            if call is None:
+                return
+            try:
+                await call
+            except Exception as e:
+                logger.error(f"Async observer failed: {e}")
+
+    async def drain(self) -> None:
+        """Wait until every queued observer call has run, then stop the worker."""
+        if self._worker is None:
+            return
+        worker, self._worker = self._worker, None
+        try:
+            await self._queue.put(None)
+            await worker
+        except asyncio.CancelledError:
+            worker.cancel()
+            raise
@@ -0,0 +1,140 @@
+"""
+Map node module.
+
+This module contains the MapNode class for running one registered node over every element
+of a list from the context, with bounded concurrency and per-item retries.
+"""
+
+import asyncio
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from .engine import WorkflowEngine
+
+
+class MapNode:
+    """A node that runs a registered node once per item of a context list.
+
+    Results are collected in item order. When a reducer node is set, it is called after
+    each item completes, in completion order, with `item_result` and `item_index` added to
+    its inputs; its output is written to the context like any node output, so it can fold
+    results incrementally while slower items are still running.
+    """
+
+    def __init__(
+        self,
+        node: str,
+        items: str,
+        output: str,
+        item_key: str = "item",
+        max_concurrency: int = 4,
+        retries: int = 0,
+        retry_delay: float = 0.0,
+        reducer: str | None = None,
+    ):
+        """Initialize a map node.
+
+        Args:
+            node: Name of the registered node to run for each item.
+            items: Context key holding the list to map over.
+            output: Context key for the list of results.
+            item_key: Input name under which each item is passed to the node.
+            max_concurrency: Maximum number of items processed at once.
+            retries: Extra attempts per item after a failure.
+            retry_delay: Seconds before the first retry, doubled on each further retry.
+            reducer: Optional registered node called as each item completes.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if retries < 0:
+            raise ValueError("retries cannot be negative")
+        self.node = node
+        self.items = items
+        self.output = output
+        self.item_key = item_key
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.reducer = reducer
+
+    @property
+    def inputs(self) -> List[str]:
+        """Context keys read by the map node: the item list and the node's other inputs."""
+        from ..nodes import Nodes
+
+        node_inputs = Nodes.NODE_REGISTRY[self.node][1] if self.node in Nodes.NODE_REGISTRY else []
+        return [self.items] + [name for name in node_inputs if name != self.item_key]
+
+    @staticmethod
+    def _resolve(name: str):
+        from ..nodes import Nodes
+
+        if name not in Nodes.NODE_REGISTRY:
+            raise ValueError(f"Node {name} not registered")
+        return Nodes.NODE_REGISTRY[name]
+
+    async def _run_item(self, func, shared: Dict[str, Any], instance: Any, index: int, item: Any) -> Any:
+        """Run the node on one item, retrying with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                return await func(instance=instance, **shared, **{self.item_key: item})
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.retry_delay * (2**attempt)
+                logger.warning(f"Map node {self.node} item {index} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def __call__(self, engine: "WorkflowEngine", context: MutableMapping | None = None) -> List[Any]:
+        """Map the node over a context list and return the ordered results.
+
+        `context` replaces the engine's context, e.g. with the overlay of a parallel branch.
+        """
+        context = engine.context if context is None else context
+        items = context.get(self.items)
+        if items is None:
+            raise ValueError(f"Map node input '{self.items}' not found in context")
+        items = list(items)
+        func, node_inputs, _ = self._resolve(self.node)
+        shared = {name: context[name] for name in node_inputs if name != self.item_key and name in context}
+        reducer = self._resolve(self.reducer) if self.reducer else None
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(index: int, item: Any):
+            async with semaphore:
+                return index, await self._run_item(func, shared, engine.instance, index, item)
+
+        results: List[Any] = [None] * len(items)
+        tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                results[index] = result
+                if reducer is not None:
+                    await self._reduce(engine, context, reducer, index, result)
+        except BaseException:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        logger.debug(f"Map node {self.node} processed {len(items)} items")
+        return results
+
+    async def _reduce(
+        self, engine: "WorkflowEngine", context: MutableMapping, reducer, index: int, result: Any
+    ) -> None:
+        """Feed one completed item to the reducer node and store its output in the context."""
+        reducer_func, reducer_inputs, reducer_output = reducer
+        kwargs = {name: context[name] for name in reducer_inputs if name in context}
+        if "item_result" in reducer_inputs:
+            kwargs["item_result"] = result
+        if "item_index" in reducer_inputs:
+            kwargs["item_index"] = index
+        reduced = await reducer_func(instance=engine.instance, **kwargs)
+        if reducer_output:
+            context[reducer_output] = reduced
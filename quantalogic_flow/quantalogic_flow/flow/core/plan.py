@@ -0,0 +1,117 @@
+"""
+Execution plan module.
+
+This module compiles a workflow definition into the lookup tables the engine needs at
+every step: the parallel block each node belongs to, successor tables, output keys and
+pre-bound input resolvers. `Workflow.build()` compiles the plan once, so running a node
+costs a few dictionary lookups instead of scans over the definition.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+Transition = Tuple[str, Optional[Callable[[Dict[str, Any]], bool]]]
+InputResolver = Callable[[Mapping[str, Any]], Dict[str, Any]]
+
+
+def resolve_inputs(mapped: Tuple[Tuple[str, Any], ...], unmapped: Tuple[str, ...], context: Mapping[str, Any]) -> Dict[str, Any]:
+    """Collect a node's inputs from the context.
+
+    Mapped inputs come first: a callable mapping is called with the context, a string
+    naming a context key reads that key, and anything else is passed as a literal.
+    Declared inputs without a mapping are then read from the context when present.
+    """
+    inputs = {}
+    for key, mapping in mapped:
+        if callable(mapping):
+            inputs[key] = mapping(context)
+        elif isinstance(mapping, str) and mapping in context:
+            inputs[key] = context[mapping]
+        else:
+            inputs[key] = mapping
+    for param in unmapped:
+        if param in context:
+            inputs[param] = context[param]
+    return inputs
+
+
+def make_input_resolver(mappings: Dict[str, Any], params: List[str]) -> InputResolver:
+    """Bind a node's input mappings and declared inputs into a function of the context."""
+    mapped = tuple(mappings.items()) if mappings else ()
+    unmapped = tuple([param for param in params if param not in mappings])
+    return partial(resolve_inputs, mapped, unmapped)
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Immutable lookup tables compiled from a workflow definition.
+
+    Later changes to the workflow are not reflected; compile a new plan to run them.
+    `memoized` holds the nodes whose results are cached by the engine, `streaming` the
+    nodes returning a `TokenStream` and `stream_consumers` the nodes reading streams
+    chunk by chunk instead of waiting for their text.
+    """
+
+    nodes: Mapping[str, Any]
+    successors: Mapping[str, Tuple[Transition, ...]]
+    parallel_blocks: Mapping[str, Tuple[str, ...]]
+    parallel_sources: FrozenSet[str]
+    parallel_source_of: Mapping[str, str]
+    convergence_nodes: Mapping[str, str]
+    outputs: Mapping[str, Optional[str]]
+    input_resolvers: Mapping[str, InputResolver]
+    memoized: FrozenSet[str]
+    streaming: FrozenSet[str]
+    stream_consumers: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, workflow: Workflow) -> ExecutionPlan:
+        """Compile the current definition of `workflow`."""
+        successors = {node: tuple(transitions) for node, transitions in workflow.transitions.items()}
+        parallel_blocks = {source: tuple(nodes) for source, nodes in workflow.parallel_blocks.items()}
+
+        # A node in several blocks belongs to the first one declared, as in Workflow.get_parallel_source_for_node
+        parallel_source_of: Dict[str, str] = {}
+        for source, nodes in parallel_blocks.items():
+            for node in nodes:
+                parallel_source_of.setdefault(node, source)
+
+        # Sources of declared parallel blocks, and nodes with several unconditional transitions
+        parallel_sources = set(parallel_blocks)
+        for node, transitions in successors.items():
+            if len([target for target, condition in transitions if condition is None]) > 1:
+                parallel_sources.add(node)
+
+        input_resolvers = {
+            name: make_input_resolver(workflow.node_input_mappings.get(name, {}), workflow.node_inputs.get(name, []))
+            for name in workflow.nodes
+        }
+
+        return cls(
+            nodes=MappingProxyType(dict(workflow.nodes)),
+            successors=MappingProxyType(successors),
+            parallel_blocks=MappingProxyType(parallel_blocks),
+            parallel_sources=frozenset(parallel_sources),
+            parallel_source_of=MappingProxyType(parallel_source_of),
+            convergence_nodes=MappingProxyType(dict(workflow.convergence_nodes)),
+            outputs=MappingProxyType(dict(workflow.node_outputs)),
+            input_resolvers=MappingProxyType(input_resolvers),
+            memoized=frozenset(name for name, func in workflow.nodes.items() if getattr(func, "node_cache", None)),
+            streaming=frozenset(name for name, func in workflow.nodes.items() if getattr(func, "streaming", False)),
+            stream_consumers=frozenset(
+                name for name, func in workflow.nodes.items() if getattr(func, "stream_consumer", False)
+            ),
+        )
+
+    def parallel_nodes_from(self, source: str) -> Tuple[str, ...]:
+        """Return the branches started by a parallel source node."""
+        if source in self.parallel_blocks:
+            return self.parallel_blocks[source]
+        return tuple(node for node, condition in self.successors.get(source, ()) if condition is None)
@@ -4,6 +4,7 @@ Sub-workflow support module.
 This module contains the SubWorkflowNode class for embedding workflows within workflows.
 """
 
+from collections.abc import MutableMapping
 from typing import TYPE_CHECKING, Any, Dict
 
 if TYPE_CHECKING:
@@ -20,16 +21,25 @@ class SubWorkflowNode:
         self.inputs = inputs
         self.output = output
 
-    async def __call__(self, engine: "WorkflowEngine"):
-        """Execute the sub-workflow with the engine's context using inputs mapping."""
+    async def __call__(self, engine: "WorkflowEngine", context: MutableMapping | None = None):
+        """Execute the sub-workflow with the engine's context using inputs mapping.
+
+        `context` replaces the engine's context, e.g. with the overlay of a parallel branch.
+        """
+        context = engine.context if context is None else context
         sub_context = {}
         for sub_key, mapping in self.inputs.items():
             if callable(mapping):
-                sub_context[sub_key] = mapping(engine.context)
+                sub_context[sub_key] = mapping(context)
             elif isinstance(mapping, str):
-                sub_context[sub_key] = engine.context.get(mapping)
+                sub_context[sub_key] = context.get(mapping)
             else:
                 sub_context[sub_key] = mapping
-        sub_engine = self.sub_workflow.build(instance=engine.instance)
+        sub_engine = self.sub_workflow.build(
+            instance=engine.instance,
+            scheduler=engine.scheduler,
+            max_concurrency=engine.max_concurrency,
+            on_conflict=engine.on_conflict,
+        )
         result = await sub_engine.run(sub_context)
         return result
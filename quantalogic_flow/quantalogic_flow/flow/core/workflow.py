@@ -6,14 +6,16 @@ This module contains the Workflow class for defining and building workflows.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
 
 from loguru import logger
 
-from .events import WorkflowObserver
+from .events import WorkflowEventType, WorkflowObserver
+from .plan import ExecutionPlan
 from .sub_workflow import SubWorkflowNode
 
 if TYPE_CHECKING:
+    from ..rate_limit import RateLimiter
     from .engine import WorkflowEngine
 
 
@@ -42,6 +44,9 @@ class Workflow:
         self.branch_nodes: List[str] = []
         self.branch_source_node: str | None = None
         self._observers: List[WorkflowObserver] = []
+        self._event_filters: Dict[int, FrozenSet[WorkflowEventType]] = {}
+        # Limits applied to the LLM calls of every engine built from the workflow
+        self.rate_limiter: RateLimiter | None = None
         self.loop_stack: List[Tuple[str, List[str]]] = []
         self.loop_nodes: List[str] = []
         self.node_inputs: Dict[str, List[str]] = {}
@@ -329,11 +334,36 @@ class Workflow:
             self.transitions.setdefault(from_node, []).append((node_name, None))
         return self
 
-    def add_observer(self, observer: WorkflowObserver) -> Workflow:
+    def map(self, name: str, node: str, items: str, output: str, **options: Any) -> Workflow:
+        """Run a registered node over every element of a context list, as the next step.
+
+        Args:
+            name: Name of the map node.
+            node: Name of the registered node to run for each item.
+            items: Context key holding the list to map over.
+            output: Context key for the ordered list of results.
+            **options: item_key, max_concurrency, retries, retry_delay and reducer, see `MapNode`.
+
+        Returns:
+            Self for method chaining.
+        """
+        # Import here to avoid circular imports
+        from ..nodes import Nodes
+
+        Nodes.map_node(name, node, items, output, **options)
+        return self.then(name)
+
+    def add_observer(
+        self, observer: WorkflowObserver, event_types: Iterable[WorkflowEventType] | None = None
+    ) -> Workflow:
         """Add an event observer callback to the workflow.
 
+        Events are only built for the types some observer subscribed to, so observers
+        that need a few event types should name them.
+
         Args:
             observer: Callable to handle workflow events.
+            event_types: Event types the observer subscribes to; all events when None.
 
         Returns:
             Self for method chaining.
@@ -341,6 +371,10 @@ class Workflow:
         if observer not in self._observers:
             self._observers.append(observer)
             logger.debug(f"Added observer to workflow: {observer}")
+        if event_types is None:
+            self._event_filters.pop(id(observer), None)
+        else:
+            self._event_filters[id(observer)] = frozenset(event_types)
         return self
 
     def add_sub_workflow(
@@ -452,8 +486,22 @@ class Workflow:
         self.loop_entry_node = None # Reset after loop is defined
         return self
 
-    def build(self, **kwargs) -> WorkflowEngine:
-        """Build an executable engine from the workflow."""
+    def build(
+        self, precompile_templates: bool = False, plan: ExecutionPlan | None = None, **kwargs
+    ) -> WorkflowEngine:
+        """Build an executable engine from the workflow.
+
+        The workflow is compiled into an `ExecutionPlan` the engine runs from, so changes
+        made to the workflow afterwards only apply to engines built later.
+
+        Args:
+            precompile_templates: Compile the prompt and template files of the workflow's nodes
+                into the template cache now instead of on first use.
+            plan: A plan compiled earlier from this workflow, reused instead of compiling
+                it again, e.g. when building one engine per run of many runs.
+            **kwargs: Options of `WorkflowEngine`, such as `scheduler` or `checkpointer`.
+                `rate_limiter` defaults to the workflow's `rate_limiter`.
+        """
         # Import here to avoid circular imports
         from .engine import WorkflowEngine
 
@@ -461,8 +509,29 @@ class Workflow:
         self.is_parallel = False
         self.parallel_source_node = None
 
+        if precompile_templates:
+            self._precompile_templates()
+
+        kwargs.setdefault("rate_limiter", self.rate_limiter)
         return WorkflowEngine(
             workflow=self,
             observers=self._observers,
+            event_filters=self._event_filters,
+            plan=plan if plan is not None else ExecutionPlan.compile(self),
             **kwargs
         )
+
+    def _precompile_templates(self) -> None:
+        """Compile the templates declared by the workflow's nodes into the template cache."""
+        from ..template import TemplateEngine
+
+        compiled = 0
+        for name, func in self.nodes.items():
+            for template, template_file in getattr(func, "template_sources", ()):
+                if template or template_file:
+                    try:
+                        TemplateEngine.precompile(template, template_file)
+                    except Exception as e:
+                        raise ValueError(f"Failed to precompile template for node {name}: {e}") from e
+                    compiled += 1
+        logger.debug(f"Precompiled {compiled} templates")
@@ -103,7 +103,7 @@ async def example_workflow():
     workflow = (
         Workflow("validate_order")
         .add_observer(progress_monitor)
-        .add_observer(token_observer)
+        .add_observer(token_observer, event_types=[WorkflowEventType.NODE_COMPLETED])
         .node("validate_order", inputs_mapping={"order": "customer_order"})
         .node("transform_items")
         .node("format_order_message", inputs_mapping={
@@ -24,6 +24,7 @@ from loguru import logger
 
 # Import all components from the modular structure
 from .core import (
+    MapNode,
     SubWorkflowNode,
     Workflow,
     WorkflowEngine,
@@ -38,7 +39,7 @@ from .template import TEMPLATES_DIR, get_template_path
 # Re-export everything to maintain API compatibility
 __all__ = [
     'WorkflowEventType', 'WorkflowEvent', 'WorkflowObserver',
-    'SubWorkflowNode', 'WorkflowEngine', 'Workflow', 
+    'SubWorkflowNode', 'MapNode', 'WorkflowEngine', 'Workflow', 
     'Nodes', 'get_template_path', 'TEMPLATES_DIR',
     'example_workflow'
 ]
@@ -8,6 +8,7 @@ from quantalogic_flow.flow.flow_manager import WorkflowManager
 from quantalogic_flow.flow.flow_manager_schema import (
     BranchCondition,
     FunctionDefinition,
+    MapConfig,
     NodeDefinition,
     TemplateConfig,
     TransitionDefinition,
@@ -182,6 +183,7 @@ class WorkflowExtractor(ast.NodeVisitor):
                             "presence_penalty",
                             "frequency_penalty",
                             "output",
+                            "stream",
                         ]
                     }
                     self.nodes[func_name] = {
@@ -251,6 +253,10 @@ class WorkflowExtractor(ast.NodeVisitor):
                     logger.debug(f"Registered transform node '{func_name}' with output '{output}'")
                 else:
                     logger.warning(f"Unsupported decorator 'Nodes.{decorator_name}' in function '{func_name}'")
+                if kwargs.get("memoize") is True and func_name in self.nodes:
+                    self.nodes[func_name]["memoize"] = True
+                if kwargs.get("stream_consumer") is True and func_name in self.nodes:
+                    self.nodes[func_name]["stream_consumer"] = True
 
                 func_code = ast.unparse(node)
                 self.functions[func_name] = {
@@ -345,6 +351,7 @@ class WorkflowExtractor(ast.NodeVisitor):
                             "presence_penalty",
                             "frequency_penalty",
                             "output",
+                            "stream",
                         ]
                     }
                     self.nodes[func_name] = {
@@ -414,6 +421,10 @@ class WorkflowExtractor(ast.NodeVisitor):
                     logger.debug(f"Registered transform node '{func_name}' with output '{output}'")
                 else:
                     logger.warning(f"Unsupported decorator 'Nodes.{decorator_name}' in function '{func_name}'")
+                if kwargs.get("memoize") is True and func_name in self.nodes:
+                    self.nodes[func_name]["memoize"] = True
+                if kwargs.get("stream_consumer") is True and func_name in self.nodes:
+                    self.nodes[func_name]["stream_consumer"] = True
 
                 func_code = ast.unparse(node)
                 self.functions[func_name] = {
@@ -425,14 +436,47 @@ class WorkflowExtractor(ast.NodeVisitor):
 
         self.generic_visit(node)
 
+    def _register_map_node(self, call_node, name, args):
+        """Record a map node from `Nodes.map_node(...)` or `Workflow.map(...)` arguments.
+
+        Args:
+            call_node: The ast.Call node.
+            name: Name of the map node.
+            args: Remaining positional arguments, in (node, items, output) order.
+        """
+        options = dict(zip(["node", "items", "output"], [a.value for a in args if isinstance(a, ast.Constant)]))
+        for kw in call_node.keywords:
+            if kw.arg and isinstance(kw.value, ast.Constant):
+                options[kw.arg] = kw.value.value
+        output = options.pop("output", None)
+        self.nodes[name] = {
+            "type": "map",
+            "map_config": options,
+            "inputs": [options.get("items")],
+            "output": output,
+        }
+        logger.debug(f"Registered map node '{name}' with config: {options}")
+
     def visit_Expr(self, node):
         """Handle expression statements, particularly workflow method calls."""
         if isinstance(node.value, ast.Call):
+            func = node.value.func
+            if (
+                isinstance(func, ast.Attribute)
+                and func.attr == "map_node"
+                and isinstance(func.value, ast.Name)
+                and func.value.id == "Nodes"
+            ):
+                args = list(node.value.args)
+                name_kw = next((kw.value for kw in node.value.keywords if kw.arg == "name"), None)
+                name_arg = args.pop(0) if args else name_kw
+                if isinstance(name_arg, ast.Constant):
+                    self._register_map_node(node.value, name_arg.value, args)
             # Check if this is a workflow method call
             if isinstance(node.value.func, ast.Attribute):
                 # Look for calls like workflow.then(), workflow.parallel(), etc.
                 attr_name = node.value.func.attr
-                if attr_name in ["start", "then", "parallel", "branch", "converge", "add_observer", "node", "start_loop", "end_loop"]:
+                if attr_name in ["start", "then", "parallel", "branch", "converge", "add_observer", "node", "start_loop", "end_loop", "map"]:
                     # Find the workflow variable name by checking if the object is a Name node
                     if isinstance(node.value.func.value, ast.Name):
                         workflow_var = node.value.func.value.id
@@ -558,6 +602,15 @@ class WorkflowExtractor(ast.NodeVisitor):
                 }
                 logger.debug(f"Added workflow node: {node_name} with inputs_mapping: {inputs_mapping}")
         
+        elif method_name == "map":
+            map_name = call_node.args[0].value if call_node.args else None
+            if map_name:
+                self._register_map_node(call_node, map_name, call_node.args[1:])
+                from_node = self.current_node if self.current_node else self.start_node
+                if from_node:
+                    self.transitions.append(TransitionDefinition(from_node=from_node, to_node=map_name))
+                self.current_node = map_name
+
         elif method_name == "start_loop":
             from_node = self.current_node if self.current_node else self.start_node
             if from_node is None:
@@ -830,6 +883,19 @@ class WorkflowExtractor(ast.NodeVisitor):
                         logger.debug(f"Added '{node_name}' to active loops in '{var_name}'")
                 return node_name
 
+            elif method_name == "map":
+                map_name = expr.args[0].value if expr.args else None
+                if map_name:
+                    self._register_map_node(expr, map_name, expr.args[1:])
+                    if previous_node:
+                        self.transitions.append(TransitionDefinition(from_node=previous_node, to_node=map_name))
+                        logger.debug(f"Added map transition: {previous_node} -> {map_name}")
+                    if self._is_in_loop():
+                        for loop_data in self.loop_stack:
+                            if map_name not in loop_data["nodes"]:
+                                loop_data["nodes"].append(map_name)
+                return map_name
+
             elif method_name == "add_sub_workflow":
                 sub_wf_name = expr.args[0].value if expr.args else None
                 sub_wf_obj = expr.args[1] if len(expr.args) > 1 else None
@@ -1082,6 +1148,8 @@ def extract_workflow_from_file(file_path):
                 delay=1.0,
                 timeout=None,
                 parallel=False,
+                memoize=node_info.get("memoize", False),
+                stream_consumer=node_info.get("stream_consumer", False),
             )
         elif node_info["type"] == "llm":
             llm_config = LLMConfig(**node_info["llm_config"])
@@ -1093,6 +1161,7 @@ def extract_workflow_from_file(file_path):
                 delay=1.0,
                 timeout=None,
                 parallel=False,
+                memoize=node_info.get("memoize", False),
             )
         elif node_info["type"] == "structured_llm":
             llm_config = LLMConfig(**node_info["llm_config"])
@@ -1104,6 +1173,7 @@ def extract_workflow_from_file(file_path):
                 delay=1.0,
                 timeout=None,
                 parallel=False,
+                memoize=node_info.get("memoize", False),
             )
         elif node_info["type"] == "template":
             template_config = TemplateConfig(**node_info["template_config"])
@@ -1115,6 +1185,16 @@ def extract_workflow_from_file(file_path):
                 delay=1.0,
                 timeout=None,
                 parallel=False,
+                memoize=node_info.get("memoize", False),
+            )
+        elif node_info["type"] == "map":
+            nodes[name] = NodeDefinition(
+                map_config=MapConfig(**node_info["map_config"]),
+                output=node_info["output"],
+                retries=3,
+                delay=1.0,
+                timeout=None,
+                parallel=False,
             )
         elif node_info["type"] == "sub_workflow":
             nodes[name] = NodeDefinition(
@@ -1182,6 +1262,9 @@ def print_workflow_definition(workflow_def):
         elif node.sub_workflow:
             print("  Type: Sub-Workflow")
             print(f"  Start Node: {node.sub_workflow.start}")
+        elif node.map_config:
+            print("  Type: Map")
+            print(f"  Node: {node.map_config.node} over {node.map_config.items}")
         if node.inputs_mapping:
             print(f"  Inputs Mapping: {node.inputs_mapping}")
         print(f"  Output: {node.output or 'None'}")
@@ -138,7 +138,10 @@ def generate_executable_script(
         f.write("import anyio\n")
         f.write("from typing import List\n")
         f.write("from loguru import logger\n")
-        f.write("from quantalogic_flow.flow import Nodes, Workflow\n\n")
+        if workflow_def.rate_limits is not None and workflow_def.rate_limits.models:
+            f.write("from quantalogic_flow.flow import Nodes, RateLimiter, Workflow\n\n")
+        else:
+            f.write("from quantalogic_flow.flow import Nodes, Workflow\n\n")
 
         # Global variables
         for var_name, value in global_vars.items():
@@ -174,6 +177,10 @@ def generate_executable_script(
                     value = getattr(node_def.llm_config, param, None)
                     if value is not None:
                         params.append(f"{param}={repr(value)}")
+                if node_def.memoize:
+                    params.append("memoize=True")
+                if node_def.llm_config.stream:
+                    params.append("stream=True")
                 decorator = f"@Nodes.llm_node({', '.join(params)})\n"
                 func_body = f"def {node_name}(input):\n    pass\n"
                 
@@ -185,6 +192,8 @@ def generate_executable_script(
                     params.append(f"template={repr(node_def.template_config.template)}")
                 if node_def.template_config.template_file:
                     params.append(f"template_file={repr(node_def.template_config.template_file)}")
+                if node_def.memoize:
+                    params.append("memoize=True")
                 decorator = f"@Nodes.template_node({', '.join(params)})\n"
                 func_body = f"def {node_name}(input):\n    pass\n"
                 
@@ -208,11 +217,34 @@ def generate_executable_script(
                             mapping_dict[key] = value
                         params.append(f"inputs_mapping={repr(mapping_dict)}")
                     
+                    if node_def.memoize:
+                        params.append("memoize=True")
+                    if node_def.stream_consumer:
+                        params.append("stream_consumer=True")
                     decorator = f"@Nodes.define({', '.join(params)})\n"
             
             if decorator and func_body:
                 f.write(f"{decorator}{func_body}\n\n")
 
+        # Register map nodes once the nodes they wrap are defined
+        for node_name, node_def in workflow_def.nodes.items():
+            if node_def.map_config:
+                map_config = node_def.map_config
+                default_output = f"{node_name}_result"
+                params = [
+                    repr(node_name),
+                    f"node={repr(map_config.node)}",
+                    f"items={repr(map_config.items)}",
+                    f"output={repr(node_def.output or default_output)}",
+                    f"item_key={repr(map_config.item_key)}",
+                    f"max_concurrency={map_config.max_concurrency}",
+                    f"retries={map_config.retries}",
+                    f"retry_delay={map_config.retry_delay}",
+                ]
+                if map_config.reducer:
+                    params.append(f"reducer={repr(map_config.reducer)}")
+                f.write(f"Nodes.map_node({', '.join(params)})\n\n")
+
         # Define workflow using chaining syntax with loop support
         f.write("# Define the workflow with branch, converge, and loop support\n")
         f.write("workflow = (\n")
@@ -326,6 +358,16 @@ def generate_executable_script(
                 f.write(f"    .add_observer({observer})\n")
         f.write(")\n\n")
 
+        rate_limits = workflow_def.rate_limits
+        if rate_limits is not None and rate_limits.models:
+            models = {model: limits.model_dump(exclude_none=True) for model, limits in rate_limits.models.items()}
+            options = rate_limits.model_dump(exclude={"models"})
+            f.write("workflow.rate_limiter = RateLimiter.from_model_limits(\n")
+            f.write(f"    {models!r},\n")
+            for key, value in options.items():
+                f.write(f"    {key}={value!r},\n")
+            f.write(")\n\n")
+
         # Main function
         f.write("async def main():\n")
         f.write('    """Main function to run the workflow."""\n')
@@ -19,12 +19,17 @@ from quantalogic_flow.flow.flow_manager_schema import (
     BranchCondition,
     FunctionDefinition,
     LLMConfig,
+    MapConfig,
+    ModelRateLimit,
     NodeDefinition,
+    RateLimitConfig,
     TemplateConfig,
     TransitionDefinition,
     WorkflowDefinition,
     WorkflowStructure,
 )
+from quantalogic_flow.flow.profiler import WorkflowProfiler
+from quantalogic_flow.flow.rate_limit import RateLimiter
 
 
 class WorkflowManager:
@@ -70,10 +75,14 @@ class WorkflowManager:
         delay: float = 1.0,
         timeout: float | None = None,
         parallel: bool = False,
+        map_config: Dict[str, Any] | None = None,
+        memoize: bool = False,
+        stream_consumer: bool = False,
     ) -> None:
         """Add a new node to the workflow definition with support for template nodes and inputs mapping."""
         llm_config_obj = LLMConfig(**llm_config) if llm_config is not None else None
         template_config_obj = TemplateConfig(**template_config) if template_config is not None else None
+        map_config_obj = MapConfig(**map_config) if map_config is not None else None
         
         serializable_inputs_mapping = {}
         if inputs_mapping:
@@ -96,12 +105,15 @@ class WorkflowManager:
             sub_workflow=sub_workflow,
             llm_config=llm_config_obj,
             template_config=template_config_obj,
+            map_config=map_config_obj,
             inputs_mapping=serializable_inputs_mapping,
-            output=output or (f"{name}_result" if function or llm_config or template_config else None),
+            output=output or (f"{name}_result" if function or llm_config or template_config or map_config else None),
             retries=retries,
             delay=delay,
             timeout=timeout,
             parallel=parallel,
+            memoize=memoize,
+            stream_consumer=stream_consumer,
         )
         self.workflow.nodes[name] = node
 
@@ -260,6 +272,36 @@ class WorkflowManager:
             self.workflow.observers.append(observer_name)
             logger.debug(f"Added observer '{observer_name}' to workflow")
 
+    def set_rate_limit(
+        self,
+        model: str = "*",
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_concurrency: int | None = None,
+    ) -> None:
+        """Set the limits on the LLM calls made to a model, "*" for models without their own limits."""
+        if self.workflow.rate_limits is None:
+            self.workflow.rate_limits = RateLimitConfig()
+        self.workflow.rate_limits.models[model] = ModelRateLimit(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrency=max_concurrency,
+        )
+        logger.debug(f"Set rate limit for model '{model}'")
+
+    def _rate_limiter(self) -> RateLimiter | None:
+        """Create the rate limiter declared by the workflow definition, if any."""
+        config = self.workflow.rate_limits
+        if config is None or not config.models:
+            return None
+        return RateLimiter.from_model_limits(
+            {model: limits.model_dump() for model, limits in config.models.items()},
+            adaptive=config.adaptive,
+            max_retries=config.max_retries,
+            backoff_base=config.backoff_base,
+            backoff_max=config.backoff_max,
+        )
+
     def _resolve_model(self, model_str: str) -> Type[BaseModel]:
         """Resolve a string to a Pydantic model class for structured_llm_node."""
         try:
@@ -363,7 +405,9 @@ class WorkflowManager:
                 inputs = [param.name for param in sig.parameters.values() if param.name not in ['self', 'instance']]
                 
                 Nodes.NODE_REGISTRY[node_name] = (
-                    Nodes.define(output=node_def.output)(func),
+                    Nodes.define(
+                        output=node_def.output, memoize=node_def.memoize, stream_consumer=node_def.stream_consumer
+                    )(func),
                     inputs,
                     node_def.output
                 )
@@ -409,6 +453,7 @@ class WorkflowManager:
                         presence_penalty=llm_config.presence_penalty,
                         frequency_penalty=llm_config.frequency_penalty,
                         api_key=llm_config.api_key,
+                        memoize=node_def.memoize,
                     )(dummy_func)
                 else:
                     decorated_func = Nodes.llm_node(
@@ -424,6 +469,8 @@ class WorkflowManager:
                         presence_penalty=llm_config.presence_penalty,
                         frequency_penalty=llm_config.frequency_penalty,
                         api_key=llm_config.api_key,
+                        memoize=node_def.memoize,
+                        stream=llm_config.stream,
                     )(dummy_func)
 
                 Nodes.NODE_REGISTRY[node_name] = (decorated_func, inputs_list, node_def.output or f"{node_name}_result")
@@ -440,12 +487,30 @@ class WorkflowManager:
                     output=node_def.output or f"{node_name}_result",
                     template=template_config.template,
                     template_file=template_config.template_file,
+                    memoize=node_def.memoize,
                 )(dummy_template_func)
 
                 Nodes.NODE_REGISTRY[node_name] = (decorated_func, ["rendered_content"] + inputs_list, node_def.output or f"{node_name}_result")
 
+        # Map nodes wrap other nodes, so they are registered once those exist
+        for node_name, node_def in self.workflow.nodes.items():
+            if node_def.map_config:
+                map_config = node_def.map_config
+                Nodes.map_node(
+                    node_name,
+                    node=map_config.node,
+                    items=map_config.items,
+                    output=node_def.output or f"{node_name}_result",
+                    item_key=map_config.item_key,
+                    max_concurrency=map_config.max_concurrency,
+                    retries=map_config.retries,
+                    retry_delay=map_config.retry_delay,
+                    reducer=map_config.reducer,
+                )
+
         # Create the Workflow instance after all nodes are registered
         wf = Workflow(start_node=start_node_name)
+        wf.rate_limiter = self._rate_limiter()
 
         for observer_name in self.workflow.observers:
             if observer_name not in functions:
@@ -632,9 +697,26 @@ class WorkflowManager:
         
         return result
 
-    def execute_workflow(self, workflow_def: WorkflowDefinition, initial_context: Dict[str, Any]) -> Any:
-        """Execute a workflow with initial context."""
-        engine = WorkflowEngine(workflow_def)
+    def execute_workflow(
+        self,
+        workflow_def: WorkflowDefinition,
+        initial_context: Dict[str, Any],
+        profile: Union[bool, WorkflowProfiler] = False,
+        trace_file: Union[str, Path, None] = None,
+    ) -> Any:
+        """Execute a workflow with initial context.
+
+        Args:
+            workflow_def: Definition of the workflow to run.
+            initial_context: Initial context of the run.
+            profile: Profile the run and log a summary table of it. Pass a
+                `WorkflowProfiler` to keep the recorded profile.
+            trace_file: Path to write a Chrome trace of the run to; implies `profile`.
+        """
+        profiler = profile if isinstance(profile, WorkflowProfiler) else None
+        if profiler is None and (profile or trace_file):
+            profiler = WorkflowProfiler()
+        engine = WorkflowEngine(workflow_def) if profiler is None else WorkflowEngine(workflow_def, profiler=profiler)
         
         # Get the result from engine.run()
         result = engine.run(initial_context)
@@ -649,22 +731,26 @@ class WorkflowManager:
                 asyncio.set_event_loop(loop)
             
             try:
-                return loop.run_until_complete(result)
+                result = loop.run_until_complete(result)
             except Exception:
                 # If loop is already running or coroutine is exhausted, 
                 # create a new engine and run in a separate thread
                 import concurrent.futures
                 
                 async def run_workflow():
-                    new_engine = WorkflowEngine(workflow_def)
+                    new_engine = WorkflowEngine(workflow_def, profiler=profiler)
                     return await new_engine.run(initial_context)
                 
                 with concurrent.futures.ThreadPoolExecutor() as executor:
                     future = executor.submit(asyncio.run, run_workflow())
-                    return future.result()
-        else:
-            # If it's a direct return value (like from a mock), return it directly
-            return result
+                    result = future.result()
+        # Otherwise it's a direct return value (like from a mock), returned as is
+
+        if profiler is not None:
+            logger.info(f"Workflow profile:\n{profiler.summary()}")
+            if trace_file:
+                profiler.save_chrome_trace(trace_file)
+        return result
 
     def get_workflow_dependencies(self, workflow: WorkflowDefinition) -> List[str]:
         """Get the dependencies of a workflow."""
@@ -847,13 +933,16 @@ class WorkflowManager:
 class WorkflowEngine:
     """Simple workflow engine for test compatibility."""
     
-    def __init__(self, workflow_def: WorkflowDefinition):
+    def __init__(self, workflow_def: WorkflowDefinition, profiler: WorkflowProfiler | None = None):
         self.workflow_def = workflow_def
+        self.profiler = profiler
     
     async def run(self, initial_context: Dict[str, Any]) -> Any:
         """Run the workflow."""
         manager = WorkflowManager(self.workflow_def)
         wf = manager.instantiate_workflow()
+        if self.profiler is not None:
+            self.profiler.attach(wf)
         engine = wf.build()
         return await engine.run(initial_context)
 
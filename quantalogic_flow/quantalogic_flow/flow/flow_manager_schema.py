@@ -94,6 +94,10 @@ class LLMConfig(BaseModel):
         description="Path to a Pydantic model for structured output (e.g., 'my_module:OrderDetails')."
     )
     api_key: Optional[str] = Field(None, description="Custom API key for the LLM provider, if required.")
+    stream: bool = Field(
+        default=False,
+        description="Stream the generated text to stream consumer nodes and observers (plain text output only).",
+    )
 
     @model_validator(mode="before")
     @classmethod
@@ -149,6 +153,21 @@ class TemplateConfig(BaseModel):
         return data
 
 
+class MapConfig(BaseModel):
+    """Configuration for map nodes that run one node over every item of a list."""
+    node: str = Field(..., description="Name of the node to run for each item.")
+    items: str = Field(..., description="Context key holding the list to map over.")
+    item_key: str = Field(default="item", description="Input name under which each item is passed to the node.")
+    max_concurrency: int = Field(default=4, ge=1, description="Maximum number of items processed at once.")
+    retries: int = Field(default=0, ge=0, description="Extra attempts per item after a failure.")
+    retry_delay: float = Field(
+        default=0.0, ge=0.0, description="Seconds before the first retry, doubled on each further retry."
+    )
+    reducer: Optional[str] = Field(
+        None, description="Optional node called with 'item_result' and 'item_index' as each item completes."
+    )
+
+
 class NodeDefinition(BaseModel):
     """Definition of a workflow node with template_node and inputs_mapping support."""
     
@@ -162,6 +181,7 @@ class NodeDefinition(BaseModel):
     )
     llm_config: Optional[LLMConfig] = Field(None, description="Configuration for LLM-based nodes.")
     template_config: Optional[TemplateConfig] = Field(None, description="Configuration for template-based nodes.")
+    map_config: Optional[MapConfig] = Field(None, description="Configuration for map nodes.")
     inputs_mapping: Optional[Dict[str, str]] = Field(
         None,
         description="Mapping of node inputs to context keys or stringified lambda expressions (e.g., 'lambda ctx: value')."
@@ -176,11 +196,18 @@ class NodeDefinition(BaseModel):
         None, ge=0.0, description="Maximum execution time in seconds (null for no timeout)."
     )
     parallel: bool = Field(default=False, description="Whether the node can execute in parallel with others.")
+    memoize: bool = Field(
+        default=False, description="Reuse the node's result from earlier runs with the same inputs and configuration."
+    )
+    stream_consumer: bool = Field(
+        default=False,
+        description="Receive the output of streaming LLM nodes chunk by chunk instead of waiting for the full text.",
+    )
 
     @model_validator(mode="before")
     @classmethod
     def check_function_or_sub_workflow_or_llm_or_template(cls, data: Any) -> Any:
-        """Ensure a node has exactly one of 'function', 'sub_workflow', 'llm_config', or 'template_config'.
+        """Ensure a node has exactly one of 'function', 'sub_workflow', 'llm_config', 'template_config' or 'map_config'.
 
         Args:
             data: Raw data to validate.
@@ -195,8 +222,11 @@ class NodeDefinition(BaseModel):
         sub_wf = data.get("sub_workflow")
         llm = data.get("llm_config")
         template = data.get("template_config")
-        if sum(x is not None for x in (func, sub_wf, llm, template)) != 1:
-            raise ValueError("Node must have exactly one of 'function', 'sub_workflow', 'llm_config', or 'template_config'")
+        map_cfg = data.get("map_config")
+        if sum(x is not None for x in (func, sub_wf, llm, template, map_cfg)) != 1:
+            raise ValueError(
+                "Node must have exactly one of 'function', 'sub_workflow', 'llm_config', 'template_config', or 'map_config'"
+            )
         return data
 
 
@@ -276,6 +306,30 @@ class WorkflowStructure(BaseModel):
     #     return data
 
 
+class ModelRateLimit(BaseModel):
+    """Limits on the LLM calls made to one model."""
+    requests_per_minute: Optional[float] = Field(None, gt=0, description="Maximum requests per minute.")
+    tokens_per_minute: Optional[float] = Field(
+        None, gt=0, description="Maximum prompt and completion tokens per minute."
+    )
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Maximum requests in flight.")
+
+
+class RateLimitConfig(BaseModel):
+    """Rate limits shared by all LLM calls of the workflow."""
+    models: Dict[str, ModelRateLimit] = Field(
+        default_factory=dict, description="Limits by model name, '*' for models without their own limits."
+    )
+    adaptive: bool = Field(
+        default=True, description="Lower max_concurrency on 429s and high latency, and raise it back on success."
+    )
+    max_retries: int = Field(default=3, ge=0, description="Retries of a rate-limited call before failing.")
+    backoff_base: float = Field(
+        default=1.0, ge=0.0, description="Maximum random delay before the first retry, doubled at every retry."
+    )
+    backoff_max: float = Field(default=60.0, ge=0.0, description="Maximum delay in seconds between two retries.")
+
+
 class WorkflowDefinition(BaseModel):
     """Top-level definition of the workflow."""
     
@@ -295,6 +349,9 @@ class WorkflowDefinition(BaseModel):
         default_factory=list,
         description="List of Python module dependencies."
     )
+    rate_limits: Optional[RateLimitConfig] = Field(
+        None, description="Rate limits applied to the LLM calls of the workflow."
+    )
 
 
 NodeDefinition.model_rebuild()
@@ -72,6 +72,9 @@ def get_node_label_and_type(
     elif node_def.sub_workflow:
         label = f"{escaped_name} (Sub-Workflow)"
         node_type = "sub_workflow"
+    elif node_def.map_config:
+        label = f"{escaped_name} (Map: {node_def.map_config.node} over {node_def.map_config.items})"
+        node_type = "map"
     else:
         label = f"{escaped_name} (unknown)"
         node_type = "unknown"
@@ -125,6 +128,7 @@ def generate_mermaid_diagram(
         "llm": "fill:#F3E5F5,stroke:#7B1FA2,stroke-width:2px,color:#6A1B9A",  # Light Purple with dark purple text
         "template": "fill:#FFF0F5,stroke:#C2185B,stroke-width:2px,color:#AD1457",  # Light Pink with dark pink text
         "sub_workflow": "fill:#FFF3E0,stroke:#F57C00,stroke-width:2px,color:#EF6C00",  # Light Orange with dark orange text
+        "map": "fill:#E0F7FA,stroke:#0097A7,stroke-width:2px,color:#00838F",  # Light Cyan with dark cyan text
         "unknown": "fill:#F5F5F5,stroke:#616161,stroke-width:2px,color:#424242",  # Light Grey with dark grey text
     }
 
@@ -202,7 +206,7 @@ def generate_mermaid_diagram(
         if diagram_type == "flowchart":
             mermaid_code += "    %% - Rectangle: Process Step or Convergence Point\n"
             mermaid_code += "    %% - Diamond: Decision Point (Branching)\n"
-        mermaid_code += "    %% - Colors: Blue (Function), Green (Structured LLM), Purple (LLM), Pink (Template), Orange (Sub-Workflow), Grey (Unknown)\n"
+        mermaid_code += "    %% - Colors: Blue (Function), Green (Structured LLM), Purple (LLM), Pink (Template), Orange (Sub-Workflow), Cyan (Map), Grey (Unknown)\n"
         mermaid_code += "    %% - Dashed Border: Convergence Node\n"
 
     if diagram_type == "flowchart":
@@ -283,6 +287,13 @@ def generate_mermaid_diagram(
                         else:
                             mermaid_code += f"    {from_node} --> {to_node}\n"
 
+        # Dotted edges from map nodes to the node they run per item and to their reducer
+        for node, node_def_entry in workflow_def.nodes.items():
+            if node_def_entry and node_def_entry.map_config:
+                mermaid_code += f'    {node} -.->|"each {node_def_entry.map_config.items}"| {node_def_entry.map_config.node}\n'
+                if node_def_entry.map_config.reducer:
+                    mermaid_code += f'    {node} -.->|"reduce"| {node_def_entry.map_config.reducer}\n'
+
         # Add loop visualization for flowchart
         if hasattr(workflow_def.workflow, 'loops') and workflow_def.workflow.loops:
             for i, loop_def in enumerate(workflow_def.workflow.loops):
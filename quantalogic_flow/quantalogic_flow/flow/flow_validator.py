@@ -76,6 +76,13 @@ class WorkflowValidator:
             if current in reachable:
                 continue
             reachable.add(current)
+
+            # Nodes run by a map node are reached through it
+            node_def = workflow_def.nodes.get(current)
+            if node_def and node_def.map_config:
+                to_visit.append(node_def.map_config.node)
+                if node_def.map_config.reducer:
+                    to_visit.append(node_def.map_config.reducer)
             
             # Find all transitions from current node
             for trans in workflow_def.workflow.transitions:
@@ -525,6 +532,15 @@ def validate_workflow_definition(workflow_def: WorkflowDefinition) -> List[NodeE
             if not template.template and not template.template_file:
                 issues.append(NodeError(node_name=name, description="Missing 'template' or 'template_file' in template_config"))
 
+        if node_def.map_config:
+            map_config = node_def.map_config
+            if map_config.node not in workflow_def.nodes:
+                issues.append(NodeError(node_name=name, description=f"Maps undefined node '{map_config.node}'"))
+            elif map_config.node == name:
+                issues.append(NodeError(node_name=name, description="Map node cannot map over itself"))
+            if map_config.reducer and map_config.reducer not in workflow_def.nodes:
+                issues.append(NodeError(node_name=name, description=f"References undefined reducer '{map_config.reducer}'"))
+
     # Validate main workflow structure
     issues.extend(validate_workflow_structure(workflow_def.workflow, workflow_def.nodes, is_main=True))
     issues.extend(check_circular_transitions(workflow_def))
@@ -639,6 +655,8 @@ def validate_workflow_definition(workflow_def: WorkflowDefinition) -> List[NodeE
                 if base_var.isidentifier():
                     cleaned_inputs.add(base_var)
             required_inputs = cleaned_inputs
+        elif node_def.map_config:
+            required_inputs = {node_def.map_config.items}
         elif node_def.sub_workflow:
             # CRITICAL FIX: Get actual sub-nodes from the sub-workflow structure
             # instead of iterating over ALL workflow nodes. The original buggy code:
@@ -0,0 +1,309 @@
+"""
+LLM response cache module.
+
+This module provides a pluggable cache for LLM responses, keyed by a stable hash of the
+model, the messages and the sampling parameters. It is used by `Nodes.llm_node`,
+`Nodes.structured_llm_node` and the ReAct `GenerativeModel`.
+
+Two backends are available:
+- MemoryCacheBackend: in-process LRU, bounded by entry count
+- SQLiteCacheBackend: on-disk store shared across runs, bounded by entry count
+
+Sampled completions (temperature > 0) are not cached unless the cache is created with
+`force=True`, since replaying them would hide the intended randomness.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol
+
+from loguru import logger
+
+# Type alias for cache listeners: called with (event_name, payload)
+CacheListener = Callable[[str, Dict[str, Any]], None]
+
+CACHE_HIT_EVENT = "llm_cache_hit"
+CACHE_MISS_EVENT = "llm_cache_miss"
+CACHE_BYPASS_EVENT = "llm_cache_bypass"
+
+
+@dataclass
+class ResponseCacheStats:
+    """Hit/miss counters of a response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    size: Optional[int] = None  # None when the stored entries were not counted
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of cacheable lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary, including the hit rate."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "size": self.size,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class CacheBackend(Protocol):
+    """Storage interface of a response cache."""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored value, or None when missing or expired."""
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store a value, expiring after ttl seconds when given."""
+
+    def delete(self, key: str) -> None:
+        """Remove a value."""
+
+    def clear(self) -> None:
+        """Remove all values."""
+
+    def __len__(self) -> int:
+        """Return the number of stored values."""
+
+
+class MemoryCacheBackend:
+    """In-memory LRU backend."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Dict[str, Any], Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of stored values, including expired ones not yet evicted."""
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk backend storing JSON values in a SQLite database.
+
+    Entries are evicted least-recently-used first once `max_entries` is exceeded.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 10000):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        """Return the number of stored values, including expired ones not yet evicted."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """Cache of LLM responses with TTL, bounded backends and hit-rate counters.
+
+    Listeners receive `llm_cache_hit`, `llm_cache_miss` and `llm_cache_bypass` events with
+    the cache key, the model and the current counters (without the size, which would query
+    the backend on every lookup). An `EventEmitter.emit` bound method can be registered
+    directly as a listener.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[float] = None,
+        force: bool = False,
+    ):
+        """Initialize the cache.
+
+        Args:
+            backend: Storage backend. Defaults to an in-memory LRU of 1024 entries.
+            ttl: Seconds after which an entry expires. None keeps entries until evicted.
+            force: Cache responses even when sampling with temperature > 0.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.force = force
+        self._listeners: List[CacheListener] = []
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypasses = 0
+
+    @classmethod
+    def sqlite(cls, path: str | Path, max_entries: int = 10000, **kwargs) -> "ResponseCache":
+        """Create a cache persisted in a SQLite database at `path`."""
+        return cls(backend=SQLiteCacheBackend(path, max_entries=max_entries), **kwargs)
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+        """Return a stable hash of the model, the messages and the sampling parameters."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params or {}},
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: Optional[float]) -> bool:
+        """Return True when a completion sampled at `temperature` may be cached."""
+        return self.force or not temperature
+
+    def add_listener(self, listener: CacheListener) -> None:
+        """Register a callable receiving (event_name, payload) on every lookup."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: CacheListener) -> None:
+        """Unregister a listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get(self, key: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached response for `key`, or None on a miss."""
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        self._notify(CACHE_HIT_EVENT if value is not None else CACHE_MISS_EVENT, key, model)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable response under `key`."""
+        try:
+            self.backend.set(key, value, ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+
+    def record_bypass(self, key: Optional[str] = None, model: Optional[str] = None) -> None:
+        """Count a lookup skipped because the request is not cacheable."""
+        with self._lock:
+            self._bypasses += 1
+        self._notify(CACHE_BYPASS_EVENT, key, model)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self.backend.clear()
+
+    def stats(self, include_size: bool = True) -> ResponseCacheStats:
+        """Return the current counters.
+
+        Args:
+            include_size: Count the stored entries, which queries the backend.
+        """
+        with self._lock:
+            stats = ResponseCacheStats(hits=self._hits, misses=self._misses, bypasses=self._bypasses)
+        if include_size:
+            stats.size = len(self.backend)
+        return stats
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss/bypass counters."""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._bypasses = 0
+
+    def _notify(self, event: str, key: Optional[str], model: Optional[str]) -> None:
+        if not self._listeners:
+            return
+        payload = {"key": key, "model": model, **self.stats(include_size=False).to_dict()}
+        for listener in list(self._listeners):
+            try:
+                listener(event, payload)
+            except Exception as e:
+                logger.warning(f"Response cache listener failed on {event}: {e}")
@@ -0,0 +1,213 @@
+"""
+Node result memoization module.
+
+This module lets the engine skip a node when it already ran with the same resolved
+inputs. Nodes opt in with `memoize=True` (shared in-memory cache) or `memoize=NodeCache(...)`
+on their decorator. Results are keyed by the node name, a fingerprint of the node and
+the resolved inputs; the fingerprint covers the node's source code, its decorator
+configuration and the content of its template files, so editing any of them
+invalidates the node's earlier results.
+
+Results are pickled, so a cache persisted with `NodeCache.sqlite` should only be
+shared between trusted workflows. Results that cannot be pickled are not cached.
+"""
+
+import base64
+import hashlib
+import inspect
+import json
+import marshal
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .llm_cache import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+
+# Configuration values that do not change a node's results and are left out of fingerprints
+_IGNORED_CONFIG = ("api_key",)
+
+
+@dataclass
+class NodeCacheStats:
+    """Hit/miss counters of a node cache."""
+
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _code_digest(func: Callable, with_closure: bool = False) -> str:
+    """Return a digest of a callable's source, or of its bytecode when the source is unavailable.
+
+    With `with_closure`, default arguments and closure variables are included, for
+    configuration callables that share their source and differ only by the values they
+    close over, such as the model callables built by `WorkflowManager`.
+    """
+    digest = hashlib.sha256()
+    try:
+        digest.update(inspect.getsource(func).encode("utf-8"))
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        digest.update(marshal.dumps(code) if code is not None else repr(func).encode("utf-8"))
+    if not with_closure:
+        return digest.hexdigest()
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            digest.update(repr(cell.cell_contents).encode("utf-8"))
+        except ValueError:  # Empty cell
+            pass
+    digest.update(repr(getattr(func, "__defaults__", None)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class NodeFingerprint:
+    """Fingerprint of a node: source, decorator configuration and template files.
+
+    The source and configuration are hashed once; template files are re-hashed when
+    their modification time changes.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        config: Optional[Dict[str, Any]] = None,
+        template_sources: Optional[List[Tuple[str, Optional[str]]]] = None,
+    ):
+        """Fingerprint the user function `func` wrapped by a node decorator."""
+        static = {"code": _code_digest(func), "config": {}}
+        for key, value in sorted((config or {}).items()):
+            if key in _IGNORED_CONFIG:
+                continue
+            static["config"][key] = _code_digest(value, with_closure=True) if callable(value) else value
+        self._static = json.dumps(static, sort_keys=True, default=repr)
+        self.template_files = [file for _, file in template_sources or [] if file]
+        self._file_digests: Dict[str, Tuple[int, str]] = {}
+
+    def _file_digest(self, template_file: str) -> str:
+        try:
+            mtime = os.stat(template_file).st_mtime_ns
+        except OSError:
+            return "missing"
+        cached = self._file_digests.get(template_file)
+        if cached is None or cached[0] != mtime:
+            digest = hashlib.sha256(Path(template_file).read_bytes()).hexdigest()
+            cached = self._file_digests[template_file] = (mtime, digest)
+        return cached[1]
+
+    def __call__(self) -> str:
+        """Return the current fingerprint."""
+        files = [self._file_digest(file) for file in self.template_files]
+        return hashlib.sha256(json.dumps([self._static, files]).encode("utf-8")).hexdigest()
+
+
+class NodeCache:
+    """Cache of node results keyed by node fingerprint and resolved inputs."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            backend: Storage backend. Defaults to an in-memory LRU of 1024 entries.
+            ttl: Seconds after which an entry expires. None keeps entries until evicted.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def sqlite(cls, path: Union[str, Path], max_entries: int = 10000, **kwargs) -> "NodeCache":
+        """Create a cache persisted in a SQLite database at `path`."""
+        return cls(backend=SQLiteCacheBackend(path, max_entries=max_entries), **kwargs)
+
+    @staticmethod
+    def make_key(node_name: str, fingerprint: str, inputs: Dict[str, Any]) -> str:
+        """Return a stable hash of a node invocation."""
+        payload = json.dumps(
+            {"node": node_name, "fingerprint": fingerprint, "inputs": inputs},
+            sort_keys=True,
+            default=repr,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, result) when `key` is cached, (False, None) otherwise."""
+        try:
+            entry = self.backend.get(key)
+            result = pickle.loads(base64.b64decode(entry["pickle"])) if entry is not None else None
+        except Exception as e:
+            logger.warning(f"Node cache lookup failed: {e}")
+            entry = None
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+        return True, result
+
+    def store(self, key: str, result: Any) -> None:
+        """Store a node result under `key`, skipping results that cannot be pickled."""
+        try:
+            encoded = base64.b64encode(pickle.dumps(result)).decode("ascii")
+        except Exception as e:
+            logger.debug(f"Node result not cached, it cannot be pickled: {e}")
+            return
+        try:
+            self.backend.set(key, {"pickle": encoded}, self.ttl)
+        except Exception as e:
+            logger.warning(f"Node cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self.backend.clear()
+
+    def stats(self) -> NodeCacheStats:
+        """Return the current counters."""
+        with self._lock:
+            return NodeCacheStats(hits=self._hits, misses=self._misses, size=len(self.backend))
+
+
+_default_cache: Optional[NodeCache] = None
+
+
+def default_node_cache() -> NodeCache:
+    """Return the in-memory cache shared by nodes declared with `memoize=True`."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = NodeCache()
+    return _default_cache
+
+
+def enable_memoization(
+    wrapped_func: Callable,
+    func: Callable,
+    memoize: Union[bool, NodeCache, None],
+    config: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Mark a node function for memoization by the engine when `memoize` is set.
+
+    Args:
+        wrapped_func: The node function registered by a decorator.
+        func: The user function it wraps, fingerprinted with `config`.
+        memoize: True for the shared in-memory cache, a `NodeCache`, or False/None.
+        config: Decorator configuration that changes the node's results.
+    """
+    if not memoize:
+        return
+    wrapped_func.node_cache = memoize if isinstance(memoize, NodeCache) else default_node_cache()
+    wrapped_func.cache_fingerprint = NodeFingerprint(
+        func, config, getattr(wrapped_func, "template_sources", None)
+    )
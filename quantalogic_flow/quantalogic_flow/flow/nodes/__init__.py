@@ -6,15 +6,19 @@ This module maintains the original Nodes API while using modular components.
 
 import inspect
 import os
-from typing import Any, Callable, Dict, Type, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, Type, Union
 
 import instructor
 from litellm import acompletion
 from loguru import logger
 from pydantic import BaseModel, ValidationError
 
+from ..llm_cache import ResponseCache
+from ..node_cache import NodeCache, enable_memoization
+from ..rate_limit import call_with_rate_limit, estimate_tokens
+from ..streaming import TokenStream
 from ..template import TemplateEngine
-from .base import NODE_REGISTRY
+from .base import NODE_REGISTRY, record_usage
 from .decorators import (
     define as _define,
 )
@@ -26,6 +30,9 @@ from .decorators import (
 )
 from .template_nodes import template_node as _template_node
 
+# Request parameters that do not change the response and are left out of cache keys
+_UNCACHED_PARAMS = ("api_key",)
+
 
 class Nodes:
     """
@@ -41,21 +48,65 @@ class Nodes:
     define = staticmethod(_define)
 
     @classmethod
-    def validate_node(cls, output: str):
+    def validate_node(cls, output: str, memoize: Union[bool, NodeCache] = False):
         """Decorator for nodes that validate inputs and return a string."""
-        return _validate_node(output)
+        return _validate_node(output, memoize=memoize)
 
     @classmethod
-    def transform_node(cls, output: str, transformer: Callable[[Any], Any]):
+    def transform_node(
+        cls, output: str, transformer: Callable[[Any], Any], memoize: Union[bool, NodeCache] = False
+    ):
         """Decorator for nodes that transform their inputs."""
-        return _transform_node(output, transformer)
+        return _transform_node(output, transformer, memoize=memoize)
 
     @classmethod
     def template_node(
-        cls, output: str, template: str = "", template_file: Union[str, None] = None
+        cls,
+        output: str,
+        template: str = "",
+        template_file: Union[str, None] = None,
+        memoize: Union[bool, NodeCache] = False,
     ):
         """Decorator for creating nodes that apply a Jinja2 template to inputs."""
-        return _template_node(output, template, template_file)
+        return _template_node(output, template, template_file, memoize=memoize)
+
+    @classmethod
+    def map_node(
+        cls,
+        name: str,
+        node: str,
+        items: str,
+        output: str,
+        item_key: str = "item",
+        max_concurrency: int = 4,
+        retries: int = 0,
+        retry_delay: float = 0.0,
+        reducer: Union[str, None] = None,
+    ):
+        """Register a node that runs the registered node `node` over the context list `items`.
+
+        Results are stored under `output` in item order. See `MapNode` for the reducer.
+        """
+        from ..core.map_node import MapNode
+
+        if node not in NODE_REGISTRY:
+            raise ValueError(f"Node {node} not registered")
+        if reducer is not None and reducer not in NODE_REGISTRY:
+            raise ValueError(f"Node {reducer} not registered")
+        map_node = MapNode(
+            node=node,
+            items=items,
+            output=output,
+            item_key=item_key,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            retry_delay=retry_delay,
+            reducer=reducer,
+        )
+        inputs = map_node.inputs
+        logger.debug(f"Registering map node {name} over {items} with inputs {inputs} and output {output}")
+        NODE_REGISTRY.register(name, map_node, inputs, output)
+        return map_node
 
     @staticmethod
     def _load_prompt_from_file(prompt_file: str, context: Dict[str, Any]) -> str:
@@ -69,6 +120,65 @@ class Nodes:
         """Render a Jinja2 template from either a string or an external file."""
         return TemplateEngine.render_template(template, template_file, context)
 
+    @staticmethod
+    def _lookup_cached_response(
+        cache: Union[ResponseCache, None],
+        model: str,
+        messages: List[Dict[str, Any]],
+        params: Dict[str, Any],
+    ) -> Tuple[Union[str, None], Union[Dict[str, Any], None]]:
+        """Look up an LLM response in the cache.
+
+        Returns the cache key (None when the request is not cacheable) and the cached response.
+        """
+        if cache is None:
+            return None, None
+        if not cache.is_cacheable(params.get("temperature")):
+            cache.record_bypass(model=model)
+            return None, None
+        key_params = {k: v for k, v in params.items() if k not in _UNCACHED_PARAMS}
+        key = cache.make_key(model, messages, key_params)
+        return key, cache.get(key, model=model)
+
+    @staticmethod
+    async def _stream_completion(
+        model: str,
+        messages: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        usage: Dict[str, Any],
+        cache: Union[ResponseCache, None] = None,
+        cache_key: Union[str, None] = None,
+    ) -> AsyncIterator[str]:
+        """Yield the text chunks of a streamed completion, filling `usage` from its last chunk."""
+        response = await call_with_rate_limit(
+            model,
+            lambda: acompletion(
+                model=model,
+                messages=messages,
+                drop_params=True,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params,
+            ),
+            estimate_tokens(messages, params.get("max_tokens")),
+        )
+        chunks = []
+        async for chunk in response:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+            chunk_usage = getattr(chunk, "usage", None)
+            if chunk_usage:
+                usage.update(
+                    prompt_tokens=chunk_usage.prompt_tokens,
+                    completion_tokens=chunk_usage.completion_tokens,
+                    total_tokens=chunk_usage.total_tokens,
+                )
+        if cache_key is not None:
+            cache.set(cache_key, {"content": "".join(chunks).strip(), "usage": dict(usage)})
+
     @classmethod
     def llm_node(
         cls,
@@ -85,9 +195,24 @@ class Nodes:
         model: Union[
             Callable[[Dict[str, Any]], str], str
         ] = lambda ctx: "gpt-3.5-turbo",
+        cache: Union[ResponseCache, None] = None,
+        memoize: Union[bool, NodeCache] = False,
+        stream: bool = False,
         **kwargs,
     ):
-        """Decorator for creating LLM nodes with plain text output, supporting dynamic parameters."""
+        """Decorator for creating LLM nodes with plain text output, supporting dynamic parameters.
+
+        When `cache` is given, responses are looked up by model, messages and sampling
+        parameters before calling the LLM (see `ResponseCache` for the temperature rule).
+        `memoize` instead lets the engine skip the node when it already ran with the same
+        inputs, prompts and configuration (see `Nodes.define`).
+
+        With `stream`, the node returns a `TokenStream` as soon as the request is prepared,
+        so the workflow moves on while the text is generated: nodes declared with
+        `stream_consumer=True` read it chunk by chunk, other nodes wait for the text.
+        Streamed text is not stripped of surrounding whitespace, and its usage is reported
+        on the `NODE_STREAM_COMPLETED` event rather than on `NODE_COMPLETED`.
+        """
 
         def decorator(func: Callable) -> Callable:
             # Store all decorator parameters in a config dictionary
@@ -104,6 +229,8 @@ class Nodes:
                 "model": model,
                 **kwargs,
             }
+            # Resolved once: the wrapper filters template variables on every call
+            parameters = inspect.signature(func).parameters
 
             async def wrapped_func(**func_kwargs):
                 # Use func_kwargs to override config values if provided, otherwise use config defaults
@@ -157,9 +284,8 @@ class Nodes:
                     system_content = system_prompt_to_use
 
                 # Prepare template variables and render prompt
-                sig = inspect.signature(func)
                 template_vars = {
-                    k: v for k, v in func_kwargs.items() if k in sig.parameters
+                    k: v for k, v in func_kwargs.items() if k in parameters
                 }
                 prompt = cls._render_template(
                     prompt_template_to_use, prompt_file_to_use, template_vars
@@ -175,37 +301,63 @@ class Nodes:
                 logger.debug(f"System prompt: {system_content[:100]}...")
                 logger.debug(f"User prompt preview: {truncated_prompt}")
 
+                params = {
+                    "temperature": temperature_to_use,
+                    "max_tokens": max_tokens_to_use,
+                    "top_p": top_p_to_use,
+                    "presence_penalty": presence_penalty_to_use,
+                    "frequency_penalty": frequency_penalty_to_use,
+                    **kwargs,
+                }
+                cache_key, cached = cls._lookup_cached_response(cache, model_to_use, messages, params)
+                if cached is not None:
+                    logger.debug(f"LLM node {func.__name__} served from cache")
+                    record_usage({**cached["usage"], "cost": 0.0, "cached": True})
+                    return TokenStream.from_text(cached["content"]) if stream else cached["content"]
+
+                if stream:
+                    stream_usage: Dict[str, Any] = {}
+                    source = cls._stream_completion(model_to_use, messages, params, stream_usage, cache, cache_key)
+                    return TokenStream(source, stream_usage)
+
                 # Call the acompletion function with the resolved model
                 try:
-                    response = await acompletion(
-                        model=model_to_use,
-                        messages=messages,
-                        temperature=temperature_to_use,
-                        max_tokens=max_tokens_to_use,
-                        top_p=top_p_to_use,
-                        presence_penalty=presence_penalty_to_use,
-                        frequency_penalty=frequency_penalty_to_use,
-                        drop_params=True,
-                        **kwargs,
+                    response = await call_with_rate_limit(
+                        model_to_use,
+                        lambda: acompletion(
+                            model=model_to_use,
+                            messages=messages,
+                            drop_params=True,
+                            **params,
+                        ),
+                        estimate_tokens(messages, max_tokens_to_use),
+                        lambda response: response.usage.total_tokens,
                     )
                     # Handle None content gracefully
                     raw_content = response.choices[0].message.content
                     content = raw_content.strip() if raw_content is not None else ""
-                    wrapped_func.usage = {
+                    usage = {
                         "prompt_tokens": response.usage.prompt_tokens,
                         "completion_tokens": response.usage.completion_tokens,
                         "total_tokens": response.usage.total_tokens,
                         "cost": getattr(response, "cost", None),
                     }
+                    record_usage(usage)
+                    if cache_key is not None:
+                        cache.set(cache_key, {"content": content, "usage": usage})
                     logger.debug(f"LLM output from {func.__name__}: {content[:50]}...")
                     return content
                 except Exception as e:
                     logger.error(f"Error in LLM node {func.__name__}: {e}")
                     raise
 
+            # Templates compiled ahead of time by Workflow.build(precompile_templates=True)
+            wrapped_func.template_sources = [(prompt_template, prompt_file), ("", system_prompt_file)]
+            wrapped_func.streaming = stream
+            enable_memoization(wrapped_func, func, memoize, config)
+
             # Register the node with its inputs and output
-            sig = inspect.signature(func)
-            inputs = [param.name for param in sig.parameters.values()]
+            inputs = list(parameters)
             logger.debug(
                 f"Registering node {func.__name__} with inputs {inputs} and output {output}"
             )
@@ -231,9 +383,16 @@ class Nodes:
         model: Union[
             Callable[[Dict[str, Any]], str], str
         ] = lambda ctx: "gpt-3.5-turbo",
+        cache: Union[ResponseCache, None] = None,
+        memoize: Union[bool, NodeCache] = False,
         **kwargs,
     ):
-        """Decorator for creating LLM nodes with structured output, supporting dynamic parameters."""
+        """Decorator for creating LLM nodes with structured output, supporting dynamic parameters.
+
+        When `cache` is given, validated responses are cached like in `llm_node`; the
+        response model's JSON schema is part of the cache key. `memoize` works as in
+        `llm_node`.
+        """
         try:
             client = instructor.from_litellm(acompletion)
         except ImportError:
@@ -257,6 +416,8 @@ class Nodes:
                 "model": model,
                 **kwargs,
             }
+            # Resolved once: the wrapper filters template variables on every call
+            parameters = inspect.signature(func).parameters
 
             async def wrapped_func(**func_kwargs):
                 # Resolve parameters, prioritizing func_kwargs over config defaults
@@ -310,9 +471,8 @@ class Nodes:
                     system_content = system_prompt_to_use
 
                 # Render prompt using template variables
-                sig = inspect.signature(func)
                 template_vars = {
-                    k: v for k, v in func_kwargs.items() if k in sig.parameters
+                    k: v for k, v in func_kwargs.items() if k in parameters
                 }
                 prompt = cls._render_template(
                     prompt_template_to_use, prompt_file_to_use, template_vars
@@ -331,28 +491,53 @@ class Nodes:
                 logger.debug(f"User prompt preview: {truncated_prompt}")
                 logger.debug(f"Expected response model: {response_model.__name__}")
 
+                params = {
+                    "temperature": temperature_to_use,
+                    "max_tokens": max_tokens_to_use,
+                    "top_p": top_p_to_use,
+                    "presence_penalty": presence_penalty_to_use,
+                    "frequency_penalty": frequency_penalty_to_use,
+                    **kwargs,
+                }
+                cache_key, cached = (None, None)
+                if cache is not None:
+                    cache_key, cached = cls._lookup_cached_response(
+                        cache,
+                        model_to_use,
+                        messages,
+                        {**params, "response_model": response_model.model_json_schema()},
+                    )
+                if cached is not None:
+                    logger.debug(f"Structured LLM node {func.__name__} served from cache")
+                    record_usage({**cached["usage"], "cost": 0.0, "cached": True})
+                    return response_model.model_validate(cached["content"])
+
                 # Generate structured response
                 try:
-                    structured_response, raw_response = (
-                        await client.chat.completions.create_with_completion(
+                    structured_response, raw_response = await call_with_rate_limit(
+                        model_to_use,
+                        lambda: client.chat.completions.create_with_completion(
                             model=model_to_use,
                             messages=messages,
                             response_model=response_model,
-                            temperature=temperature_to_use,
-                            max_tokens=max_tokens_to_use,
-                            top_p=top_p_to_use,
-                            presence_penalty=presence_penalty_to_use,
-                            frequency_penalty=frequency_penalty_to_use,
                             drop_params=True,
-                            **kwargs,
-                        )
+                            **params,
+                        ),
+                        estimate_tokens(messages, max_tokens_to_use),
+                        lambda result: result[1].usage.total_tokens,
                     )
-                    wrapped_func.usage = {
+                    usage = {
                         "prompt_tokens": raw_response.usage.prompt_tokens,
                         "completion_tokens": raw_response.usage.completion_tokens,
                         "total_tokens": raw_response.usage.total_tokens,
                         "cost": getattr(raw_response, "cost", None),
                     }
+                    record_usage(usage)
+                    if cache_key is not None:
+                        cache.set(
+                            cache_key,
+                            {"content": structured_response.model_dump(mode="json"), "usage": usage},
+                        )
                     logger.debug(
                         f"Structured output from {func.__name__}: {structured_response}"
                     )
@@ -364,9 +549,11 @@ class Nodes:
                     logger.error(f"Error in structured LLM node {func.__name__}: {e}")
                     raise
 
+            wrapped_func.template_sources = [(prompt_template, prompt_file), ("", system_prompt_file)]
+            enable_memoization(wrapped_func, func, memoize, {**config, "response_model": response_model})
+
             # Register the node
-            sig = inspect.signature(func)
-            inputs = [param.name for param in sig.parameters.values()]
+            inputs = list(parameters)
             logger.debug(
                 f"Registering node {func.__name__} with inputs {inputs} and output {output}"
             )
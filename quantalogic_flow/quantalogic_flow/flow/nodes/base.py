@@ -4,7 +4,12 @@ Base nodes module.
 This module contains the base node functionality and registry.
 """
 
-from typing import Callable, Dict, List, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Usage totals of the node invocation running in the current asyncio task
+_current_usage: ContextVar[Dict[str, Any] | None] = ContextVar("node_usage", default=None)
 
 
 class NodeRegistry:
@@ -32,3 +37,37 @@ class NodeRegistry:
 
 # Global node registry
 NODE_REGISTRY = NodeRegistry()
+
+
+def record_usage(usage: Dict[str, Any]) -> None:
+    """Add the token usage of one LLM call to the invocation being captured, if any.
+
+    Counts and costs are summed and flags such as `cached` are and-ed, so a node making
+    several calls, e.g. a map node, reports its total.
+    """
+    totals = _current_usage.get()
+    if totals is None:
+        return
+    for key, value in usage.items():
+        previous = totals.get(key)
+        if isinstance(value, bool):
+            totals[key] = value if previous is None else previous and value
+        elif isinstance(value, (int, float)) and key in totals:
+            totals[key] = (previous or 0) + value
+        elif previous is None or value is not None:
+            totals[key] = value
+
+
+@contextmanager
+def capture_usage() -> Iterator[Dict[str, Any]]:
+    """Collect the usage recorded by node calls made inside the block.
+
+    The totals are bound to the current asyncio task, so concurrent invocations of the
+    same node each see only their own usage.
+    """
+    totals: Dict[str, Any] = {}
+    token = _current_usage.set(totals)
+    try:
+        yield totals
+    finally:
+        _current_usage.reset(token)
@@ -6,14 +6,22 @@ This module contains the basic decorators for defining workflow nodes.
 
 import asyncio
 import inspect
-from typing import Any, Callable
+from typing import Any, Callable, Union
 
 from loguru import logger
 
+from ..node_cache import NodeCache, enable_memoization
 from .base import NODE_REGISTRY
 
 
-def define(func=None, *, name: str | None = None, output: str | None = None):
+def define(
+    func=None,
+    *,
+    name: str | None = None,
+    output: str | None = None,
+    memoize: Union[bool, NodeCache] = False,
+    stream_consumer: bool = False,
+):
     """Decorator for defining simple workflow nodes.
 
     Can be used as `@define` or `@define(name="...", output="...")`.
@@ -22,17 +30,22 @@ def define(func=None, *, name: str | None = None, output: str | None = None):
         func: The function to decorate.
         name: Optional name for the node. Defaults to the function name.
         output: Optional context key for the node's result.
+        memoize: Reuse results of earlier runs with the same inputs: True for the shared
+            in-memory cache, or a `NodeCache`.
+        stream_consumer: Receive the outputs of streaming LLM nodes as `TokenStream`s,
+            to process them while they are generated, instead of their complete text.
 
     Returns:
         Decorator function wrapping the node logic.
     """
     def decorator(fn: Callable) -> Callable:
         node_name = name or fn.__name__
-        
+        is_async = asyncio.iscoroutinefunction(fn)
+
         async def wrapped_func(**kwargs):
             instance = kwargs.pop("instance", None)
             try:
-                if asyncio.iscoroutinefunction(fn):
+                if is_async:
                     if instance:
                         result = await fn(instance, **kwargs)
                     else:
@@ -47,6 +60,8 @@ def define(func=None, *, name: str | None = None, output: str | None = None):
                 logger.error(f"Error in node {node_name}: {e}")
                 raise
 
+        enable_memoization(wrapped_func, fn, memoize)
+        wrapped_func.stream_consumer = stream_consumer
         sig = inspect.signature(fn)
         inputs = [param.name for param in sig.parameters.values() if param.name not in ['self', 'instance']]
         logger.debug(f"Registering node {node_name} with inputs {inputs} and output {output}")
@@ -61,20 +76,23 @@ def define(func=None, *, name: str | None = None, output: str | None = None):
         return decorator(func)
 
 
-def validate_node(output: str):
+def validate_node(output: str, memoize: Union[bool, NodeCache] = False):
     """Decorator for nodes that validate inputs and return a string.
 
     Args:
         output: Context key for the validation result.
+        memoize: Reuse results of earlier runs with the same inputs (see `define`).
 
     Returns:
         Decorator function wrapping the validation logic.
     """
     def decorator(func: Callable) -> Callable:
+        is_async = asyncio.iscoroutinefunction(func)
+
         async def wrapped_func(**kwargs):
             kwargs.pop("instance", None)  # Pop instance to avoid passing it to the user function
             try:
-                if asyncio.iscoroutinefunction(func):
+                if is_async:
                     result = await func(**kwargs)
                 else:
                     result = func(**kwargs)
@@ -85,6 +103,7 @@ def validate_node(output: str):
             except Exception as e:
                 logger.error(f"Validation error in {func.__name__}: {e}")
                 raise
+        enable_memoization(wrapped_func, func, memoize)
         sig = inspect.signature(func)
         inputs = [param.name for param in sig.parameters.values() if param.name not in ['self', 'instance']]
         logger.debug(f"Registering node {func.__name__} with inputs {inputs} and output {output}")
@@ -93,17 +112,20 @@ def validate_node(output: str):
     return decorator
 
 
-def transform_node(output: str, transformer: Callable[[Any], Any]):
+def transform_node(output: str, transformer: Callable[[Any], Any], memoize: Union[bool, NodeCache] = False):
     """Decorator for nodes that transform their inputs.
 
     Args:
         output: Context key for the transformed result.
         transformer: Callable to transform the input.
+        memoize: Reuse results of earlier runs with the same inputs (see `define`).
 
     Returns:
         Decorator function wrapping the transformation logic.
     """
     def decorator(func: Callable) -> Callable:
+        is_async = asyncio.iscoroutinefunction(func)
+
         async def wrapped_func(**kwargs):
             kwargs.pop("instance", None)  # Pop instance to avoid passing it to the user function
             try:
@@ -111,7 +133,7 @@ def transform_node(output: str, transformer: Callable[[Any], Any]):
                 if input_key:
                     transformed_input = transformer(kwargs[input_key])
                     kwargs[input_key] = transformed_input
-                if asyncio.iscoroutinefunction(func):
+                if is_async:
                     result = await func(**kwargs)
                 else:
                     result = func(**kwargs)
@@ -120,6 +142,7 @@ def transform_node(output: str, transformer: Callable[[Any], Any]):
             except Exception as e:
                 logger.error(f"Error in transform node {func.__name__}: {e}")
                 raise
+        enable_memoization(wrapped_func, func, memoize, {"transformer": transformer})
         sig = inspect.signature(func)
         inputs = [param.name for param in sig.parameters.values() if param.name not in ['self', 'instance']]
         logger.debug(f"Registering node {func.__name__} with inputs {inputs} and output {output}")
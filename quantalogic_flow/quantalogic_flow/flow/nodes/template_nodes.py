@@ -6,10 +6,11 @@ This module contains decorators for template-based workflow nodes.
 
 import asyncio
 import inspect
-from typing import Callable
+from typing import Callable, Union
 
 from loguru import logger
 
+from ..node_cache import NodeCache, enable_memoization
 from ..template import TemplateEngine
 from .base import NODE_REGISTRY
 
@@ -18,6 +19,7 @@ def template_node(
     output: str,
     template: str = "",
     template_file: str | None = None,
+    memoize: Union[bool, NodeCache] = False,
 ):
     """Decorator for creating nodes that apply a Jinja2 template to inputs.
 
@@ -25,24 +27,28 @@ def template_node(
         output: Context key for the rendered result.
         template: Inline Jinja2 template string.
         template_file: Path to a template file (overrides template).
+        memoize: Reuse results of earlier runs with the same inputs (see `Nodes.define`).
 
     Returns:
         Decorator function wrapping the template logic.
     """
     def decorator(func: Callable) -> Callable:
+        # Resolved once rather than on every call of the wrapper
+        sig = inspect.signature(func)
+        expected_params = frozenset(p.name for p in sig.parameters.values() if p.name != 'rendered_content')
+        is_async = asyncio.iscoroutinefunction(func)
+
         async def wrapped_func(**func_kwargs):
             template_to_use = func_kwargs.pop("template", template)
             template_file_to_use = func_kwargs.pop("template_file", template_file)
 
-            sig = inspect.signature(func)
-            expected_params = [p.name for p in sig.parameters.values() if p.name != 'rendered_content']
             template_vars = {k: v for k, v in func_kwargs.items() if k in expected_params}
             rendered_content = TemplateEngine.render_template(template_to_use, template_file_to_use, template_vars)
 
             filtered_kwargs = {k: v for k, v in func_kwargs.items() if k in expected_params}
 
             try:
-                if asyncio.iscoroutinefunction(func):
+                if is_async:
                     result = await func(rendered_content=rendered_content, **filtered_kwargs)
                 else:
                     result = func(rendered_content=rendered_content, **filtered_kwargs)
@@ -51,7 +57,8 @@ def template_node(
             except Exception as e:
                 logger.error(f"Error in template node {func.__name__}: {e}")
                 raise
-        sig = inspect.signature(func)
+        wrapped_func.template_sources = [(template, template_file)]
+        enable_memoization(wrapped_func, func, memoize, {"template": template})
         inputs = [param.name for param in sig.parameters.values()]
         if 'rendered_content' not in inputs:
             inputs.insert(0, 'rendered_content')
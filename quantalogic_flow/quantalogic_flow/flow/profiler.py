@@ -0,0 +1,385 @@
+"""
+Workflow profiling module.
+
+This module provides `WorkflowProfiler`, an observer recording every node execution of
+a workflow run as a span: its wall time, the time it waited for the event loop or a
+concurrency slot after becoming ready, and the tokens and cost it reported. Spans of
+loop iterations are numbered, and nodes run by a sub-workflow are nested under the
+sub-workflow's node, so a profile shows where the time and money of a run went.
+
+A profile can be printed as a summary table, or exported as a Chrome trace viewable in
+Perfetto or chrome://tracing, where parallel branches appear as overlapping lanes.
+
+Example:
+    profiler = WorkflowProfiler().attach(workflow)
+    await workflow.build().run(context)
+    print(profiler.summary())
+    profiler.save_chrome_trace("run.trace.json")
+"""
+
+import json
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .core.events import WorkflowEvent, WorkflowEventType
+from .core.sub_workflow import SubWorkflowNode
+
+if TYPE_CHECKING:
+    from .core.workflow import Workflow
+
+PROFILED_EVENTS = frozenset(
+    {
+        WorkflowEventType.WORKFLOW_STARTED,
+        WorkflowEventType.WORKFLOW_COMPLETED,
+        WorkflowEventType.NODE_STARTED,
+        WorkflowEventType.NODE_COMPLETED,
+        WorkflowEventType.NODE_FAILED,
+        WorkflowEventType.NODE_CACHE_HIT,
+        WorkflowEventType.SUB_WORKFLOW_ENTERED,
+        WorkflowEventType.NODE_STREAM_COMPLETED,
+    }
+)
+
+TOKEN_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+@dataclass(eq=False)
+class NodeSpan:
+    """One execution of a node. Times are in seconds since the profiler's first event."""
+
+    node_name: str
+    run: int
+    workflow: Tuple[str, ...]
+    iteration: int
+    start: float
+    lane: int
+    queue_wait: float = 0.0
+    end: Optional[float] = None
+    status: str = "running"
+    cached: bool = False
+    sub_workflow: bool = False
+    usage: Dict[str, Any] = field(default_factory=dict)
+    parent: Optional["NodeSpan"] = field(default=None, repr=False)
+    children: List["NodeSpan"] = field(default_factory=list, repr=False)
+
+    @property
+    def path(self) -> str:
+        """Node name qualified by the sub-workflow nodes enclosing it, e.g. `outer/inner`."""
+        return "/".join(self.workflow + (self.node_name,))
+
+    @property
+    def duration(self) -> float:
+        """Wall time of the execution, 0 while it is running."""
+        return self.end - self.start if self.end is not None else 0.0
+
+    def total_usage(self) -> Dict[str, float]:
+        """Tokens and cost of the execution, including the nodes run by a sub-workflow."""
+        totals = {key: float(self.usage.get(key) or 0) for key in TOKEN_KEYS + ("cost",)}
+        for child in self.children:
+            for key, value in child.total_usage().items():
+                totals[key] += value
+        return totals
+
+
+@dataclass
+class NodeStats:
+    """Timing and usage of the executions of one node."""
+
+    path: str
+    calls: int = 0
+    failures: int = 0
+    cache_hits: int = 0
+    wall_time: float = 0.0
+    max_time: float = 0.0
+    queue_wait: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        """Mean wall time of an execution."""
+        return self.wall_time / self.calls if self.calls else 0.0
+
+
+@dataclass
+class _Run:
+    """A top-level workflow run and the lanes its concurrent spans are laid out on."""
+
+    index: int
+    start: float
+    end: Optional[float] = None
+    lanes: List[List[NodeSpan]] = field(default_factory=list)
+    iterations: Dict[Tuple[int, str], int] = field(default_factory=lambda: defaultdict(int))
+
+
+class WorkflowProfiler:
+    """Observer recording the timing and token usage of every node execution.
+
+    The profiler is a synchronous observer, so it timestamps events as the engine emits
+    them. It follows each run through the asyncio task running it, which lets one
+    profiler observe concurrent runs and parallel branches without mixing their spans.
+    """
+
+    def __init__(self):
+        """Create an empty profiler."""
+        self.spans: List[NodeSpan] = []
+        self._runs: List[_Run] = []
+        self._origin: Optional[float] = None
+        # The run and the innermost running span of the current task
+        self._position: ContextVar[Optional[Tuple[_Run, Optional[NodeSpan]]]] = ContextVar(
+            f"workflow_profiler_{id(self)}", default=None
+        )
+
+    def attach(self, workflow: "Workflow") -> "WorkflowProfiler":
+        """Observe `workflow` and the workflows of its sub-workflow nodes.
+
+        Returns:
+            The profiler itself.
+        """
+        workflow.add_observer(self, PROFILED_EVENTS)
+        for node in workflow.nodes.values():
+            if isinstance(node, SubWorkflowNode):
+                self.attach(node.sub_workflow)
+        return self
+
+    def __call__(self, event: WorkflowEvent) -> None:
+        """Record a workflow event."""
+        now = time.perf_counter()
+        if self._origin is None:
+            self._origin = now
+        timestamp = now - self._origin
+        event_type = event.event_type
+        if event_type == WorkflowEventType.NODE_STARTED:
+            self._start_span(event, timestamp)
+        elif event_type == WorkflowEventType.NODE_COMPLETED:
+            self._end_span(event, timestamp, "ok")
+        elif event_type == WorkflowEventType.NODE_FAILED:
+            self._end_span(event, timestamp, "failed")
+        elif event_type == WorkflowEventType.WORKFLOW_STARTED:
+            position = self._position.get()
+            if position is None or position[1] is None:
+                self._new_run(timestamp)
+        elif event_type == WorkflowEventType.NODE_STREAM_COMPLETED:
+            self._add_stream_usage(event)
+        elif event_type == WorkflowEventType.WORKFLOW_COMPLETED:
+            position = self._position.get()
+            if position is not None and position[1] is None:
+                position[0].end = timestamp
+        else:
+            span = self._current_span(event)
+            if span is not None:
+                if event_type == WorkflowEventType.NODE_CACHE_HIT:
+                    span.cached = True
+                elif event_type == WorkflowEventType.SUB_WORKFLOW_ENTERED:
+                    span.sub_workflow = True
+
+    def _new_run(self, timestamp: float) -> _Run:
+        run = _Run(index=len(self._runs), start=timestamp)
+        self._runs.append(run)
+        self._position.set((run, None))
+        return run
+
+    def _current_span(self, event: WorkflowEvent) -> Optional[NodeSpan]:
+        position = self._position.get()
+        if position is None or position[1] is None or position[1].node_name != event.node_name:
+            return None
+        return position[1]
+
+    @staticmethod
+    def _lane(run: _Run, parent: Optional[NodeSpan]) -> int:
+        """Lay a span out on its parent's lane if it is free, else on the first free lane."""
+        if parent is not None and run.lanes[parent.lane][-1] is parent:
+            return parent.lane
+        for lane, spans in enumerate(run.lanes):
+            if not spans:
+                return lane
+        run.lanes.append([])
+        return len(run.lanes) - 1
+
+    def _start_span(self, event: WorkflowEvent, timestamp: float) -> None:
+        position = self._position.get()
+        run, parent = position if position is not None else (self._new_run(timestamp), None)
+        iteration_key = (id(parent), event.node_name)
+        run.iterations[iteration_key] += 1
+        lane = self._lane(run, parent)
+        queue_wait = 0.0
+        if event.queued_at is not None:
+            queue_wait = max(0.0, timestamp - (event.queued_at - self._origin))
+        span = NodeSpan(
+            node_name=event.node_name,
+            run=run.index,
+            workflow=parent.workflow + (parent.node_name,) if parent is not None else (),
+            iteration=run.iterations[iteration_key],
+            start=timestamp,
+            lane=lane,
+            queue_wait=queue_wait,
+            parent=parent,
+        )
+        run.lanes[lane].append(span)
+        if parent is not None:
+            parent.children.append(span)
+        self.spans.append(span)
+        self._position.set((run, span))
+
+    def _end_span(self, event: WorkflowEvent, timestamp: float, status: str) -> None:
+        span = self._current_span(event)
+        if span is None:
+            logger.debug(f"Profiler got {event.event_type.value} for {event.node_name} without a running span")
+            return
+        span.end = timestamp
+        span.status = status
+        if event.usage:
+            span.usage = dict(event.usage)
+        run = self._runs[span.run]
+        run.lanes[span.lane].remove(span)
+        self._position.set((run, span.parent))
+
+    def _add_stream_usage(self, event: WorkflowEvent) -> None:
+        """Add the usage of a streamed generation, which ends after its node, to the node's span."""
+        if not event.usage:
+            return
+        # The stream is started while its node runs, so its task still sees the node's span
+        span = self._current_span(event)
+        if span is None:
+            return
+        for key, value in event.usage.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                span.usage[key] = (span.usage.get(key) or 0) + value
+
+    def stats(self, by_iteration: bool = False) -> List[NodeStats]:
+        """Aggregate the finished spans by node, slowest first.
+
+        The usage of a sub-workflow node includes the nodes it ran.
+
+        Args:
+            by_iteration: One entry per loop iteration of each node, named `node#2` for
+                its second execution, instead of one per node.
+        """
+        stats: Dict[str, NodeStats] = {}
+        for span in self.spans:
+            if span.end is None:
+                continue
+            key = f"{span.path}#{span.iteration}" if by_iteration else span.path
+            entry = stats.setdefault(key, NodeStats(path=key))
+            entry.calls += 1
+            entry.failures += span.status == "failed"
+            entry.cache_hits += span.cached
+            entry.wall_time += span.duration
+            entry.max_time = max(entry.max_time, span.duration)
+            entry.queue_wait += span.queue_wait
+            usage = span.total_usage()
+            entry.prompt_tokens += int(usage["prompt_tokens"])
+            entry.completion_tokens += int(usage["completion_tokens"])
+            entry.total_tokens += int(usage["total_tokens"])
+            entry.cost += usage["cost"]
+        return sorted(stats.values(), key=lambda entry: entry.wall_time, reverse=True)
+
+    def summary(self, by_iteration: bool = False) -> str:
+        """Return the node statistics as a text table, with the totals of all runs."""
+        rows = [
+            (
+                entry.path,
+                str(entry.calls),
+                f"{entry.wall_time:.3f}",
+                f"{entry.mean_time * 1000:.1f}",
+                f"{entry.max_time * 1000:.1f}",
+                f"{entry.queue_wait * 1000:.1f}",
+                str(entry.total_tokens),
+                f"{entry.cost:.4f}",
+            )
+            for entry in self.stats(by_iteration)
+        ]
+        wall_time = sum(run.end - run.start for run in self._runs if run.end is not None)
+        total_tokens = sum(int(span.usage.get("total_tokens") or 0) for span in self.spans)
+        total_cost = sum(float(span.usage.get("cost") or 0) for span in self.spans)
+        rows.append(
+            (
+                f"Total ({len(self._runs)} run{'s' if len(self._runs) != 1 else ''})",
+                str(len(self.spans)),
+                f"{wall_time:.3f}",
+                "",
+                "",
+                "",
+                str(total_tokens),
+                f"{total_cost:.4f}",
+            )
+        )
+        header = ("Node", "Calls", "Total s", "Mean ms", "Max ms", "Wait ms", "Tokens", "Cost")
+        widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+
+        def format_row(row: Tuple[str, ...]) -> str:
+            return "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))
+            )
+
+        separator = "-" * len(format_row(header))
+        lines = [format_row(header), separator] + [format_row(row) for row in rows[:-1]]
+        return "\n".join(lines + [separator, format_row(rows[-1])])
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Return the profile in the Chrome trace event format.
+
+        Each run is a process and each lane a thread, so nodes running at the same time,
+        such as parallel branches, appear on separate rows.
+        """
+        events: List[Dict[str, Any]] = []
+        for run in self._runs:
+            events.append({"name": "process_name", "ph": "M", "pid": run.index, "args": {"name": f"run {run.index}"}})
+            for lane in range(len(run.lanes)):
+                events.append(
+                    {"name": "thread_name", "ph": "M", "pid": run.index, "tid": lane, "args": {"name": f"lane {lane}"}}
+                )
+            if run.end is not None:
+                events.append(
+                    {
+                        "name": "workflow",
+                        "cat": "workflow",
+                        "ph": "X",
+                        "ts": run.start * 1e6,
+                        "dur": (run.end - run.start) * 1e6,
+                        "pid": run.index,
+                        "tid": 0,
+                    }
+                )
+        for span in self.spans:
+            if span.end is None:
+                continue
+            args: Dict[str, Any] = {
+                "iteration": span.iteration,
+                "status": span.status,
+                "queue_wait_ms": round(span.queue_wait * 1000, 3),
+            }
+            if span.workflow:
+                args["workflow"] = "/".join(span.workflow)
+            if span.cached:
+                args["cached"] = True
+            args.update({key: value for key, value in span.total_usage().items() if value})
+            events.append(
+                {
+                    "name": span.node_name,
+                    "cat": "sub_workflow" if span.sub_workflow else "node",
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": span.run,
+                    "tid": span.lane,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Write the Chrome trace of the profile to a JSON file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        logger.info(f"Saved workflow trace to {path}")
@@ -0,0 +1,397 @@
+"""
+LLM rate limiting module.
+
+This module coordinates the LLM calls made by `Nodes.llm_node` and
+`Nodes.structured_llm_node` so that parallel branches and batches stay within provider
+quotas. A `RateLimiter` is activated for a block of code with `rate_limited()`, or
+attached to a workflow; every LLM call made inside it, including from tasks started
+there, goes through `RateLimiter.call`, which:
+
+- waits for the model's request bucket (requests per minute) and token bucket (tokens
+  per minute, charged with an estimate and corrected with the reported usage);
+- holds one of the model's concurrency slots while the request is in flight. With
+  `adaptive=True` the number of slots follows AIMD: it is halved when the provider
+  answers 429, reduced slightly when latency climbs well above its baseline, and grows
+  back by about one slot per window of successful calls;
+- retries rate-limited calls with exponential backoff and full jitter, honoring the
+  provider's Retry-After header when present.
+
+Limits are keyed by the model name as passed to litellm. The key "*" applies to
+models without their own limit.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_active_limiter: ContextVar[Optional["RateLimiter"]] = ContextVar("rate_limiter", default=None)
+
+# Rough size of a token, used to estimate the tokens of a request before sending it
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 1.0):
+        """Create a bucket allowing `per_minute` tokens per minute, with `burst_seconds` of burst."""
+        if per_minute <= 0:
+            raise ValueError("Rate limits must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Wait until `amount` tokens are available and take them.
+
+        An amount larger than the capacity waits for a full bucket and leaves it in
+        debt, so later requests wait until the excess has been refilled.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= min(amount, self.capacity):
+                    self.tokens -= amount
+                    return waited
+                delay = (min(amount, self.capacity) - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, amount: float) -> None:
+        """Take `amount` more tokens without waiting, or give them back when negative."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted with additive increase, multiplicative decrease.
+
+    The limit starts at `max_limit`. A rate-limited call halves it and a call slower
+    than `latency_tolerance` times the baseline latency reduces it by 10%, at most once
+    per `cooldown` seconds so that a burst of failures counts as one congestion
+    signal. Every successful call adds 1/limit, about one slot per window of calls.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        adaptive: bool = True,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+    ):
+        """Initialize the limit.
+
+        Args:
+            max_limit: Upper bound and starting value of the limit.
+            min_limit: Lower bound of the limit.
+            adaptive: Adjust the limit from outcomes; a fixed limit when False.
+            latency_tolerance: Latency, as a multiple of the baseline, treated as congestion.
+            cooldown: Minimum seconds between two decreases.
+        """
+        if max_limit < 1 or min_limit < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(max_limit)
+        self.adaptive = adaptive
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot while the block runs, waiting until the limit allows it."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        if int(self.limit) != previous:
+            logger.debug(f"Concurrency limit lowered from {previous} to {int(self.limit)}")
+
+    def on_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds."""
+        if not self.adaptive:
+            return
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        if latency > self.latency_tolerance * self.baseline_latency:
+            self._decrease(0.9)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        # The baseline follows slow drifts of the provider's latency
+        self.baseline_latency = 0.95 * self.baseline_latency + 0.05 * min(latency, self.baseline_latency * 2)
+
+    def on_rate_limited(self) -> None:
+        """Record a call rejected by the provider's rate limit."""
+        if self.adaptive:
+            self._decrease(0.5)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an error, or the error it was raised from, is a provider rate limit (HTTP 429)."""
+    seen: List[BaseException] = []
+    current: Optional[BaseException] = error
+    while current is not None and current not in seen:
+        if getattr(current, "status_code", None) == 429 or type(current).__name__ == "RateLimitError":
+            return True
+        seen.append(current)
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """Estimate the tokens a chat request consumes: its prompt plus the completion budget."""
+    characters = sum(len(str(message.get("content") or "")) for message in messages)
+    return characters // CHARS_PER_TOKEN + (max_tokens or 0)
+
+
+class RateLimiter:
+    """Per-model request and token rate limits, adaptive concurrency and retries."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[Dict[str, float]] = None,
+        tokens_per_minute: Optional[Dict[str, float]] = None,
+        max_concurrency: Optional[Dict[str, int]] = None,
+        adaptive: bool = True,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute by model name, "*" for
+                any other model.
+            tokens_per_minute: Maximum prompt and completion tokens per minute by model name.
+            max_concurrency: Maximum requests in flight by model name.
+            adaptive: Lower the concurrency limit on 429s and high latency, and raise it
+                back on success; when False, `max_concurrency` is a fixed limit.
+            max_retries: Retries of a rate-limited request before giving up.
+            backoff_base: Upper bound in seconds of the first retry's random delay,
+                doubled at every retry.
+            backoff_max: Maximum delay in seconds between two retries.
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative")
+        self.requests_per_minute = dict(requests_per_minute or {})
+        self.tokens_per_minute = dict(tokens_per_minute or {})
+        self.max_concurrency = dict(max_concurrency or {})
+        self.adaptive = adaptive
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: Dict[str, TokenBucket] = {}
+        self._concurrency: Dict[str, AdaptiveConcurrency] = {}
+
+    @classmethod
+    def from_model_limits(cls, models: Dict[str, Dict[str, float]], **options: Any) -> "RateLimiter":
+        """Create a limiter from limits grouped by model.
+
+        Args:
+            models: Model name, or "*", to a dict with any of `requests_per_minute`,
+                `tokens_per_minute` and `max_concurrency`.
+            **options: `adaptive`, `max_retries`, `backoff_base` and `backoff_max`.
+        """
+        limits: Dict[str, Dict[str, Any]] = {
+            "requests_per_minute": {},
+            "tokens_per_minute": {},
+            "max_concurrency": {},
+        }
+        for model, model_limits in models.items():
+            for name, value in model_limits.items():
+                if name not in limits:
+                    raise ValueError(f"Unknown rate limit '{name}' for model '{model}'")
+                if value is not None:
+                    limits[name][model] = int(value) if name == "max_concurrency" else value
+        return cls(**limits, **options)
+
+    @staticmethod
+    def _key(limits: Dict[str, Any], model: str) -> Optional[str]:
+        if model in limits:
+            return model
+        return "*" if "*" in limits else None
+
+    def _bucket(self, model: str) -> Optional[TokenBucket]:
+        key = self._key(self.requests_per_minute, model)
+        if key is None:
+            return None
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self.requests_per_minute[key])
+        return self._buckets[key]
+
+    def _token_bucket(self, model: str) -> Optional[TokenBucket]:
+        key = self._key(self.tokens_per_minute, model)
+        if key is None:
+            return None
+        if key not in self._token_buckets:
+            # A minute of burst, so that a single large request fits in the bucket
+            self._token_buckets[key] = TokenBucket(self.tokens_per_minute[key], burst_seconds=60.0)
+        return self._token_buckets[key]
+
+    def concurrency(self, model: str) -> Optional[AdaptiveConcurrency]:
+        """Return the concurrency limit applied to `model`, if any."""
+        key = self._key(self.max_concurrency, model)
+        if key is None:
+            return None
+        if key not in self._concurrency:
+            self._concurrency[key] = AdaptiveConcurrency(self.max_concurrency[key], adaptive=self.adaptive)
+        return self._concurrency[key]
+
+    async def acquire(self, model: str) -> None:
+        """Wait until a request to `model` is allowed."""
+        bucket = self._bucket(model)
+        if bucket is None:
+            return
+        waited = await bucket.acquire()
+        if waited:
+            logger.debug(f"Rate limit delayed request to {model} by {waited:.2f}s")
+
+    async def acquire_tokens(self, model: str, tokens: float) -> None:
+        """Wait until `tokens` more tokens may be sent to `model`."""
+        bucket = self._token_bucket(model)
+        if bucket is None or tokens <= 0:
+            return
+        waited = await bucket.acquire(tokens)
+        if waited:
+            logger.debug(f"Token limit delayed request to {model} by {waited:.2f}s")
+
+    def record_tokens(self, model: str, estimated: float, actual: Optional[float]) -> None:
+        """Correct the token bucket of `model` once the actual usage of a request is known."""
+        bucket = self._token_bucket(model)
+        if bucket is not None and actual is not None:
+            bucket.adjust(actual - estimated)
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Return the delay before retry number `attempt` (from 0), with full jitter."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    async def call(
+        self,
+        model: str,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: float = 0,
+        usage: Optional[Callable[[T], Optional[float]]] = None,
+    ) -> T:
+        """Send a request to `model` within its limits, retrying when it is rate limited.
+
+        Args:
+            model: Model the request is sent to.
+            request: Creates and awaits the request; called again for every retry.
+            estimated_tokens: Tokens the request is expected to consume.
+            usage: Returns the tokens a response actually consumed.
+
+        Returns:
+            The response of the first attempt that is not rate limited.
+        """
+        concurrency = self.concurrency(model)
+        attempt = 0
+        while True:
+            await self.acquire(model)
+            await self.acquire_tokens(model, estimated_tokens)
+            start = time.monotonic()
+            try:
+                if concurrency is None:
+                    response = await request()
+                else:
+                    async with concurrency.slot():
+                        start = time.monotonic()
+                        response = await request()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                if concurrency is not None:
+                    concurrency.on_rate_limited()
+                # The rejected request consumed no tokens
+                self.record_tokens(model, estimated_tokens, 0)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e)
+                attempt += 1
+                logger.warning(f"Request to {model} rate limited, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            if concurrency is not None:
+                concurrency.on_success(time.monotonic() - start)
+            if usage is not None:
+                try:
+                    self.record_tokens(model, estimated_tokens, usage(response))
+                except Exception as e:
+                    logger.debug(f"Could not read token usage of a response from {model}: {e}")
+            return response
+
+
+@contextmanager
+def rate_limited(limiter: Optional[RateLimiter]) -> Iterator[Optional[RateLimiter]]:
+    """Apply `limiter` to the LLM calls made inside the block."""
+    token = _active_limiter.set(limiter)
+    try:
+        yield limiter
+    finally:
+        _active_limiter.reset(token)
+
+
+def active_rate_limiter() -> Optional[RateLimiter]:
+    """Return the rate limiter applied to the current task, if any."""
+    return _active_limiter.get()
+
+
+async def call_with_rate_limit(  # noqa: UP047 - type parameter syntax needs Python 3.12
+    model: str,
+    request: Callable[[], Awaitable[T]],
+    estimated_tokens: float = 0,
+    usage: Optional[Callable[[T], Optional[float]]] = None,
+) -> T:
+    """Send a request through the active rate limiter, or directly when there is none."""
+    limiter = _active_limiter.get()
+    if limiter is None:
+        return await request()
+    return await limiter.call(model, request, estimated_tokens, usage)
@@ -0,0 +1,167 @@
+"""
+Token streaming module.
+
+A streaming LLM node (`Nodes.llm_node(stream=True)`) returns a `TokenStream` as soon as
+its request is prepared, instead of the generated text. The engine stores the stream in
+the context and moves on while the text is generated:
+
+- nodes declared with `stream_consumer=True` receive the stream itself and can process
+  the text chunk by chunk with `async for chunk in stream`;
+- other nodes receive the complete text, waiting for the end of the generation;
+- observers receive a `NODE_STREAM_DELTA` event per chunk and a `NODE_STREAM_COMPLETED`
+  event with the text and token usage at the end.
+
+When the workflow completes, streams left in the context are replaced by their text.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, MutableMapping
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+DeltaListener = Callable[[str], Awaitable[None]]
+CompletionListener = Callable[["TokenStream"], Awaitable[None]]
+
+
+class TokenStream:
+    """Text generated incrementally, readable by any number of consumers.
+
+    Chunks are pulled from the source by a background task once the stream is started,
+    and kept, so every consumer sees the whole text from the first chunk whenever it
+    starts iterating. Iterating or awaiting `text()` starts the stream.
+    """
+
+    def __init__(self, source: AsyncIterator[str], usage: Optional[Dict[str, Any]] = None):
+        """Create a stream over `source`.
+
+        Args:
+            source: Async iterator of text chunks, not consumed until the stream starts.
+            usage: Dict the source fills with the token usage of the generation.
+        """
+        self._source = source
+        self.usage: Dict[str, Any] = usage if usage is not None else {}
+        self.chunks: List[str] = []
+        self.error: Optional[BaseException] = None
+        self._delta_listeners: List[DeltaListener] = []
+        self._completion_listeners: List[CompletionListener] = []
+        self._task: Optional[asyncio.Task] = None
+        self._done = False
+        self._updated = asyncio.Event()
+
+    @classmethod
+    def from_text(cls, text: str, usage: Optional[Dict[str, Any]] = None) -> "TokenStream":
+        """Create a stream yielding already generated text as a single chunk."""
+
+        async def source() -> AsyncIterator[str]:
+            yield text
+
+        return cls(source(), usage)
+
+    @property
+    def done(self) -> bool:
+        """Whether the generation has ended, successfully or not."""
+        return self._done
+
+    def add_listener(self, on_delta: DeltaListener, on_complete: Optional[CompletionListener] = None) -> None:
+        """Await `on_delta` with each new chunk, and `on_complete` with the stream when it ends.
+
+        Listeners must be added before the stream starts to see every chunk.
+        """
+        self._delta_listeners.append(on_delta)
+        if on_complete is not None:
+            self._completion_listeners.append(on_complete)
+
+    def start(self) -> "TokenStream":
+        """Start pulling chunks from the source in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        return self
+
+    async def _pump(self) -> None:
+        try:
+            async for delta in self._source:
+                if not delta:
+                    continue
+                self.chunks.append(delta)
+                self._wake()
+                for listener in self._delta_listeners:
+                    await listener(delta)
+        except asyncio.CancelledError:
+            self.error = RuntimeError("Token stream closed before the end of the generation")
+            raise
+        except Exception as e:
+            logger.error(f"Token stream failed: {e}")
+            self.error = e
+        finally:
+            self._done = True
+            self._wake()
+        for listener in self._completion_listeners:
+            await listener(self)
+
+    def _wake(self) -> None:
+        """Wake the consumers waiting for a chunk."""
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """Iterate over the chunks, from the first one, as they are generated."""
+        self.start()
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self._done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._updated.wait()
+
+    async def text(self) -> str:
+        """Wait for the end of the generation and return the complete text."""
+        self.start()
+        if not self._done:
+            # asyncio.wait leaves the generation running if the caller is cancelled
+            await asyncio.wait({self._task})
+        if self.error is not None:
+            raise self.error
+        return "".join(self.chunks)
+
+    async def aclose(self) -> None:
+        """Stop the generation, if it is still running."""
+        if self._task is None:
+            close = getattr(self._source, "aclose", None)
+            if close is not None:
+                await close()
+            self.error = RuntimeError("Token stream closed before the end of the generation")
+            self._done = True
+        elif not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def __repr__(self) -> str:
+        """Describe the stream without its text, which may be long."""
+        state = "done" if self._done else "streaming"
+        return f"TokenStream({state}, {sum(len(chunk) for chunk in self.chunks)} chars)"
+
+
+async def resolve_streams(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Return `values` with every `TokenStream` replaced by its complete text."""
+    if not any(isinstance(value, TokenStream) for value in values.values()):
+        return values
+    return {key: await value.text() if isinstance(value, TokenStream) else value for key, value in values.items()}
+
+
+async def finish_streams(context: MutableMapping) -> None:
+    """Replace the streams stored in `context` by their complete text."""
+    for key, value in list(context.items()):
+        if isinstance(value, TokenStream):
+            context[key] = await value.text()
+
+
+async def close_streams(context: MutableMapping) -> None:
+    """Stop the generations still running for the streams stored in `context`."""
+    for value in list(context.values()):
+        if isinstance(value, TokenStream):
+            await value.aclose()
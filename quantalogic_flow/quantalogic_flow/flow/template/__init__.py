@@ -1,6 +1,6 @@
 """Template module initialization."""
 
-from .engine import TemplateEngine
+from .engine import TEMPLATE_CACHE, TemplateCache, TemplateEngine
 from .utils import TEMPLATES_DIR, get_template_path
 
-__all__ = ["TemplateEngine", "TEMPLATES_DIR", "get_template_path"]
+__all__ = ["TemplateEngine", "TemplateCache", "TEMPLATE_CACHE", "TEMPLATES_DIR", "get_template_path"]
@@ -2,28 +2,120 @@
 Template engine module.
 
 This module contains the template rendering functionality.
+
+Compiled templates are kept in a process-wide LRU cache: inline templates are keyed by their
+source string, template files by resolved path and modification time, so an edited file is
+recompiled on its next use. Files in the same directory share one Jinja2 environment.
 """
 
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound
 from loguru import logger
 
+DEFAULT_TEMPLATE_CACHE_SIZE = 512
+
+
+class TemplateCache:
+    """Thread-safe LRU cache of compiled Jinja2 templates."""
+
+    def __init__(self, max_entries: int = DEFAULT_TEMPLATE_CACHE_SIZE):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of compiled templates kept.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._templates: OrderedDict[Tuple, Template] = OrderedDict()
+        # cache_size=0: compiled templates are only cached here, so the environments never stat files
+        self._string_env = Environment(cache_size=0)
+        self._file_envs: Dict[Path, Environment] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Tuple) -> Optional[Template]:
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._templates.move_to_end(key)
+            return template
+
+    def _store(self, key: Tuple, template: Template) -> None:
+        with self._lock:
+            self._templates[key] = template
+            if len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+
+    def from_string(self, source: str) -> Template:
+        """Return the compiled template for an inline template string."""
+        key = ("string", source)
+        template = self._lookup(key)
+        if template is None:
+            template = self._string_env.from_string(source)
+            self._store(key, template)
+        return template
+
+    def from_file(self, template_file: str) -> Template:
+        """Return the compiled template for a file, recompiling it when the file changed.
+
+        Raises:
+            TemplateNotFound: If the file does not exist.
+        """
+        file_path = Path(template_file).resolve()
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError as e:
+            raise TemplateNotFound(file_path.name) from e
+        key = ("file", file_path, mtime)
+        template = self._lookup(key)
+        if template is None:
+            template = self._environment(file_path.parent).get_template(file_path.name)
+            self._store(key, template)
+        return template
+
+    def _environment(self, directory: Path) -> Environment:
+        """Return the shared environment loading templates from `directory`."""
+        with self._lock:
+            env = self._file_envs.get(directory)
+            if env is None:
+                env = self._file_envs[directory] = Environment(loader=FileSystemLoader(directory), cache_size=0)
+            return env
+
+    def clear(self) -> None:
+        """Drop all compiled templates and environments and reset the counters."""
+        with self._lock:
+            self._templates.clear()
+            self._file_envs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached templates."""
+        return len(self._templates)
+
+
+# Process-wide cache shared by all nodes
+TEMPLATE_CACHE = TemplateCache()
+
 
 class TemplateEngine:
     """Template rendering engine using Jinja2."""
-    
+
+    cache = TEMPLATE_CACHE
+
     @staticmethod
     def load_prompt_from_file(prompt_file: str, context: Dict[str, Any]) -> str:
         """Load and render a Jinja2 template from an external file."""
         try:
-            file_path = Path(prompt_file).resolve()
-            directory = file_path.parent
-            filename = file_path.name
-            env = Environment(loader=FileSystemLoader(directory))
-            template = env.get_template(filename)
-            return template.render(**context)
+            return TemplateEngine.cache.from_file(prompt_file).render(**context)
         except TemplateNotFound as e:
             logger.error(f"Jinja2 template file '{prompt_file}' not found: {e}")
             raise ValueError(f"Prompt file '{prompt_file}' not found") from e
@@ -37,7 +129,22 @@ class TemplateEngine:
         if template_file:
             return TemplateEngine.load_prompt_from_file(template_file, context)
         try:
-            return Template(template).render(**context)
+            return TemplateEngine.cache.from_string(template).render(**context)
         except Exception as e:
             logger.error(f"Error rendering template: {e}")
             raise
+
+    @staticmethod
+    def precompile(template: str = "", template_file: Optional[str] = None) -> None:
+        """Compile a template into the cache ahead of its first render.
+
+        Raises:
+            ValueError: If the template file does not exist.
+        """
+        if template_file:
+            try:
+                TemplateEngine.cache.from_file(template_file)
+            except TemplateNotFound as e:
+                raise ValueError(f"Prompt file '{template_file}' not found") from e
+        elif template:
+            TemplateEngine.cache.from_string(template)
@@ -0,0 +1,283 @@
+"""Unit tests for the batch runner and LLM rate limits."""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from quantalogic_flow.flow.batch import BatchRunner, load_completed_ids, main, read_contexts
+from quantalogic_flow.flow.flow import Nodes, Workflow
+from quantalogic_flow.flow.flow_manager import WorkflowManager
+from quantalogic_flow.flow.rate_limit import (
+    AdaptiveConcurrency,
+    RateLimiter,
+    TokenBucket,
+    active_rate_limiter,
+    rate_limited,
+)
+
+
+def _write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+@pytest.fixture
+def double_workflow(nodes_registry_backup):
+    """A workflow doubling `value` into `doubled`, failing on negative values."""
+    @Nodes.define(output="doubled")
+    async def double_value(value):
+        if value < 0:
+            raise ValueError("negative value")
+        await asyncio.sleep(0.001)
+        return value * 2
+
+    return Workflow("double_value")
+
+
+class TestBatchRunner:
+    """Test running a workflow over many contexts."""
+
+    @pytest.mark.asyncio
+    async def test_results_stream_to_output(self, double_workflow, tmp_path):
+        """Every context gets one output line, failures included."""
+        inputs = tmp_path / "inputs.jsonl"
+        output = tmp_path / "out" / "results.jsonl"
+        _write_jsonl(inputs, [{"value": 1}, {"value": -1}, {"value": 3}])
+        progress = []
+
+        runner = BatchRunner(double_workflow, concurrency=2, output_keys=["doubled"], on_progress=progress.append)
+        report = await runner.run(inputs, output)
+
+        records = {record["id"]: record for record in _read_jsonl(output)}
+        assert records["0"] == {**records["0"], "status": "ok", "result": {"doubled": 2}}
+        assert records["1"]["status"] == "error"
+        assert "negative value" in records["1"]["error"]
+        assert records["2"]["result"] == {"doubled": 6}
+        assert (report.total, report.succeeded, report.failed) == (3, 2, 1)
+        assert progress[-1] is report
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, nodes_registry_backup, tmp_path):
+        """No more runs than the concurrency limit are in flight."""
+        running = 0
+        peak = 0
+
+        @Nodes.define(output="done")
+        async def track_runs(value):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.005)
+            running -= 1
+            return value
+
+        runner = BatchRunner(Workflow("track_runs"), concurrency=3)
+        report = await runner.run([{"value": i} for i in range(10)], tmp_path / "out.jsonl")
+
+        assert report.succeeded == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed(self, double_workflow, tmp_path):
+        """A restarted batch only runs contexts without a successful result."""
+        inputs = [{"key": "a", "value": 1}, {"key": "b", "value": 2}, {"key": "c", "value": 3}]
+        output = tmp_path / "results.jsonl"
+        # A previous run completed "a", failed "b" and crashed while writing "c"
+        output.write_text(
+            json.dumps({"id": "a", "status": "ok", "result": {}}) + "\n"
+            + json.dumps({"id": "b", "status": "error", "error": "boom"}) + "\n"
+            + '{"id": "c", "sta'
+        )
+
+        runner = BatchRunner(double_workflow, id_key="key", output_keys=["doubled"])
+        report = await runner.run(inputs, output)
+
+        assert (report.skipped, report.succeeded) == (1, 2)
+        assert load_completed_ids(output) == {"a", "b", "c"}
+
+        report = await runner.run(inputs, output, resume=False)
+        assert (report.skipped, report.succeeded) == (0, 3)
+        assert len(_read_jsonl(output)) == 3
+
+    def test_read_contexts_rejects_unknown_format(self, tmp_path):
+        """Only JSONL and Parquet inputs are supported."""
+        path = tmp_path / "inputs.csv"
+        path.write_text("value\n1\n")
+        with pytest.raises(ValueError, match="Unsupported input file"):
+            list(read_contexts(path))
+
+    def test_read_parquet(self, tmp_path):
+        """Parquet rows are read as contexts."""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "inputs.parquet"
+        pq.write_table(pa.table({"value": [1, 2]}), str(path))
+
+        assert list(read_contexts(path)) == [{"value": 1}, {"value": 2}]
+
+    def test_cli(self, nodes_registry_backup, tmp_path):
+        """The CLI runs a YAML workflow and returns non-zero when a context failed."""
+        manager = WorkflowManager()
+        manager.add_function(name="shout", type_="embedded", code="def shout(text):\n    return text.upper()")
+        manager.add_node(name="shout", function="shout", output="loud")
+        manager.set_start_node("shout")
+        workflow_path = tmp_path / "workflow.yaml"
+        manager.save_to_yaml(workflow_path)
+        inputs = tmp_path / "inputs.jsonl"
+        output = tmp_path / "results.jsonl"
+        _write_jsonl(inputs, [{"text": "hi"}, {"text": None}])
+
+        exit_code = main([str(workflow_path), str(inputs), "-o", str(output), "--output-key", "loud"])
+
+        records = _read_jsonl(output)
+        assert exit_code == 1
+        assert records[0]["result"] == {"loud": "HI"}
+        assert records[1]["status"] == "error"
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider's HTTP 429 error."""
+
+    status_code = 429
+
+
+class TestRateLimiter:
+    """Test per-model rate limits, adaptive concurrency and retries."""
+
+    @pytest.mark.asyncio
+    async def test_bucket_spaces_requests(self):
+        """Requests beyond the burst wait for the bucket to refill."""
+        bucket = TokenBucket(per_minute=1200)  # 20 per second
+        start = time.monotonic()
+        for _ in range(25):
+            await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_limits_apply_per_model(self):
+        """Only models with a limit, or the "*" default, get a bucket."""
+        limiter = RateLimiter({"slow-model": 60})
+        await limiter.acquire("slow-model")
+        await limiter.acquire("other-model")
+
+        assert set(limiter._buckets) == {"slow-model"}
+
+    @pytest.mark.asyncio
+    async def test_llm_node_waits_for_active_limiter(self, mock_llm_response, nodes_registry_backup):
+        """LLM nodes acquire the active limiter before calling the model."""
+        calls = []
+
+        class RecordingLimiter(RateLimiter):
+            async def acquire(self, model):
+                calls.append(model)
+
+        @Nodes.llm_node(output="answer", prompt_template="{{ question }}", model="gpt-4o-mini")
+        async def limited_llm(question):
+            pass
+
+        with patch("quantalogic_flow.flow.nodes.acompletion", return_value=mock_llm_response):
+            await limited_llm(question="outside")
+            with rate_limited(RecordingLimiter()):
+                await limited_llm(question="inside")
+
+        assert calls == ["gpt-4o-mini"]
+
+    @pytest.mark.asyncio
+    async def test_token_usage_is_reconciled(self):
+        """The token bucket is charged the estimate, then corrected with the actual usage."""
+        limiter = RateLimiter(tokens_per_minute={"*": 60})
+
+        async def request():
+            return 10
+
+        await limiter.call("gpt-4o-mini", request, estimated_tokens=50, usage=lambda tokens: tokens)
+
+        assert limiter._token_buckets["*"].tokens == pytest.approx(50, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_calls_retry_and_halve_concurrency(self):
+        """429s are retried after a backoff, and a burst of them halves the limit once."""
+        limiter = RateLimiter(max_concurrency={"gpt-4o-mini": 8}, backoff_base=0.01)
+        attempts = []
+
+        async def request():
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise RateLimitError("Too many requests")
+            return "ok"
+
+        assert await limiter.call("gpt-4o-mini", request) == "ok"
+        assert len(attempts) == 3
+        assert limiter.concurrency("gpt-4o-mini").limit == pytest.approx(4, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """The last rate limit error is raised once the retries are exhausted; others are not retried."""
+        limiter = RateLimiter(max_retries=1, backoff_base=0.01)
+        attempts = []
+
+        async def rate_limited_request():
+            attempts.append(1)
+            raise RateLimitError("Too many requests")
+
+        async def failing_request():
+            attempts.append(1)
+            raise KeyError("boom")
+
+        with pytest.raises(RateLimitError):
+            await limiter.call("gpt-4o-mini", rate_limited_request)
+        with pytest.raises(KeyError):
+            await limiter.call("gpt-4o-mini", failing_request)
+        assert len(attempts) == 3
+
+    def test_adaptive_concurrency(self):
+        """The limit is halved on 429s, lowered on latency spikes and grows back on success."""
+        concurrency = AdaptiveConcurrency(8, cooldown=0)
+        concurrency.on_rate_limited()
+        assert int(concurrency.limit) == 4
+
+        for _ in range(50):
+            concurrency.on_success(0.1)
+        assert concurrency.limit == 8
+
+        concurrency.on_success(1.0)
+        assert concurrency.limit < 8
+
+        fixed = AdaptiveConcurrency(8, adaptive=False)
+        fixed.on_rate_limited()
+        assert fixed.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_workflow_manager_rate_limits(self, nodes_registry_backup, tmp_path):
+        """Limits declared in YAML are applied to the runs of the instantiated workflow."""
+        manager = WorkflowManager()
+        manager.add_function(
+            name="current_limiter",
+            type_="embedded",
+            code=(
+                "from quantalogic_flow.flow.rate_limit import active_rate_limiter\n"
+                "def current_limiter():\n"
+                "    return active_rate_limiter()"
+            ),
+        )
+        manager.add_node(name="current_limiter", function="current_limiter", output="limiter")
+        manager.set_start_node("current_limiter")
+        manager.set_rate_limit("gpt-4o-mini", requests_per_minute=600, tokens_per_minute=90000, max_concurrency=4)
+        manager.save_to_yaml(tmp_path / "workflow.yaml")
+
+        loaded = WorkflowManager()
+        loaded.load_from_yaml(tmp_path / "workflow.yaml")
+        workflow = loaded.instantiate_workflow()
+        result = await workflow.build().run({})
+
+        assert result["limiter"] is workflow.rate_limiter
+        assert workflow.rate_limiter.requests_per_minute == {"gpt-4o-mini": 600}
+        assert workflow.rate_limiter.tokens_per_minute == {"gpt-4o-mini": 90000}
+        assert workflow.rate_limiter.max_concurrency == {"gpt-4o-mini": 4}
+        assert active_rate_limiter() is None
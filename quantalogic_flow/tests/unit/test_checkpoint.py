@@ -0,0 +1,169 @@
+"""Unit tests for workflow checkpointing and resume."""
+
+import pytest
+from quantalogic_flow.flow.checkpoint import (
+    Checkpointer,
+    FileCheckpointBackend,
+    SQLiteCheckpointBackend,
+)
+from quantalogic_flow.flow.flow import Nodes, Workflow
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def checkpointer(request, tmp_path):
+    """Provide a checkpointer for each backend."""
+    if request.param == "file":
+        return Checkpointer.file(tmp_path / "checkpoints")
+    return Checkpointer.sqlite(tmp_path / "checkpoints.db")
+
+
+class RecordingBackend:
+    """Backend wrapper recording what each write contains."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.writes = []
+
+    def write(self, run_id, changed, removed, position):
+        self.writes.append((dict(changed), list(removed), dict(position)))
+        self.backend.write(run_id, changed, removed, position)
+
+    def read(self, run_id):
+        return self.backend.read(run_id)
+
+    def delete(self, run_id):
+        self.backend.delete(run_id)
+
+    def list_runs(self):
+        return self.backend.list_runs()
+
+
+class TestCheckpointer:
+    """Test incremental serialization of contexts."""
+
+    def test_round_trip(self, checkpointer):
+        """Saved contexts and positions load back unchanged."""
+        checkpointer.save("run1", {"text": "hello", "items": [1, 2], "obj": {1, 2}}, {"next_node": "b"})
+
+        checkpoint = checkpointer.load("run1")
+
+        assert checkpoint.context == {"text": "hello", "items": [1, 2], "obj": {1, 2}}
+        assert checkpoint.position == {"next_node": "b"}
+        assert not checkpoint.done
+        assert checkpointer.list_runs() == ["run1"]
+
+    def test_only_changed_keys_are_written(self, tmp_path):
+        """Unchanged keys are not rewritten and removed keys are recorded."""
+        backend = RecordingBackend(SQLiteCheckpointBackend(tmp_path / "c.db"))
+        checkpointer = Checkpointer(backend)
+
+        checkpointer.save("run", {"big": "x" * 1000, "step": 1}, {})
+        checkpointer.save("run", {"big": "x" * 1000, "step": 2}, {})
+        checkpointer.save("run", {"step": 2}, {})
+
+        assert set(backend.writes[0][0]) == {"big", "step"}
+        assert set(backend.writes[1][0]) == {"step"}
+        assert backend.writes[2] == ({}, ["big"], {})
+        assert checkpointer.load("run").context == {"step": 2}
+
+    def test_file_backend_compaction(self, tmp_path):
+        """Compaction keeps the replayed state identical."""
+        checkpointer = Checkpointer(FileCheckpointBackend(tmp_path, compact_every=3))
+        for step in range(7):
+            checkpointer.save("run", {"step": step, f"k{step}": step}, {"next_node": str(step)})
+
+        lines = (tmp_path / "run.jsonl").read_text().splitlines()
+        checkpoint = Checkpointer(FileCheckpointBackend(tmp_path)).load("run")
+
+        assert len(lines) < 7
+        assert checkpoint.context == {"step": 6, "k6": 6}
+        assert checkpoint.position == {"next_node": "6"}
+
+    def test_invalid_run_id(self, tmp_path):
+        """Run ids cannot escape the checkpoint directory."""
+        with pytest.raises(ValueError, match="Invalid run id"):
+            Checkpointer.file(tmp_path).save("../evil", {}, {})
+
+    def test_unknown_run(self, checkpointer):
+        """Loading an unknown run returns None."""
+        assert checkpointer.load("missing") is None
+
+
+class TestEngineResume:
+    """Test resuming workflow runs."""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_nodes(self, nodes_registry_backup, checkpointer):
+        """A failed run resumes at the failing node with earlier outputs restored."""
+        calls = []
+        should_fail = True
+
+        @Nodes.define(output="first")
+        def step_one(text):
+            calls.append("step_one")
+            return text.upper()
+
+        @Nodes.define(output="second")
+        def step_two(first):
+            calls.append("step_two")
+            if should_fail:
+                raise RuntimeError("flaky")
+            return first + "!"
+
+        workflow = Workflow("step_one").then("step_two")
+        engine = workflow.build(checkpointer=checkpointer, run_id="job")
+        with pytest.raises(RuntimeError):
+            await engine.run({"text": "hi"})
+
+        should_fail = False
+        result = await workflow.build(checkpointer=checkpointer).resume("job")
+
+        assert result["second"] == "HI!"
+        assert calls == ["step_one", "step_two", "step_two"]
+        assert checkpointer.load("job").done
+
+    @pytest.mark.asyncio
+    async def test_resume_completes_parallel_block(self, nodes_registry_backup, checkpointer):
+        """Branches finished before a failure are not re-run."""
+        calls = []
+        should_fail = True
+
+        @Nodes.define(output="ready")
+        def par_start():
+            return True
+
+        @Nodes.define(output="left")
+        async def par_left(ready):
+            calls.append("par_left")
+            return "L"
+
+        @Nodes.define(output="right")
+        async def par_right(ready):
+            calls.append("par_right")
+            if should_fail:
+                raise RuntimeError("flaky")
+            return "R"
+
+        @Nodes.define(output="joined")
+        def par_join(left, right):
+            return left + right
+
+        workflow = Workflow("par_start").parallel("par_left", "par_right").converge("par_join")
+        with pytest.raises(RuntimeError):
+            await workflow.build(checkpointer=checkpointer, run_id="par").run({})
+
+        should_fail = False
+        result = await workflow.build(checkpointer=checkpointer).resume("par")
+
+        assert result["joined"] == "LR"
+        assert calls.count("par_left") == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_requires_checkpointer(self, nodes_registry_backup):
+        """Resuming without a checkpointer raises ValueError."""
+        @Nodes.define(output="out")
+        def lone_node():
+            return 1
+
+        with pytest.raises(ValueError, match="without a checkpointer"):
+            await Workflow("lone_node").build().resume("any")
@@ -0,0 +1,224 @@
+"""Unit tests for the dataflow scheduler of WorkflowEngine."""
+
+import asyncio
+
+import pytest
+from quantalogic_flow.flow.core.dataflow import build_dependencies, linear_segment
+from quantalogic_flow.flow.flow import Nodes, Workflow, WorkflowEventType
+
+
+class TestDataflowPlanning:
+    """Test segment detection and dependency derivation."""
+
+    def test_linear_segment_stops_at_conditional_transition(self, nodes_registry_backup):
+        """A segment ends at the first node with a conditional transition."""
+        @Nodes.define(output="a")
+        def seg_a(x):
+            return x
+
+        @Nodes.define(output="b")
+        def seg_b(x):
+            return x
+
+        @Nodes.define(output="c")
+        def seg_c(x):
+            return x
+
+        workflow = Workflow("seg_a").then("seg_b").then("seg_c", condition=lambda ctx: True)
+
+        assert linear_segment(workflow, "seg_a") == ["seg_a", "seg_b"]
+        assert linear_segment(workflow, "seg_c") == ["seg_c"]
+
+    def test_dependencies_from_inputs_and_outputs(self, nodes_registry_backup):
+        """Readers wait for writers; unrelated nodes do not wait."""
+        @Nodes.define(output="first")
+        def dep_first(x):
+            return x
+
+        @Nodes.define(output="second")
+        def dep_second(x):
+            return x
+
+        @Nodes.define(output="joined")
+        def dep_join(first, second):
+            return first + second
+
+        workflow = Workflow("dep_first").then("dep_second").then("dep_join")
+        dependencies = build_dependencies(workflow, ["dep_first", "dep_second", "dep_join"])
+
+        assert dependencies["dep_first"] == set()
+        assert dependencies["dep_second"] == set()
+        assert dependencies["dep_join"] == {"dep_first", "dep_second"}
+
+    def test_callable_mapping_is_barrier(self, nodes_registry_backup):
+        """A node with a callable input mapping waits for every earlier node."""
+        @Nodes.define(output="first")
+        def bar_first(x):
+            return x
+
+        @Nodes.define(output="second")
+        def bar_second(value):
+            return value
+
+        workflow = Workflow("bar_first").then("bar_second")
+        workflow.node("bar_second", inputs_mapping={"value": lambda ctx: ctx["x"]})
+        dependencies = build_dependencies(workflow, ["bar_first", "bar_second"])
+
+        assert dependencies["bar_second"] == {"bar_first"}
+
+
+class TestDataflowExecution:
+    """Test running workflows with the dataflow scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_independent_nodes_overlap(self, nodes_registry_backup):
+        """Independent nodes of a sequence run concurrently."""
+        running = 0
+        peak = 0
+
+        async def track():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        @Nodes.define(output="left")
+        async def fetch_left(x):
+            await track()
+            return f"L{x}"
+
+        @Nodes.define(output="right")
+        async def fetch_right(x):
+            await track()
+            return f"R{x}"
+
+        @Nodes.define(output="combined")
+        async def combine(left, right):
+            return f"{left}+{right}"
+
+        workflow = Workflow("fetch_left").then("fetch_right").then("combine")
+        result = await workflow.build(scheduler="dataflow").run({"x": 1})
+
+        assert result["combined"] == "L1+R1"
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_is_respected(self, nodes_registry_backup):
+        """No more than max_concurrency nodes run at once."""
+        running = 0
+        peak = 0
+
+        def make_node(name):
+            @Nodes.define(name=name, output=f"{name}_out")
+            async def node(x):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return x
+
+        for name in ("cap_a", "cap_b", "cap_c"):
+            make_node(name)
+
+        workflow = Workflow("cap_a").sequence("cap_a", "cap_b", "cap_c")
+        await workflow.build(scheduler="dataflow", max_concurrency=1).run({"x": 1})
+
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_loops_and_branches_match_sequential(self, nodes_registry_backup):
+        """Loops and branch conditions give the same result under both schedulers."""
+        @Nodes.define(output="count")
+        def start_count():
+            return 0
+
+        @Nodes.define(output="count")
+        def increment(count):
+            return count + 1
+
+        @Nodes.define(output="total")
+        def report(count):
+            return count
+
+        @Nodes.define(output="label")
+        def big(count):
+            return f"big {count}"
+
+        @Nodes.define(output="label")
+        def small(count):
+            return f"small {count}"
+
+        def build_workflow():
+            return (
+                Workflow("start_count")
+                .loop("increment")
+                .end_loop(condition=lambda ctx: ctx["count"] >= 3, next_node="report")
+                .branch([("big", lambda ctx: ctx["count"] > 3), ("small", None)])
+            )
+
+        sequential = await asyncio.wait_for(build_workflow().build().run({}), timeout=5)
+        dataflow = await asyncio.wait_for(build_workflow().build(scheduler="dataflow").run({}), timeout=5)
+
+        assert sequential["label"] == "small 3"
+        assert dataflow["label"] == sequential["label"]
+        assert dataflow["count"] == sequential["count"]
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates(self, nodes_registry_backup):
+        """A failing node fails the run and emits NODE_FAILED."""
+        events = []
+
+        @Nodes.define(output="ok")
+        async def ok_node(x):
+            return x
+
+        @Nodes.define(output="bad")
+        async def bad_node(x):
+            raise RuntimeError("boom")
+
+        workflow = Workflow("ok_node").then("bad_node")
+        engine = workflow.build(scheduler="dataflow")
+        engine.add_observer(events.append)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await engine.run({"x": 1})
+        assert any(e.event_type == WorkflowEventType.NODE_FAILED for e in events)
+
+    @pytest.mark.asyncio
+    async def test_transitions_reported_in_order(self, nodes_registry_backup):
+        """TRANSITION_EVALUATED events follow the sequence even when nodes overlap."""
+        transitions = []
+
+        @Nodes.define(output="slow")
+        async def slow_node(x):
+            await asyncio.sleep(0.02)
+            return x
+
+        @Nodes.define(output="fast")
+        async def fast_node(x):
+            return x
+
+        @Nodes.define(output="last")
+        async def last_node(x):
+            return x
+
+        def collect(event):
+            if event.event_type == WorkflowEventType.TRANSITION_EVALUATED:
+                transitions.append((event.transition_from, event.transition_to))
+
+        engine = Workflow("slow_node").then("fast_node").then("last_node").build(scheduler="dataflow")
+        engine.add_observer(collect)
+        await asyncio.wait_for(engine.run({"x": 1}), timeout=5)
+
+        assert transitions == [("slow_node", "fast_node"), ("fast_node", "last_node")]
+
+    def test_unknown_scheduler_rejected(self, nodes_registry_backup):
+        """An unknown scheduler name raises ValueError."""
+        @Nodes.define(output="out")
+        def only_node(x):
+            return x
+
+        with pytest.raises(ValueError, match="Unknown scheduler"):
+            Workflow("only_node").build(scheduler="eager")
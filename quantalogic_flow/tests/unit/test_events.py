@@ -1,6 +1,10 @@
 """Unit tests for workflow events and event types."""
 
-from quantalogic_flow.flow.flow import WorkflowEvent, WorkflowEventType
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from quantalogic_flow.flow.flow import Nodes, Workflow, WorkflowEvent, WorkflowEventType
 
 
 class TestWorkflowEventType:
@@ -191,3 +195,85 @@ class TestWorkflowEvent:
         assert event.usage == usage_data
         assert event.usage["total_tokens"] == 75
         assert event.usage["cost"] == 0.002
+
+
+@pytest.fixture
+def three_steps(nodes_registry_backup):
+    """A workflow of three nodes adding one to `value`."""
+    for name in ("step_one", "step_two", "step_three"):
+        Nodes.define(name=name, output="value")(lambda value: value + 1)
+    return Workflow("step_one").then("step_two").then("step_three")
+
+
+class TestObserverSubscriptions:
+    """Test event subscriptions and the async observer queue."""
+
+    @pytest.mark.asyncio
+    async def test_observers_receive_subscribed_types_only(self, three_steps):
+        """Events are only built for event types some observer subscribed to."""
+        completed = []
+        three_steps.add_observer(completed.append, event_types=[WorkflowEventType.NODE_COMPLETED])
+
+        with patch("quantalogic_flow.flow.core.engine.WorkflowEvent", wraps=WorkflowEvent) as event_class:
+            result = await three_steps.build().run({"value": 0})
+
+        assert result["value"] == 3
+        assert [event.node_name for event in completed] == ["step_one", "step_two", "step_three"]
+        assert event_class.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_no_events_without_observers(self, three_steps):
+        """No event is built when nobody observes the run."""
+        with patch("quantalogic_flow.flow.core.engine.WorkflowEvent", wraps=WorkflowEvent) as event_class:
+            await three_steps.build().run({"value": 0})
+
+        assert event_class.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_async_observers_run_off_the_critical_path(self, three_steps):
+        """The run continues while an async observer is still busy with an earlier event."""
+        last_node_ran = asyncio.Event()
+        seen = []
+
+        async def slow_observer(event):
+            if event.node_name == "step_one":
+                await last_node_ran.wait()
+            seen.append(event.node_name)
+
+        def watch_last_node(event):
+            if event.node_name == "step_three":
+                last_node_ran.set()
+
+        three_steps.add_observer(slow_observer, event_types=[WorkflowEventType.NODE_COMPLETED])
+        three_steps.add_observer(watch_last_node, event_types=[WorkflowEventType.NODE_STARTED])
+
+        await asyncio.wait_for(three_steps.build().run({"value": 0}), timeout=5)
+
+        # Every queued call has run by the time run() returns, in order
+        assert seen == ["step_one", "step_two", "step_three"]
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_keeps_order(self, three_steps):
+        """A full queue makes the run wait without losing or reordering events."""
+        seen = []
+
+        async def observer(event):
+            await asyncio.sleep(0)
+            seen.append(event.event_type)
+
+        three_steps.add_observer(observer)
+        await three_steps.build(observer_queue_size=1).run({"value": 0})
+
+        assert seen[0] == WorkflowEventType.WORKFLOW_STARTED
+        assert seen[-1] == WorkflowEventType.WORKFLOW_COMPLETED
+        assert seen.count(WorkflowEventType.NODE_COMPLETED) == 3
+
+    @pytest.mark.asyncio
+    async def test_queued_observer_errors_are_logged(self, three_steps):
+        """A failing queued observer does not fail the run."""
+        async def failing_observer(event):
+            raise RuntimeError("observer down")
+
+        three_steps.add_observer(failing_observer)
+
+        assert (await three_steps.build().run({"value": 0}))["value"] == 3
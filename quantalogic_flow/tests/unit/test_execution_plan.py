@@ -0,0 +1,64 @@
+"""Unit tests for the compiled execution plan."""
+
+import pytest
+from quantalogic_flow.flow.core.plan import ExecutionPlan, make_input_resolver
+from quantalogic_flow.flow.flow import Nodes, Workflow
+
+
+class TestExecutionPlan:
+    """Test compiling workflows into execution plans."""
+
+    def test_parallel_tables(self, nodes_registry_backup):
+        """Branches map to their source, and sources include implicit fan-outs."""
+        for name in ("source", "left", "right", "join", "other"):
+            Nodes.define(name=name, output=name)(lambda: None)
+
+        workflow = Workflow("source").parallel("left", "right").then("join")
+        workflow.transitions.setdefault("join", []).extend([("other", None), ("source", None)])
+        plan = ExecutionPlan.compile(workflow)
+
+        assert plan.parallel_source_of == {"left": "source", "right": "source"}
+        assert plan.parallel_sources == {"source", "join"}
+        assert plan.parallel_nodes_from("source") == ("left", "right")
+        assert plan.parallel_nodes_from("join") == ("other", "source")
+        assert plan.convergence_nodes["source"] == "join"
+
+    def test_input_resolver(self):
+        """Mappings are applied before declared inputs, which are read when present."""
+        resolve = make_input_resolver(
+            {"a": "source_key", "b": lambda ctx: ctx["x"] * 2, "c": "literal"},
+            ["a", "x", "missing"],
+        )
+
+        assert resolve({"source_key": 1, "x": 5}) == {"a": 1, "b": 10, "c": "literal", "x": 5}
+
+    @pytest.mark.asyncio
+    async def test_engine_runs_from_build_time_plan(self, nodes_registry_backup):
+        """Changes to the workflow after build() only apply to engines built later."""
+        @Nodes.define(output="first_out")
+        def first(value):
+            return value + 1
+
+        @Nodes.define(output="second_out")
+        def second(first_out):
+            return first_out * 10
+
+        workflow = Workflow("first")
+        engine = workflow.build()
+        workflow.then("second")
+
+        assert "second_out" not in await engine.run({"value": 1})
+        assert (await workflow.build().run({"value": 1}))["second_out"] == 20
+
+    @pytest.mark.asyncio
+    async def test_reused_plan(self, nodes_registry_backup):
+        """A plan compiled once can be shared by many engines."""
+        @Nodes.define(output="doubled")
+        def double(value):
+            return value * 2
+
+        workflow = Workflow("double")
+        plan = ExecutionPlan.compile(workflow)
+        results = [await workflow.build(plan=plan).run({"value": i}) for i in range(3)]
+
+        assert [result["doubled"] for result in results] == [0, 2, 4]
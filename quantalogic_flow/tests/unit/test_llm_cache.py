@@ -0,0 +1,184 @@
+"""Unit tests for the LLM response cache and its use in LLM nodes."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+from quantalogic_flow.flow.flow import Nodes
+from quantalogic_flow.flow.llm_cache import (
+    MemoryCacheBackend,
+    ResponseCache,
+    SQLiteCacheBackend,
+)
+from quantalogic_flow.flow.nodes.base import capture_usage
+
+
+class TestResponseCacheKey:
+    """Test cache key construction."""
+
+    def test_key_is_stable_across_param_order(self):
+        messages = [{"role": "user", "content": "hi"}]
+        key1 = ResponseCache.make_key("gpt-4", messages, {"temperature": 0, "top_p": 1.0})
+        key2 = ResponseCache.make_key("gpt-4", messages, {"top_p": 1.0, "temperature": 0})
+        assert key1 == key2
+
+    def test_key_changes_with_model_messages_and_params(self):
+        messages = [{"role": "user", "content": "hi"}]
+        base = ResponseCache.make_key("gpt-4", messages, {"temperature": 0})
+        assert base != ResponseCache.make_key("gpt-4o", messages, {"temperature": 0})
+        assert base != ResponseCache.make_key("gpt-4", [{"role": "user", "content": "ho"}], {"temperature": 0})
+        assert base != ResponseCache.make_key("gpt-4", messages, {"temperature": 0, "max_tokens": 10})
+
+
+class TestBackends:
+    """Test the memory and SQLite backends."""
+
+    def test_memory_backend_lru_eviction(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", {"v": 1})
+        backend.set("b", {"v": 2})
+        backend.get("a")
+        backend.set("c", {"v": 3})
+        assert backend.get("b") is None
+        assert backend.get("a") == {"v": 1}
+        assert len(backend) == 2
+
+    def test_memory_backend_ttl(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", {"v": 1}, ttl=0.01)
+        time.sleep(0.02)
+        assert backend.get("a") is None
+
+    def test_sqlite_backend_persists_and_evicts(self, tmp_path):
+        path = tmp_path / "cache.db"
+        backend = SQLiteCacheBackend(path, max_entries=2)
+        backend.set("a", {"v": 1})
+        backend.set("b", {"v": 2})
+        backend.set("c", {"v": 3})
+        assert len(backend) == 2
+        backend.close()
+
+        reopened = SQLiteCacheBackend(path, max_entries=2)
+        assert reopened.get("c") == {"v": 3}
+        assert reopened.get("a") is None
+        reopened.set("d", {"v": 4}, ttl=-1)
+        assert reopened.get("d") is None
+        reopened.close()
+
+
+class TestResponseCache:
+    """Test counters, bypass rules and listeners."""
+
+    def test_temperature_bypass_unless_forced(self):
+        assert ResponseCache().is_cacheable(0)
+        assert ResponseCache().is_cacheable(None)
+        assert not ResponseCache().is_cacheable(0.7)
+        assert ResponseCache(force=True).is_cacheable(0.7)
+
+    def test_hit_rate_and_listener_events(self):
+        cache = ResponseCache()
+        events = []
+        cache.add_listener(lambda event, payload: events.append((event, payload)))
+
+        assert cache.get("k", model="m") is None
+        cache.set("k", {"content": "x"})
+        assert cache.get("k", model="m") == {"content": "x"}
+        cache.record_bypass(model="m")
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.bypasses, stats.size) == (1, 1, 1, 1)
+        assert stats.hit_rate == 0.5
+        assert [event for event, _ in events] == ["llm_cache_miss", "llm_cache_hit", "llm_cache_bypass"]
+        assert events[1][1]["hit_rate"] == 0.5
+        assert events[1][1]["model"] == "m"
+        # Events do not count the stored entries, which would query the backend on every lookup
+        assert events[1][1]["size"] is None
+
+    def test_failing_listener_does_not_break_lookup(self):
+        cache = ResponseCache()
+        cache.add_listener(MagicMock(side_effect=RuntimeError("boom")))
+        assert cache.get("missing") is None
+
+
+class TestCachedLLMNodes:
+    """Test caching in llm_node and structured_llm_node."""
+
+    @patch("quantalogic_flow.flow.nodes.acompletion")
+    async def test_llm_node_serves_repeated_prompt_from_cache(
+        self, mock_acompletion, mock_llm_response, nodes_registry_backup
+    ):
+        mock_acompletion.return_value = mock_llm_response
+        cache = ResponseCache()
+
+        @Nodes.llm_node(
+            system_prompt="You are helpful",
+            output="answer",
+            prompt_template="Question: {{ question }}",
+            temperature=0,
+            cache=cache,
+        )
+        async def cached_llm(question):
+            pass
+
+        first = await cached_llm(question="why?")
+        with capture_usage() as usage:
+            second = await cached_llm(question="why?")
+        assert first == second == "Mocked LLM response content"
+        assert mock_acompletion.call_count == 1
+        assert usage["cached"] is True
+        assert usage["cost"] == 0.0
+        assert usage["total_tokens"] == 30
+
+        await cached_llm(question="how?")
+        assert mock_acompletion.call_count == 2
+        assert "cache" not in mock_acompletion.call_args[1]
+
+    @patch("quantalogic_flow.flow.nodes.acompletion")
+    async def test_llm_node_bypasses_cache_when_sampling(
+        self, mock_acompletion, mock_llm_response, nodes_registry_backup
+    ):
+        mock_acompletion.return_value = mock_llm_response
+        cache = ResponseCache()
+
+        @Nodes.llm_node(output="answer", prompt_template="{{ question }}", temperature=0.7, cache=cache)
+        async def sampled_llm(question):
+            pass
+
+        await sampled_llm(question="why?")
+        await sampled_llm(question="why?")
+        assert mock_acompletion.call_count == 2
+        assert cache.stats().bypasses == 2
+        assert len(cache.backend) == 0
+
+    @patch("quantalogic_flow.flow.nodes.instructor.from_litellm")
+    async def test_structured_llm_node_caches_validated_model(self, mock_from_litellm, nodes_registry_backup):
+        class Answer(BaseModel):
+            text: str
+            score: float
+
+        raw_response = MagicMock()
+        raw_response.usage.prompt_tokens = 5
+        raw_response.usage.completion_tokens = 7
+        raw_response.usage.total_tokens = 12
+        create = AsyncMock(return_value=(Answer(text="ok", score=0.5), raw_response))
+        mock_from_litellm.return_value.chat.completions.create_with_completion = create
+        cache = ResponseCache(force=True)
+
+        @Nodes.structured_llm_node(
+            output="answer", response_model=Answer, prompt_template="{{ question }}", cache=cache
+        )
+        async def structured(question):
+            pass
+
+        first = await structured(question="q")
+        with capture_usage() as usage:
+            second = await structured(question="q")
+        assert isinstance(second, Answer)
+        assert second == first
+        assert create.call_count == 1
+        assert usage["cached"] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
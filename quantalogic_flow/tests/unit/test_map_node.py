@@ -0,0 +1,212 @@
+"""Unit tests for map nodes."""
+
+import asyncio
+
+import pytest
+from quantalogic_flow.flow.flow import MapNode, Nodes, Workflow
+from quantalogic_flow.flow.flow_extractor import extract_workflow_from_file
+from quantalogic_flow.flow.flow_generator import generate_executable_script
+from quantalogic_flow.flow.flow_manager import WorkflowManager
+from quantalogic_flow.flow.flow_mermaid import generate_mermaid_diagram
+
+
+class TestMapNodeExecution:
+    """Test running map nodes in a workflow."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_item_order(self, nodes_registry_backup):
+        """Results are ordered like the items even when items finish out of order."""
+        @Nodes.define(output="items")
+        def load_items():
+            return [3, 1, 2]
+
+        @Nodes.define(output="squared")
+        async def square(item, offset):
+            await asyncio.sleep(item * 0.005)
+            return item * item + offset
+
+        workflow = Workflow("load_items").map("square_all", "square", items="items", output="squares")
+        result = await workflow.build().run({"offset": 1})
+
+        assert result["squares"] == [10, 2, 5]
+        assert isinstance(workflow.nodes["square_all"], MapNode)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self, nodes_registry_backup):
+        """No more than max_concurrency items run at once."""
+        running = 0
+        peak = 0
+
+        @Nodes.define(output="done")
+        async def slow_item(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return item
+
+        @Nodes.define(output="items")
+        def make_items():
+            return list(range(8))
+
+        workflow = Workflow("make_items").map("cap_map", "slow_item", items="items", output="out", max_concurrency=3)
+        result = await workflow.build().run({})
+
+        assert result["out"] == list(range(8))
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_per_item_retry(self, nodes_registry_backup):
+        """A failing item is retried without re-running the others."""
+        attempts = {}
+
+        @Nodes.define(output="value")
+        def flaky(item):
+            attempts[item] = attempts.get(item, 0) + 1
+            if item == "b" and attempts[item] < 3:
+                raise RuntimeError("transient")
+            return item.upper()
+
+        @Nodes.define(output="items")
+        def letters():
+            return ["a", "b"]
+
+        workflow = Workflow("letters").map("retry_map", "flaky", items="items", output="out", retries=2)
+        result = await workflow.build().run({})
+
+        assert result["out"] == ["A", "B"]
+        assert attempts == {"a": 1, "b": 3}
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_fail_the_node(self, nodes_registry_backup):
+        """The map node fails once an item runs out of retries."""
+        @Nodes.define(output="value")
+        def always_fails(item):
+            raise RuntimeError("broken")
+
+        @Nodes.define(output="items")
+        def one_item():
+            return [1]
+
+        workflow = Workflow("one_item").map("fail_map", "always_fails", items="items", output="out", retries=1)
+        with pytest.raises(RuntimeError, match="broken"):
+            await workflow.build().run({})
+
+    @pytest.mark.asyncio
+    async def test_reducer_streams_results(self, nodes_registry_backup):
+        """The reducer sees every item as it completes and folds into the context."""
+        seen = []
+
+        @Nodes.define(output="length")
+        async def measure(item):
+            await asyncio.sleep(0.001 * len(item))
+            return len(item)
+
+        @Nodes.define(output="total")
+        def accumulate(item_result, item_index, total=0):
+            seen.append(item_index)
+            return total + item_result
+
+        @Nodes.define(output="words")
+        def words():
+            return ["aaaa", "b", "cc"]
+
+        workflow = Workflow("words").map(
+            "measure_all", "measure", items="words", output="lengths", reducer="accumulate"
+        )
+        result = await workflow.build().run({})
+
+        assert result["lengths"] == [4, 1, 2]
+        assert result["total"] == 7
+        assert sorted(seen) == [0, 1, 2]
+
+    def test_unregistered_node_rejected(self, nodes_registry_backup):
+        """Mapping an unknown node raises ValueError."""
+        with pytest.raises(ValueError, match="not registered"):
+            Nodes.map_node("bad_map", node="missing_node", items="items", output="out")
+
+
+def _map_manager():
+    manager = WorkflowManager()
+    manager.add_function(name="split_text", type_="embedded", code="def split_text(text):\n    return text.split()")
+    manager.add_function(name="shout", type_="embedded", code="def shout(item):\n    return item.upper()")
+    manager.add_node(name="split", function="split_text", output="chunks")
+    manager.add_node(name="shout", function="shout", output="shouted")
+    manager.add_node(
+        name="shout_all",
+        map_config={"node": "shout", "items": "chunks", "max_concurrency": 2, "retries": 1},
+        output="loud_chunks",
+    )
+    manager.set_start_node("split")
+    manager.add_transition(from_node="split", to_node="shout_all")
+    return manager
+
+
+class TestMapNodeRoundTrip:
+    """Test map nodes through YAML, code generation, extraction and diagrams."""
+
+    @pytest.mark.asyncio
+    async def test_yaml_round_trip(self, nodes_registry_backup, tmp_path):
+        """A map node saved to YAML loads back and runs."""
+        path = tmp_path / "map.yaml"
+        _map_manager().save_to_yaml(path)
+
+        manager = WorkflowManager()
+        manager.load_from_yaml(path)
+        map_config = manager.workflow.nodes["shout_all"].map_config
+        result = await manager.instantiate_workflow().build().run({"text": "hello map world"})
+
+        assert map_config.node == "shout"
+        assert map_config.max_concurrency == 2
+        assert result["loud_chunks"] == ["HELLO", "MAP", "WORLD"]
+
+    def test_generated_script_extracts_back(self, nodes_registry_backup, tmp_path):
+        """A generated script registers the map node and the extractor reads it back."""
+        script = tmp_path / "generated.py"
+        generate_executable_script(_map_manager().workflow, {}, str(script))
+
+        source = script.read_text()
+        workflow_def, _ = extract_workflow_from_file(str(script))
+
+        assert "Nodes.map_node('shout_all'" in source
+        map_config = workflow_def.nodes["shout_all"].map_config
+        assert map_config.node == "shout"
+        assert map_config.items == "chunks"
+        assert workflow_def.nodes["shout_all"].output == "loud_chunks"
+
+    def test_extract_workflow_map_method(self, tmp_path):
+        """Workflow.map() calls in a chain are extracted as map nodes."""
+        source = '''
+from quantalogic_flow.flow import Nodes, Workflow
+
+@Nodes.define(output="pages")
+def load_pages(path):
+    return []
+
+@Nodes.define(output="markdown")
+def convert_page(item):
+    return item
+
+workflow = (
+    Workflow("load_pages")
+    .map("convert_all", "convert_page", items="pages", output="markdown_pages", max_concurrency=8)
+)
+'''
+        path = tmp_path / "wf.py"
+        path.write_text(source)
+
+        workflow_def, _ = extract_workflow_from_file(str(path))
+
+        node_def = workflow_def.nodes["convert_all"]
+        assert node_def.map_config.node == "convert_page"
+        assert node_def.map_config.max_concurrency == 8
+        assert node_def.output == "markdown_pages"
+        assert any(t.from_node == "load_pages" and t.to_node == "convert_all" for t in workflow_def.workflow.transitions)
+
+    def test_mermaid_shows_map_edges(self):
+        """The diagram labels map nodes and links them to the mapped node."""
+        diagram = generate_mermaid_diagram(_map_manager().workflow)
+
+        assert "shout_all (Map: shout over chunks)" in diagram
+        assert 'shout_all -.->|"each chunks"| shout' in diagram
@@ -0,0 +1,172 @@
+"""Unit tests for node result memoization."""
+
+import os
+
+import pytest
+from quantalogic_flow.flow.flow import Nodes, Workflow, WorkflowEventType
+from quantalogic_flow.flow.flow_manager import WorkflowManager
+from quantalogic_flow.flow.node_cache import NodeCache, NodeFingerprint
+
+
+def _cache_events(workflow):
+    events = []
+
+    def observer(event):
+        if event.event_type in (WorkflowEventType.NODE_CACHE_HIT, WorkflowEventType.NODE_CACHE_MISS):
+            events.append((event.event_type, event.node_name))
+
+    workflow.add_observer(observer)
+    return events
+
+
+class TestNodeMemoization:
+    """Test that memoized nodes are skipped on repeated inputs."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_inputs_hit_the_cache(self, nodes_registry_backup):
+        """A memoized node runs once per distinct input and reports hits and misses."""
+        cache = NodeCache()
+        calls = []
+
+        @Nodes.define(output="upper", memoize=cache)
+        def expensive_upper(text):
+            calls.append(text)
+            return text.upper()
+
+        workflow = Workflow("expensive_upper")
+        events = _cache_events(workflow)
+        first = await workflow.build().run({"text": "hi"})
+        second = await workflow.build().run({"text": "hi"})
+        await workflow.build().run({"text": "ho"})
+
+        assert first["upper"] == second["upper"] == "HI"
+        assert calls == ["hi", "ho"]
+        assert [event for event, _ in events] == [
+            WorkflowEventType.NODE_CACHE_MISS,
+            WorkflowEventType.NODE_CACHE_HIT,
+            WorkflowEventType.NODE_CACHE_MISS,
+        ]
+        assert (cache.stats().hits, cache.stats().misses, cache.stats().size) == (1, 2, 2)
+
+    @pytest.mark.asyncio
+    async def test_only_memoized_nodes_use_the_cache(self, nodes_registry_backup):
+        """Downstream nodes without memoize still run every time."""
+        cache = NodeCache()
+        calls = []
+
+        @Nodes.define(output="base", memoize=cache)
+        def upstream(text):
+            calls.append("upstream")
+            return text * 2
+
+        @Nodes.define(output="final")
+        def downstream(base):
+            calls.append("downstream")
+            return base + "!"
+
+        workflow = Workflow("upstream").then("downstream")
+        await workflow.build().run({"text": "a"})
+        await workflow.build().run({"text": "a"})
+
+        assert calls == ["upstream", "downstream", "downstream"]
+
+    @pytest.mark.asyncio
+    async def test_source_change_invalidates(self, nodes_registry_backup):
+        """Redefining a node with different code does not reuse its old results."""
+        cache = NodeCache()
+
+        @Nodes.define(output="answer", memoize=cache)
+        def edited_node(value):
+            return value + 1
+
+        assert (await Workflow("edited_node").build().run({"value": 1}))["answer"] == 2
+
+        @Nodes.define(name="edited_node", output="answer", memoize=cache)
+        def edited_node_v2(value):
+            return value + 100
+
+        assert (await Workflow("edited_node").build().run({"value": 1}))["answer"] == 101
+
+    @pytest.mark.asyncio
+    async def test_template_file_change_invalidates(self, nodes_registry_backup, tmp_path):
+        """Editing a node's template file does not reuse its old results."""
+        cache = NodeCache()
+        template_file = tmp_path / "greeting.j2"
+        template_file.write_text("Hello {{ name }}")
+
+        @Nodes.template_node(output="greeting", template_file=str(template_file), memoize=cache)
+        def greet(rendered_content, name):
+            return rendered_content
+
+        assert (await Workflow("greet").build().run({"name": "Ada"}))["greeting"] == "Hello Ada"
+        template_file.write_text("Goodbye {{ name }}")
+        stat = template_file.stat()
+        os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert (await Workflow("greet").build().run({"name": "Ada"}))["greeting"] == "Goodbye Ada"
+        assert cache.stats().hits == 0
+
+    @pytest.mark.asyncio
+    async def test_sqlite_cache_persists(self, nodes_registry_backup, tmp_path):
+        """Results stored on disk are reused by a new cache on the same file."""
+        calls = []
+
+        def make_pair(value):
+            calls.append(value)
+            return (value, value)
+
+        for _ in range(2):
+            Nodes.define(output="pair", memoize=NodeCache.sqlite(tmp_path / "nodes.db"))(make_pair)
+            result = await Workflow("make_pair").build().run({"value": 3})
+
+        assert result["pair"] == (3, 3)
+        assert calls == [3]
+
+    def test_fingerprint_covers_config(self):
+        """Changing the decorator configuration changes the fingerprint."""
+        def node(question):
+            return question
+
+        def model_for(model):
+            return lambda ctx: model
+
+        base = NodeFingerprint(node, {"model": model_for("gpt-4o"), "temperature": 0, "api_key": "a"})
+        other_model = NodeFingerprint(node, {"model": model_for("gpt-4o-mini"), "temperature": 0})
+        other_key = NodeFingerprint(node, {"model": model_for("gpt-4o"), "temperature": 0, "api_key": "b"})
+
+        assert base() != other_model()
+        assert base() == other_key()
+
+    @pytest.mark.asyncio
+    async def test_workflow_manager_memoize(self, nodes_registry_backup):
+        """Nodes declared with memoize in a workflow definition are memoized."""
+        manager = WorkflowManager()
+        manager.add_function(name="twice", type_="embedded", code="def twice(value):\n    return value * 2")
+        manager.add_node(name="twice", function="twice", output="doubled", memoize=True)
+        manager.set_start_node("twice")
+
+        workflow = manager.instantiate_workflow()
+        events = _cache_events(workflow)
+        await workflow.build().run({"value": 21})
+        result = await workflow.build().run({"value": 21})
+
+        assert result["doubled"] == 42
+        assert events[-1] == (WorkflowEventType.NODE_CACHE_HIT, "twice")
+        assert manager.workflow.nodes["twice"].memoize is True
+
+    def test_extractor_keeps_memoize(self, tmp_path):
+        """The memoize flag survives extraction from a Python workflow file."""
+        from quantalogic_flow.flow.flow_extractor import extract_workflow_from_file
+
+        script = tmp_path / "memo_workflow.py"
+        script.write_text(
+            "from quantalogic_flow.flow import Nodes, Workflow\n\n"
+            "@Nodes.define(output='doubled', memoize=True)\n"
+            "def double(value):\n"
+            "    return value * 2\n\n"
+            "workflow = Workflow('double')\n"
+        )
+
+        workflow_def, _ = extract_workflow_from_file(str(script))
+
+        assert workflow_def.nodes["double"].memoize is True
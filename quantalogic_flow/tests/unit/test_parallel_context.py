@@ -0,0 +1,199 @@
+"""Unit tests for branch context isolation and per-invocation usage."""
+
+import asyncio
+
+import pytest
+from quantalogic_flow.flow.core.context import ContextOverlay, merge_overlays
+from quantalogic_flow.flow.flow import Nodes, Workflow, WorkflowEventType
+from quantalogic_flow.flow.nodes.base import capture_usage, record_usage
+
+
+class TestContextOverlay:
+    """Test the copy-on-write overlay and the merge of branches."""
+
+    def test_writes_and_deletes_stay_in_overlay(self):
+        """The base context is never modified by the overlay."""
+        base = {"a": 1, "b": 2}
+        overlay = ContextOverlay(base)
+
+        overlay["a"] = 10
+        overlay["c"] = 3
+        del overlay["b"]
+
+        assert dict(overlay) == {"a": 10, "c": 3}
+        assert "b" not in overlay
+        assert base == {"a": 1, "b": 2}
+        with pytest.raises(KeyError):
+            overlay["b"]
+
+    def test_merge_follows_branch_order(self):
+        """The branch listed last wins a conflict and the conflict is reported."""
+        context = {"keep": True, "gone": 1}
+        first, second = ContextOverlay(context), ContextOverlay(context)
+        first["out"] = "first"
+        second["out"] = "second"
+        del second["gone"]
+
+        conflicts = merge_overlays(context, [("first", first), ("second", second)])
+
+        assert conflicts == ["out"]
+        assert context == {"keep": True, "out": "second"}
+
+    def test_merge_error_policy(self):
+        """With the error policy, conflicting branches raise and nothing is written."""
+        context = {}
+        first, second = ContextOverlay(context), ContextOverlay(context)
+        first["out"] = 1
+        second["out"] = 2
+
+        with pytest.raises(ValueError, match="'first' and 'second' both write context key 'out'"):
+            merge_overlays(context, [("first", first), ("second", second)], on_conflict="error")
+        assert context == {}
+
+    def test_equal_values_do_not_conflict(self):
+        """Branches writing the same value are not a conflict."""
+        context = {}
+        first, second = ContextOverlay(context), ContextOverlay(context)
+        first["out"] = [1, 2]
+        second["out"] = [1, 2]
+
+        assert merge_overlays(context, [("first", first), ("second", second)], on_conflict="error") == []
+        assert context == {"out": [1, 2]}
+
+
+class TestParallelBranchIsolation:
+    """Test that parallel branches run against their own view of the context."""
+
+    @pytest.mark.asyncio
+    async def test_branches_do_not_see_each_other(self, nodes_registry_backup):
+        """A slow branch never sees the output of a fast sibling."""
+        seen = {}
+
+        @Nodes.define(output="ready")
+        def iso_start():
+            return True
+
+        @Nodes.define(output="fast_out")
+        async def iso_fast(ready):
+            return "fast"
+
+        @Nodes.define(output="slow_out")
+        async def iso_slow(ready):
+            await asyncio.sleep(0.02)
+            return "slow"
+
+        @Nodes.define(output="joined")
+        def iso_join(fast_out, slow_out):
+            return fast_out + slow_out
+
+        def observer(event):
+            if event.event_type == WorkflowEventType.NODE_COMPLETED and event.node_name == "iso_slow":
+                seen["keys"] = set(event.context)
+
+        workflow = Workflow("iso_start").parallel("iso_fast", "iso_slow").converge("iso_join")
+        workflow.add_observer(observer)
+        result = await workflow.build().run({})
+
+        assert "fast_out" not in seen["keys"]
+        assert result["joined"] == "fastslow"
+
+    @pytest.mark.asyncio
+    async def test_merge_is_deterministic(self, nodes_registry_backup):
+        """The declared branch order decides a conflict, not completion order."""
+        @Nodes.define(output="ready")
+        def det_start():
+            return True
+
+        @Nodes.define(output="winner")
+        async def det_slow(ready):
+            await asyncio.sleep(0.02)
+            return "slow"
+
+        @Nodes.define(output="winner")
+        async def det_fast(ready):
+            return "fast"
+
+        workflow = Workflow("det_start").parallel("det_slow", "det_fast")
+        assert (await workflow.build().run({}))["winner"] == "fast"
+
+        workflow = Workflow("det_start").parallel("det_fast", "det_slow")
+        assert (await workflow.build().run({}))["winner"] == "slow"
+
+        with pytest.raises(ValueError, match="both write context key 'winner'"):
+            await workflow.build(on_conflict="error").run({})
+
+    def test_unknown_conflict_policy(self, nodes_registry_backup):
+        """The engine rejects unknown conflict policies."""
+        @Nodes.define(output="out")
+        def policy_node():
+            return 1
+
+        with pytest.raises(ValueError, match="Unknown conflict policy"):
+            Workflow("policy_node").build(on_conflict="ignore")
+
+
+class TestInvocationUsage:
+    """Test that usage is reported per node invocation."""
+
+    def test_capture_sums_calls(self):
+        """Usage of several calls is summed and flags are and-ed."""
+        with capture_usage() as usage:
+            record_usage({"total_tokens": 10, "cost": None, "cached": True})
+            record_usage({"total_tokens": 5, "cost": 0.5, "cached": False})
+        record_usage({"total_tokens": 100})
+
+        assert usage == {"total_tokens": 15, "cost": 0.5, "cached": False}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_invocations_keep_their_usage(self, nodes_registry_backup):
+        """Two concurrent calls of the same node report their own usage."""
+        calls = []
+
+        @Nodes.define(output="ready")
+        def usage_start():
+            return True
+
+        @Nodes.define(output="metered_out")
+        async def metered(ready):
+            calls.append(None)
+            tokens = len(calls)
+            if tokens == 1:
+                await asyncio.sleep(0.02)
+            record_usage({"total_tokens": tokens})
+            return tokens
+
+        usages = []
+
+        def observer(event):
+            if event.event_type == WorkflowEventType.NODE_COMPLETED and event.node_name == "metered":
+                usages.append(event.usage["total_tokens"])
+
+        workflow = Workflow("usage_start").parallel("metered", "metered")
+        workflow.add_observer(observer)
+        await workflow.build().run({})
+
+        assert sorted(usages) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_map_node_reports_total_usage(self, nodes_registry_backup):
+        """A map node reports the usage of all its items."""
+        usages = []
+
+        @Nodes.define(output="counted")
+        async def count_tokens(item):
+            record_usage({"total_tokens": item})
+            return item
+
+        @Nodes.define(output="numbers")
+        def numbers():
+            return [1, 2, 3]
+
+        def observer(event):
+            if event.event_type == WorkflowEventType.NODE_COMPLETED and event.node_name == "count_all":
+                usages.append(event.usage)
+
+        workflow = Workflow("numbers").map("count_all", "count_tokens", items="numbers", output="counts")
+        workflow.add_observer(observer)
+        await workflow.build().run({})
+
+        assert usages == [{"total_tokens": 6}]
@@ -0,0 +1,124 @@
+"""Unit tests for the workflow profiler."""
+
+import asyncio
+import json
+
+import pytest
+from quantalogic_flow.flow.flow import Nodes, Workflow
+from quantalogic_flow.flow.flow_manager import WorkflowManager
+from quantalogic_flow.flow.nodes.base import record_usage
+from quantalogic_flow.flow.profiler import WorkflowProfiler
+
+
+class TestWorkflowProfiler:
+    """Test recording node spans and exporting them."""
+
+    @pytest.mark.asyncio
+    async def test_loop_iterations_and_usage(self, nodes_registry_backup):
+        """Every execution of a looping node is a numbered span with its own usage."""
+        @Nodes.define(output="count")
+        def start():
+            return 0
+
+        @Nodes.define(output="count")
+        async def step(count):
+            record_usage({"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5, "cost": 0.01})
+            return count + 1
+
+        @Nodes.define(output="done")
+        def finish(count):
+            return count
+
+        workflow = Workflow("start").loop("step").end_loop(lambda ctx: ctx["count"] >= 3, next_node="finish")
+        profiler = WorkflowProfiler().attach(workflow)
+        await workflow.build().run({})
+
+        steps = [span for span in profiler.spans if span.node_name == "step"]
+        assert [span.iteration for span in steps] == [1, 2, 3]
+        assert all(span.status == "ok" and span.end >= span.start for span in profiler.spans)
+
+        stats = {entry.path: entry for entry in profiler.stats()}
+        assert stats["step"].calls == 3
+        assert stats["step"].total_tokens == 15
+        assert stats["step"].cost == pytest.approx(0.03)
+        assert {entry.path for entry in profiler.stats(by_iteration=True)} >= {"step#1", "step#2", "step#3"}
+
+        summary = profiler.summary()
+        assert "step" in summary and "Total (1 run)" in summary
+
+    @pytest.mark.asyncio
+    async def test_parallel_branches_overlap_on_lanes(self, nodes_registry_backup, tmp_path):
+        """Concurrent branches get their own lanes in the Chrome trace and report their queue wait."""
+        @Nodes.define(output="source")
+        def fan_out():
+            return 1
+
+        for name in ("left", "right"):
+            async def branch():
+                await asyncio.sleep(0.02)
+                return 1
+
+            Nodes.define(name=name, output=name)(branch)
+
+        @Nodes.define(output="joined")
+        def join():
+            return 2
+
+        workflow = Workflow("fan_out").parallel("left", "right").then("join")
+        profiler = WorkflowProfiler().attach(workflow)
+        await workflow.build().run({})
+
+        spans = {span.node_name: span for span in profiler.spans}
+        assert spans["left"].lane != spans["right"].lane
+        assert spans["left"].start < spans["right"].end and spans["right"].start < spans["left"].end
+        assert spans["left"].queue_wait >= 0 and spans["fan_out"].queue_wait == 0
+
+        profiler.save_chrome_trace(tmp_path / "trace.json")
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        slices = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+        assert {"workflow", "fan_out", "left", "right", "join"} <= set(slices)
+        assert slices["left"]["tid"] != slices["right"]["tid"]
+        assert slices["left"]["args"]["iteration"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sub_workflow_nodes_are_nested(self, nodes_registry_backup):
+        """Nodes run by a sub-workflow are attributed to the sub-workflow's node."""
+        @Nodes.define(output="prepared")
+        def prepare(text):
+            return text
+
+        @Nodes.define(output="summary")
+        async def summarize(sub_text):
+            record_usage({"total_tokens": 7, "cost": 0.5})
+            return sub_text[:3]
+
+        workflow = Workflow("prepare")
+        workflow.add_sub_workflow("summarizer", Workflow("summarize"), inputs={"sub_text": "prepared"}, output="result")
+        profiler = WorkflowProfiler().attach(workflow)
+        await workflow.build().run({"text": "profiling"})
+
+        spans = {span.path: span for span in profiler.spans}
+        assert spans["summarizer/summarize"].parent is spans["summarizer"]
+        assert spans["summarizer"].sub_workflow
+        assert spans["summarizer"].start <= spans["summarizer/summarize"].start
+        assert spans["summarizer/summarize"].end <= spans["summarizer"].end
+
+        stats = {entry.path: entry for entry in profiler.stats()}
+        assert stats["summarizer"].total_tokens == stats["summarizer/summarize"].total_tokens == 7
+        assert len(profiler._runs) == 1
+
+    def test_execute_workflow_profile_flag(self, nodes_registry_backup, tmp_path):
+        """WorkflowManager.execute_workflow profiles the run and writes its trace."""
+        manager = WorkflowManager()
+        manager.add_function(name="shout", type_="embedded", code="def shout(text):\n    return text.upper()")
+        manager.add_node(name="shout", function="shout", output="loud")
+        manager.set_start_node("shout")
+        profiler = WorkflowProfiler()
+
+        result = manager.execute_workflow(
+            manager.workflow, {"text": "hi"}, profile=profiler, trace_file=tmp_path / "run.json"
+        )
+
+        assert result["loud"] == "HI"
+        assert [span.node_name for span in profiler.spans] == ["shout"]
+        assert json.loads((tmp_path / "run.json").read_text())["traceEvents"]
@@ -0,0 +1,119 @@
+"""Unit tests for token-streaming LLM nodes."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from quantalogic_flow.flow.flow import Nodes, Workflow, WorkflowEventType
+from quantalogic_flow.flow.flow_manager import WorkflowManager
+from quantalogic_flow.flow.streaming import TokenStream
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class TestTokenStream:
+    """Test reading token streams."""
+
+    @pytest.mark.asyncio
+    async def test_consumers_see_every_chunk(self):
+        """Consumers starting at different times all read the stream from its first chunk."""
+        async def source():
+            for word in ("a", "b", "c"):
+                await asyncio.sleep(0)
+                yield word
+
+        stream = TokenStream(source())
+
+        async def collect():
+            return [chunk async for chunk in stream]
+
+        early = asyncio.create_task(collect())
+        assert await stream.text() == "abc"
+        assert await early == await collect() == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_consumers(self):
+        """A failed generation raises in consumers after the chunks received before it."""
+        async def source():
+            yield "partial"
+            raise ConnectionError("stream interrupted")
+
+        stream = TokenStream(source())
+        received = []
+        with pytest.raises(ConnectionError):
+            async for chunk in stream:
+                received.append(chunk)
+
+        assert received == ["partial"]
+        with pytest.raises(ConnectionError):
+            await stream.text()
+
+
+class TestStreamingLLMNode:
+    """Test streaming LLM nodes in workflows."""
+
+    @pytest.mark.asyncio
+    async def test_consumer_reads_while_generating(self, nodes_registry_backup):
+        """A stream consumer gets the first chunk before the generation ends; other nodes get the text."""
+        resume_generation = asyncio.Event()
+        requests = []
+
+        async def generation():
+            yield _chunk("Once")
+            await resume_generation.wait()
+            yield _chunk(" upon a time")
+            yield _chunk(usage=SimpleNamespace(prompt_tokens=4, completion_tokens=3, total_tokens=7))
+
+        async def fake_acompletion(**kwargs):
+            requests.append(kwargs)
+            return generation()
+
+        @Nodes.llm_node(output="story", prompt_template="Tell {{ topic }}", model="gpt-4o-mini", stream=True)
+        async def story_generator(topic):
+            pass
+
+        @Nodes.define(output="preview", stream_consumer=True)
+        async def show_preview(story):
+            async for chunk in story:
+                # The generation only finishes once a chunk was consumed
+                resume_generation.set()
+                return chunk
+
+        @Nodes.define(output="word_count")
+        def count_words(story):
+            return len(story.split())
+
+        workflow = Workflow("story_generator").then("show_preview").then("count_words")
+        events = []
+        workflow.add_observer(
+            lambda event: events.append(event),
+            [WorkflowEventType.NODE_STREAM_DELTA, WorkflowEventType.NODE_STREAM_COMPLETED],
+        )
+        with patch("quantalogic_flow.flow.nodes.acompletion", fake_acompletion):
+            result = await asyncio.wait_for(workflow.build().run({"topic": "a story"}), timeout=5)
+
+        assert result["preview"] == "Once"
+        assert result["word_count"] == 4
+        assert result["story"] == "Once upon a time"
+        assert requests[0]["stream"] is True
+        assert [event.delta for event in events[:-1]] == ["Once", " upon a time"]
+        assert events[-1].event_type == WorkflowEventType.NODE_STREAM_COMPLETED
+        assert events[-1].usage["total_tokens"] == 7
+
+    def test_workflow_manager_stream_flags(self, nodes_registry_backup):
+        """`stream` and `stream_consumer` in a workflow definition configure the nodes."""
+        manager = WorkflowManager()
+        manager.add_node(name="draft", llm_config={"prompt_template": "{{ topic }}", "stream": True}, output="text")
+        manager.add_function(name="reader", type_="embedded", code="async def reader(text):\n    return text")
+        manager.add_node(name="reader", function="reader", output="read", stream_consumer=True)
+        manager.set_start_node("draft")
+        manager.add_transition(from_node="draft", to_node="reader")
+
+        workflow = manager.instantiate_workflow()
+
+        assert workflow.nodes["draft"].streaming is True
+        assert workflow.nodes["reader"].stream_consumer is True
@@ -1,11 +1,13 @@
 """Unit tests for template functionality."""
 
+import os
 import tempfile
 from pathlib import Path
 
 import pytest
 
-from quantalogic_flow.flow.flow import Nodes
+from quantalogic_flow.flow.flow import Nodes, Workflow
+from quantalogic_flow.flow.template import TemplateCache, TemplateEngine
 
 
 class TestTemplateRendering:
@@ -280,3 +282,86 @@ Critical issues: {{ findings|selectattr('impact', 'equalto', 'critical')|list|le
         assert "Count: 3" in result
         assert "First: apple" in result
         assert "Last: cherry" in result
+
+
+class TestTemplateCache:
+    """Test the compiled template cache."""
+
+    def test_inline_template_compiled_once(self):
+        """Test that repeated renders of the same string reuse the compiled template."""
+        cache = TemplateCache()
+        first = cache.from_string("Hello {{ name }}!")
+        second = cache.from_string("Hello {{ name }}!")
+
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second.render(name="World") == "Hello World!"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used template is evicted."""
+        cache = TemplateCache(max_entries=2)
+        a = cache.from_string("a")
+        cache.from_string("b")
+        cache.from_string("a")
+        cache.from_string("c")
+
+        assert len(cache) == 2
+        assert cache.from_string("a") is a
+        assert cache.misses == 3
+        cache.from_string("b")
+        assert cache.misses == 4
+
+    def test_file_template_reloaded_when_modified(self):
+        """Test that an edited template file is recompiled."""
+        cache = TemplateCache()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_file = Path(temp_dir) / "prompt.j2"
+            template_file.write_text("v1 {{ x }}")
+            assert cache.from_file(str(template_file)).render(x=1) == "v1 1"
+            assert cache.from_file(str(template_file)).render(x=2) == "v1 2"
+            assert cache.hits == 1
+
+            template_file.write_text("v2 {{ x }}")
+            stat = template_file.stat()
+            os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert cache.from_file(str(template_file)).render(x=3) == "v2 3"
+
+    def test_file_templates_share_directory_environment(self):
+        """Test that templates in one directory share an environment and can include each other."""
+        cache = TemplateCache()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "header.j2").write_text("Header")
+            (Path(temp_dir) / "a.j2").write_text("{% include 'header.j2' %} A")
+            (Path(temp_dir) / "b.j2").write_text("B")
+
+            a = cache.from_file(str(Path(temp_dir) / "a.j2"))
+            b = cache.from_file(str(Path(temp_dir) / "b.j2"))
+
+            assert a.environment is b.environment
+            assert a.render() == "Header A"
+
+    @pytest.mark.asyncio
+    async def test_build_precompiles_node_templates(self, nodes_registry_backup):
+        """Test that Workflow.build(precompile_templates=True) fills the cache."""
+        TemplateEngine.cache.clear()
+
+        @Nodes.template_node(output="greeting", template="Hi {{ name }} from build")
+        def greet(rendered_content, name):
+            return rendered_content
+
+        engine = Workflow("greet").build(precompile_templates=True)
+        assert TemplateEngine.cache.misses == 1
+
+        result = await engine.run({"name": "Ada"})
+        assert result["greeting"] == "Hi Ada from build"
+        assert TemplateEngine.cache.hits == 1
+
+    def test_build_precompile_reports_missing_file(self, nodes_registry_backup):
+        """Test that precompilation fails early for a missing template file."""
+
+        @Nodes.template_node(output="out", template_file="missing_template.j2")
+        def render(rendered_content):
+            return rendered_content
+
+        with pytest.raises(ValueError, match="render"):
+            Workflow("render").build(precompile_templates=True)
@@ -11,17 +11,18 @@ from typing import Any, Optional
 from jinja2 import Environment, FileSystemLoader
 from loguru import logger
 from pydantic import BaseModel, ConfigDict, PrivateAttr
+from quantalogic_flow.flow.llm_cache import ResponseCache
 
 from quantalogic_react.quantalogic.event_emitter import EventEmitter
 from quantalogic_react.quantalogic.generative_model import GenerativeModel, ResponseStats, TokenUsage
-from quantalogic_react.quantalogic.memory import AgentMemory, Message, VariableMemory
+from quantalogic_react.quantalogic.memory import MAX_INTERPOLATION_DEPTH, AgentMemory, Message, VariableMemory
 from quantalogic_react.quantalogic.prompts import system_prompt
 from quantalogic_react.quantalogic.tool_manager import ToolManager
 from quantalogic_react.quantalogic.tools.task_complete_tool import TaskCompleteTool
 from quantalogic_react.quantalogic.tools.tool import Tool
 from quantalogic_react.quantalogic.utils import get_environment
 from quantalogic_react.quantalogic.utils.ask_user_validation import console_ask_for_user_validation
-from quantalogic_react.quantalogic.xml_parser import ToleranceXMLParser
+from quantalogic_react.quantalogic.xml_parser import StreamingToolCallDetector, ToolCallParser, parse_xml_arguments
 from quantalogic_react.quantalogic.xml_tool_parser import ToolParser
 
 # Maximum ratio occupancy of the occupied memory
@@ -33,9 +34,6 @@ MAX_RESPONSE_LENGTH = 1024 * 32
 DEFAULT_MAX_INPUT_TOKENS = 128 * 1024
 DEFAULT_MAX_OUTPUT_TOKENS = 4096
 
-# Maximum recursion depth for variable interpolation
-MAX_INTERPOLATION_DEPTH = 10
-
 
 class AgentConfig(BaseModel):
     """Configuration settings for the Agent."""
@@ -89,16 +87,20 @@ class Agent(BaseModel):
     compact_every_n_iterations: int | None = None
     max_tokens_working_memory: int | None = None
     _model_name: str = PrivateAttr(default="")
+    _tool_call_parser: ToolCallParser | None = PrivateAttr(default=None)
     chat_system_prompt: str  # Base persona prompt for chat mode
     tool_mode: Optional[str] = None  # Tool or toolset to prioritize in chat mode
     tracked_files: list[str] = []  # List to track files created or modified during execution
     agent_mode: str = "react"  # Default mode is ReAct
+    parallel_tool_calls: bool = False  # Execute all tool calls of one response concurrently
+    max_parallel_tool_calls: int = 4  # Maximum number of tools running at the same time
+    cancel_stream_after_action: bool = True  # Stop streaming once the action block is complete
 
     def __init__(
         self,
         model_name: str = "",
-        memory: AgentMemory = AgentMemory(),
-        variable_store: VariableMemory = VariableMemory(),
+        memory: AgentMemory | None = None,
+        variable_store: VariableMemory | None = None,
         tools: list[Tool] = [TaskCompleteTool()],
         ask_for_user_validation: Callable[[str, str], bool] = console_ask_for_user_validation,
         task_to_solve: str = "",
@@ -110,13 +112,17 @@ class Agent(BaseModel):
         chat_system_prompt: str | None = None,
         tool_mode: Optional[str] = None,
         agent_mode: str = "react",
+        parallel_tool_calls: bool = False,
+        max_parallel_tool_calls: int = 4,
+        cancel_stream_after_action: bool = True,
+        response_cache: ResponseCache | None = None,
     ):
         """Initialize the agent with model, memory, tools, and configurations.
 
         Args:
             model_name: Name of the model to use
-            memory: AgentMemory instance for storing conversation history
-            variable_store: VariableMemory instance for storing variables
+            memory: AgentMemory instance for storing conversation history (a new one by default)
+            variable_store: VariableMemory instance for storing variables (a new one by default)
             tools: List of Tool instances
             ask_for_user_validation: Function to ask for user validation
             task_to_solve: Initial task to solve (for ReAct mode)
@@ -128,6 +134,10 @@ class Agent(BaseModel):
             chat_system_prompt: Optional base system prompt for chat mode persona
             tool_mode: Optional tool or toolset to prioritize in chat mode
             agent_mode: Mode to use ("react" or "chat")
+            parallel_tool_calls: Execute all tool calls found in one response concurrently
+            max_parallel_tool_calls: Maximum number of tool calls running at the same time
+            cancel_stream_after_action: In streaming ReAct mode, stop generation once the action block is closed
+            response_cache: Optional ResponseCache shared by the agent's generative model
         """
         try:
             logger.debug("Initializing agent...")
@@ -163,9 +173,9 @@ class Agent(BaseModel):
 
             super().__init__(
                 specific_expertise=specific_expertise,
-                model=GenerativeModel(model=model_name, event_emitter=event_emitter),
-                memory=memory,
-                variable_store=variable_store,
+                model=GenerativeModel(model=model_name, event_emitter=event_emitter, response_cache=response_cache),
+                memory=memory if memory is not None else AgentMemory(),
+                variable_store=variable_store if variable_store is not None else VariableMemory(),
                 tools=tool_manager,
                 event_emitter=event_emitter,
                 config=config,
@@ -184,9 +194,13 @@ class Agent(BaseModel):
                 chat_system_prompt=chat_system_prompt,
                 tool_mode=tool_mode,
                 agent_mode=agent_mode,
+                parallel_tool_calls=parallel_tool_calls,
+                max_parallel_tool_calls=max_parallel_tool_calls,
+                cancel_stream_after_action=cancel_stream_after_action,
             )
 
             self._model_name = model_name
+            self.memory.set_token_counter(self.model.message_token_counter)
 
             logger.debug(f"Memory will be compacted every {self.compact_every_n_iterations} iterations")
             logger.debug(f"Max tokens for working memory set to: {self.max_tokens_working_memory}")
@@ -205,7 +219,10 @@ class Agent(BaseModel):
     def model_name(self, value: str) -> None:
         """Set the model name and update the model instance."""
         self._model_name = value
-        self.model = GenerativeModel(model=value, event_emitter=self.event_emitter)
+        self.model = GenerativeModel(
+            model=value, event_emitter=self.event_emitter, response_cache=self.model.response_cache
+        )
+        self.memory.set_token_counter(self.model.message_token_counter)
 
     def clear_memory(self) -> None:
         """Clear the memory and reset the session."""
@@ -276,14 +293,7 @@ class Agent(BaseModel):
                 await self._async_compact_memory_if_needed(current_prompt)
 
                 if streaming:
-                    content = ""
-                    async_stream = await self.model.async_generate_with_history(
-                        messages_history=self.memory.memory,
-                        prompt=current_prompt,
-                        streaming=True,
-                    )
-                    async for chunk in async_stream:
-                        content += chunk
+                    content = await self._async_consume_stream(current_prompt)
                     result = ResponseStats(
                         response=content,
                         usage=TokenUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0),
@@ -334,6 +344,31 @@ class Agent(BaseModel):
         self._emit_event("task_solve_end", task_solve_end_data)
         return answer
 
+    async def _async_consume_stream(self, prompt: str) -> str:
+        """Stream a response and return its text, stopping early once a tool call is complete.
+
+        With `cancel_stream_after_action`, the stream is closed as soon as the `<action>` block
+        is closed, so the tool can run without waiting for the rest of the generation.
+
+        Args:
+            prompt: Current prompt
+
+        Returns:
+            The streamed response text
+        """
+        async_stream = await self.model.async_generate_with_history(
+            messages_history=self.memory.memory,
+            prompt=prompt,
+            streaming=True,
+        )
+        detector = StreamingToolCallDetector(self.tools.tool_names())
+        async for chunk in async_stream:
+            if detector.feed(chunk) and self.cancel_stream_after_action:
+                logger.debug("Tool call complete, cancelling the rest of the stream")
+                await async_stream.aclose()
+                return detector.text[: detector.end_pos]
+        return detector.text
+
     def chat(
         self,
         message: str,
@@ -694,6 +729,12 @@ class Agent(BaseModel):
                 logger.debug("No tool usage detected in response")
                 return ObserveResponseResult(next_prompt=content, executed_tool=None, answer=None)
 
+            if self.parallel_tool_calls:
+                tool_calls = self._parse_tool_calls(content)
+                # task_complete ends the task, so it is never batched with other calls
+                if len(tool_calls) > 1 and all(name != "task_complete" for name, _ in tool_calls):
+                    return await self._async_execute_tool_calls(tool_calls, iteration)
+
             # Process tools for regular ReAct mode
             tool_names = list(parsed_content.keys())
             for tool_name in tool_names:
@@ -737,6 +778,95 @@ class Agent(BaseModel):
         except Exception as e:
             return self._handle_error(e)
 
+    async def _async_execute_tool_calls(
+        self, tool_calls: list[tuple[str, str | dict]], iteration: int = 1
+    ) -> ObserveResponseResult:
+        """Execute several tool calls from one response concurrently and combine their results.
+
+        Calls run through `_async_execute_tool`, at most `max_parallel_tool_calls` at a time.
+        Unknown tools and repeated calls are reported in their own result without running.
+        Tools requiring user validation run one at a time.
+        Each result is stored in its own variable; all results form a single observation.
+
+        Args:
+            tool_calls: List of (tool_name, tool_input) in the order they appear in the response
+            iteration: Current iteration number
+
+        Returns:
+            ObserveResponseResult with the combined observation
+        """
+        prepared = []
+        for tool_name, tool_input in tool_calls:
+            # ToolManager.get raises KeyError for unknown tools
+            tool = self.tools.tools.get(tool_name)
+            if not tool:
+                # Report the unknown tool in its own result instead of failing the whole batch
+                logger.warning(f"Tool '{tool_name}' not found in tool manager.")
+                prepared.append((tool_name, None, {}, ("", f"Error: Tool '{tool_name}' not found in tool manager.")))
+                continue
+            arguments_with_values = self._parse_tool_arguments(tool, tool_input)
+            if self._is_repeated_tool_call(tool_name, arguments_with_values):
+                prepared.append(
+                    (tool_name, tool, arguments_with_values, self._handle_repeated_tool_call(tool_name, arguments_with_values))
+                )
+            else:
+                prepared.append((tool_name, tool, arguments_with_values, None))
+
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_tool_calls))
+        validation_lock = asyncio.Lock()
+
+        async def run(
+            tool_name: str, tool: Tool | None, arguments_with_values: dict, result: tuple[str, Any] | None
+        ) -> tuple[str, Any]:
+            if result is not None:
+                return result
+            if tool.need_validation:
+                # Ask the user about one tool at a time
+                async with validation_lock, semaphore:
+                    return await self._async_execute_tool(tool_name, tool, arguments_with_values)
+            async with semaphore:
+                return await self._async_execute_tool(tool_name, tool, arguments_with_values)
+
+        logger.debug(f"Executing {sum(result is None for *_, result in prepared)} tool calls concurrently")
+        results = await asyncio.gather(*(run(*call) for call in prepared))
+
+        executed_tools = []
+        sections = []
+        for (tool_name, _, arguments_with_values, skipped), (executed_tool, response) in zip(prepared, results):
+            if executed_tool:
+                executed_tools.append(executed_tool)
+                if skipped is None and tool_name in [
+                    "write_file_tool", "writefile", "edit_whole_content", "replace_in_file", "replaceinfile", "EditWholeContent"
+                ] and "file_path" in arguments_with_values:
+                    self._track_file(arguments_with_values["file_path"], tool_name)
+            response = str(response)
+            variable_name = self.variable_store.add(response)
+            response_display = response
+            if len(response) > MAX_RESPONSE_LENGTH:
+                response_display = response[:MAX_RESPONSE_LENGTH]
+                response_display += (
+                    f"... content was truncated full content available by interpolation in variable {variable_name}"
+                )
+            sections.append(f"<{variable_name} tool=\"{tool_name}\">\n{response_display}\n</{variable_name}>")
+
+        if not executed_tools:
+            return self._handle_tool_execution_failure("\n".join(sections))
+
+        formatted_response = self._render_template(
+            'observation_response_format.j2',
+            iteration=iteration,
+            max_iterations=self.max_iterations,
+            task_to_solve_summary=self.task_to_solve_summary,
+            tools_prompt=self._get_tools_names_prompt(),
+            variables_prompt=self._get_variable_prompt(),
+            last_executed_tool=", ".join(executed_tools),
+            # Each result is wrapped in the tag of its own variable
+            variable_name=None,
+            response_display="\n".join(sections),
+            parallel_tool_calls=True,
+        )
+        return ObserveResponseResult(next_prompt=formatted_response, executed_tool=", ".join(executed_tools), answer=None)
+
     def _execute_tool(self, tool_name: str, tool: Tool, arguments_with_values: dict) -> tuple[str, Any]:
         """Execute a tool with validation if required (synchronous wrapper).
 
@@ -821,7 +951,8 @@ class Agent(BaseModel):
             if hasattr(tool, "async_execute") and callable(tool.async_execute):
                 response = await tool.async_execute(**converted_args)
             else:
-                response = tool.execute(**converted_args)
+                # Run synchronous tools in a worker thread so they do not block the event loop
+                response = await asyncio.to_thread(tool.execute, **converted_args)
                 
             # Post-process tool response if needed
             if (tool.need_post_process):
@@ -842,7 +973,7 @@ class Agent(BaseModel):
 
         Args:
             text: Text containing variable references
-            depth: Current recursion depth
+            depth: Nesting depth already consumed by the caller
 
         Returns:
             Text with variables interpolated
@@ -850,23 +981,8 @@ class Agent(BaseModel):
         if not isinstance(text, str):
             return str(text)
 
-        if depth > MAX_INTERPOLATION_DEPTH:
-            logger.warning(f"Max interpolation depth ({MAX_INTERPOLATION_DEPTH}) reached, stopping recursion")
-            return text
-
         try:
-            import re
-
-            for var in self.variable_store.keys():
-                escaped_var = re.escape(var).replace('\\$', '$')
-                pattern = f"\\${escaped_var}\\$"
-                replacement = str(self.variable_store[var])
-                text = re.sub(pattern, lambda m: replacement, text)
-
-            if '$' in text and depth < MAX_INTERPOLATION_DEPTH:
-                return await self._async_interpolate_variables(text, depth + 1)
-
-            return text
+            return self.variable_store.interpolate(text, max_depth=MAX_INTERPOLATION_DEPTH - depth)
         except Exception as e:
             logger.error(f"Error in _async_interpolate_variables: {str(e)}")
             return text
@@ -937,7 +1053,7 @@ class Agent(BaseModel):
 
             self._emit_event("memory_full")
             await self._async_compact_memory()
-            self.total_tokens = self.model.token_counter_with_history(self.memory.memory, current_prompt)
+            self._update_total_tokens(self.memory.memory, current_prompt)
             self._emit_event("memory_compacted")
 
     async def _async_compact_memory(self) -> None:
@@ -1037,11 +1153,18 @@ class Agent(BaseModel):
     def _update_total_tokens(self, message_history: list[Message], prompt: str) -> None:
         """Update the total tokens count based on message history and prompt.
 
+        The history total comes from the per-message counts cached by AgentMemory, so only
+        the prompt is tokenized here. Histories not owned by the agent memory are counted in full.
+
         Args:
             message_history: List of messages
             prompt: Current prompt
         """
-        self.total_tokens = self.model.token_counter_with_history(message_history, prompt)
+        if message_history is not self.memory.memory:
+            self.total_tokens = self.model.token_counter_with_history(message_history, prompt)
+            return
+
+        self.total_tokens = self.memory.total_tokens + self.model.token_counter_with_history([], prompt)
 
     def _emit_event(self, event_type: str, data: dict[str, Any] | None = None) -> None:
         """Emit an event with system context and optional additional data.
@@ -1070,25 +1193,41 @@ class Agent(BaseModel):
         Returns:
             Dictionary mapping tool names to inputs
         """
-        if not content or not isinstance(content, str):
-            return {}
-
-        xml_parser = ToleranceXMLParser()
-        action = xml_parser.extract_elements(text=content, element_names=["action"])
-
-        tool_names = self.tools.tool_names()
-
-        if action:
-            tool_data = xml_parser.extract_elements(text=action["action"], element_names=tool_names)
-            # Handle nested parameters within action tags
-            for tool_name in tool_data:
-                if "<parameter_name>" in tool_data[tool_name]:
-                    params = xml_parser.extract_elements(text=tool_data[tool_name], element_names=["parameter_name", "parameter_value"])
-                    if "parameter_name" in params and "parameter_value" in params:
-                        tool_data[tool_name] = {params["parameter_name"]: params["parameter_value"]}
-            return tool_data
-        else:
-            return xml_parser.extract_elements(text=content, element_names=tool_names)
+        tool_data: dict = {}
+        for tool_name, tool_input in self._parse_tool_calls(content):
+            tool_data[tool_name] = tool_input
+        return tool_data
+
+    def _parse_tool_calls(self, content: str) -> list[tuple[str, str | dict]]:
+        """Extract every tool call from the response content, including repeated tools.
+
+        Args:
+            content: Response content
+
+        Returns:
+            List of (tool_name, tool_input) in the order they appear in the response
+        """
+        calls: list[tuple[str, str | dict]] = []
+        for tool_call in self._get_tool_call_parser().parse(content):
+            tool_input: str | dict = tool_call.content
+            # Handle nested <parameter_name>/<parameter_value> pairs
+            if "<parameter_name>" in tool_input:
+                params = parse_xml_arguments(tool_input)
+                if "parameter_name" in params and "parameter_value" in params:
+                    tool_input = {params["parameter_name"]: params["parameter_value"]}
+            calls.append((tool_call.name, tool_input))
+        return calls
+
+    def _get_tool_call_parser(self) -> ToolCallParser:
+        """Return the tool call parser, rebuilt only when the set of tools changes.
+
+        Returns:
+            ToolCallParser for the registered tools
+        """
+        tool_names = frozenset(self.tools.tool_names())
+        if self._tool_call_parser is None or self._tool_call_parser.tool_names != tool_names:
+            self._tool_call_parser = ToolCallParser(tool_names)
+        return self._tool_call_parser
 
     def _parse_tool_arguments(self, tool: Tool, tool_input: str | dict) -> dict:
         """Parse the tool arguments from the tool input.
@@ -1428,7 +1567,8 @@ class Agent(BaseModel):
             variables_prompt=variables_prompt,
             last_executed_tool=last_executed_tool,
             variable_name=variable_name,
-            response_display=response_display
+            response_display=response_display,
+            parallel_tool_calls=self.parallel_tool_calls,
         )
 
         return formatted_response
@@ -1467,7 +1607,9 @@ class Agent(BaseModel):
         
         # Default task mode behavior
         tool_names = ', '.join(self.tools.tool_names())
-        return self._render_template('tools_prompt.j2', tool_names=tool_names)
+        return self._render_template(
+            'tools_prompt.j2', tool_names=tool_names, parallel_tool_calls=self.parallel_tool_calls
+        )
         
     def _get_tools_names_prompt_for_chat(self) -> str:
         """Construct a detailed prompt for chat mode that includes tool parameters, excluding task_complete.
@@ -1591,7 +1733,6 @@ class Agent(BaseModel):
             new_model_name: New model name to use
         """
         self.model_name = new_model_name
-        self.model = GenerativeModel(model=new_model_name, event_emitter=self.event_emitter)
 
     def add_tool(self, tool: Tool) -> None:
         """Add a new tool to the agent's tool manager.
@@ -5,6 +5,40 @@ from typing import Any, Callable, Dict, Optional, Tuple
 
 from loguru import logger
 
+# Maximum number of async listener calls an emitter may have in flight before emit() drops new ones
+DEFAULT_MAX_PENDING_ASYNC = 1000
+
+
+class _AsyncDispatcher:
+    """Background asyncio event loop shared by all emitters to run async listeners."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="event-emitter-dispatcher", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self) -> None:
+        """Run the event loop for the lifetime of the process."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_dispatcher_thread(self) -> bool:
+        """Return True when called from the dispatcher thread itself."""
+        return threading.current_thread() is self.thread
+
+
+_dispatcher: _AsyncDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def _get_dispatcher() -> _AsyncDispatcher:
+    """Return the process-wide dispatcher, starting it on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = _AsyncDispatcher()
+        return _dispatcher
+
 
 class EventEmitter:
     """A thread-safe event emitter class for managing event listeners and emissions with enhanced features.
@@ -15,18 +49,24 @@ class EventEmitter:
     like error handling and debugging tools.
 
     Now supports both synchronous and asynchronous listeners (coroutines). Synchronous listeners are
-    executed immediately, while asynchronous listeners are scheduled in a background asyncio event loop.
+    executed immediately, while asynchronous listeners are scheduled in a background asyncio event loop
+    shared by all emitters of the process, started when the first async listener is registered.
+    Each emitter bounds its in-flight async listener calls: once `max_pending_async` calls are pending,
+    emit() drops further async listener calls, without blocking the caller, until one completes.
     Note that errors from async listeners may be handled in a background thread, so error handlers must be
     thread-safe if provided.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, max_pending_async: int = DEFAULT_MAX_PENDING_ASYNC) -> None:
         """Initialize an empty EventEmitter instance.
 
         Creates an empty dictionary to store event listeners,
         where each event can have multiple callable listeners with priorities and metadata.
         Also initializes a list for wildcard listeners that listen to all events.
-        Starts a background asyncio event loop in a daemon thread to handle async listeners.
+        No thread or event loop is created until an async listener is registered.
+
+        Parameters:
+        - max_pending_async (int): Maximum number of async listener calls in flight for this emitter.
         """
         # Listeners stored as (callable, priority, metadata) tuples
         self._listeners: dict[str, list[Tuple[Callable[..., Any], int, Optional[Dict[str, Any]]]]] = {}
@@ -34,16 +74,17 @@ class EventEmitter:
         self._lock = threading.RLock()
         self.context: dict[str, Any] = {}  # Store context data like task_id
 
-        # Initialize background asyncio event loop
-        self._loop = asyncio.new_event_loop()
-        self._stop_future = self._loop.create_future()
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
+        self._dispatcher: _AsyncDispatcher | None = None
+        self._pending_slots = threading.BoundedSemaphore(max_pending_async)
+        self.dropped_async_calls = 0  # Async listener calls dropped because the queue was full
+        self._tasks: set[asyncio.Task] = set()  # Only accessed from the dispatcher thread
 
-    def _run_loop(self) -> None:
-        """Run the background asyncio event loop until stopped."""
-        asyncio.set_event_loop(self._loop)
-        self._loop.run_until_complete(self._stop_future)
+    @property
+    def _loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop running this emitter's async listeners."""
+        if self._dispatcher is None:
+            self._dispatcher = _get_dispatcher()
+        return self._dispatcher.loop
 
     def _schedule_async_listener(
         self,
@@ -56,10 +97,26 @@ class EventEmitter:
     ) -> None:
         """Schedule an async listener in the background loop and handle errors."""
         kwargs = kwargs or {}  # Ensure kwargs is a dict if None
-        coro = listener(event, *listener_args, **kwargs)  # Pass event, args, and kwargs
-        task = self._loop.create_task(coro)
-        if error_handler:
-            task.add_done_callback(lambda t: self._handle_task_error(t, error_handler, metadata))
+        try:
+            coro = listener(event, *listener_args, **kwargs)  # Pass event, args, and kwargs
+            task = self._loop.create_task(coro)
+        except Exception:
+            self._pending_slots.release()
+            raise
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._on_task_done(t, error_handler, metadata))
+
+    def _on_task_done(
+        self,
+        task: asyncio.Task,
+        error_handler: Optional[Callable[[Exception], None]],
+        metadata: Optional[Dict[str, Any]],
+    ) -> None:
+        """Release the pending slot of a finished async listener and report its errors."""
+        self._tasks.discard(task)
+        self._pending_slots.release()
+        if not task.cancelled():
+            self._handle_task_error(task, error_handler, metadata)
 
     def _handle_task_error(
         self,
@@ -79,14 +136,32 @@ class EventEmitter:
                     error_msg += f" (Metadata: {metadata})"
                 logger.error(error_msg)
 
+    def _acquire_pending_slot(self, event: str) -> bool:
+        """Take a slot in the async listener queue without blocking; False when the call is dropped."""
+        if self._pending_slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            self.dropped_async_calls += 1
+            dropped = self.dropped_async_calls
+        if dropped == 1:
+            logger.warning(f"Async listener queue full, dropping listener calls (first for event '{event}')")
+        else:
+            logger.debug(f"Async listener queue full, dropping listener call for event '{event}' ({dropped} dropped)")
+        return False
+
+    async def _drain(self) -> None:
+        """Wait for this emitter's in-flight async listeners."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
     def close(self) -> None:
-        """Optional method to shut down the background event loop.
+        """Wait for this emitter's pending async listeners to finish.
 
-        Not required for existing users, as the loop runs in a daemon thread.
-        Useful for explicit resource cleanup when using async listeners.
+        Not required for existing users. The shared background loop keeps running for other emitters.
         """
-        self._loop.call_soon_threadsafe(lambda: self._stop_future.set_result(None))
-        self._thread.join()
+        if self._dispatcher is None or self._dispatcher.in_dispatcher_thread():
+            return
+        asyncio.run_coroutine_threadsafe(self._drain(), self._dispatcher.loop).result()
 
     def on(
         self,
@@ -117,6 +192,8 @@ class EventEmitter:
                 if not evt or (evt != "*" and not isinstance(evt, str)):
                     raise ValueError("Event names must be non-empty strings or '*'")
                 listener_tuple = (listener, priority, metadata)
+                if self._dispatcher is None and inspect.iscoroutinefunction(listener):
+                    self._dispatcher = _get_dispatcher()
                 if evt == "*":
                     if listener_tuple not in self._wildcard_listeners:
                         self._wildcard_listeners.append(listener_tuple)
@@ -226,6 +303,8 @@ class EventEmitter:
         for listener_tuple in listeners:
             listener, _, metadata = listener_tuple
             if inspect.iscoroutinefunction(listener):
+                if not self._acquire_pending_slot(event):
+                    continue
                 self._loop.call_soon_threadsafe(
                     self._schedule_async_listener,
                     listener,
@@ -7,9 +7,11 @@ from typing import Any, AsyncGenerator, Dict, List
 import openai
 from loguru import logger
 from pydantic import BaseModel, Field, field_validator
+from quantalogic_flow.flow.llm_cache import CACHE_BYPASS_EVENT, CACHE_HIT_EVENT, CACHE_MISS_EVENT, ResponseCache
 
 from quantalogic_react.quantalogic.event_emitter import EventEmitter  # Importing the EventEmitter class
 from quantalogic_react.quantalogic.get_model_info import get_max_input_tokens, get_max_output_tokens, get_max_tokens
+from quantalogic_react.quantalogic.model_limits_cache import ModelLimitsCacheStats, get_model_limits_cache_stats
 from quantalogic_react.quantalogic.quantlitellm import acompletion, aimage_generation, exceptions, token_counter
 
 MIN_RETRIES = 1
@@ -79,6 +81,7 @@ class GenerativeModel:
         model: str = "ollama/qwen2.5-coder:14b",
         temperature: float = 0.7,
         event_emitter: EventEmitter = None,  # EventEmitter instance
+        response_cache: ResponseCache | None = None,
     ) -> None:
         """Initialize a generative model with configurable parameters.
 
@@ -89,11 +92,17 @@ class GenerativeModel:
                         make it more deterministic. Defaults to 0.7.
             event_emitter: Optional event emitter instance for handling asynchronous events
                           and callbacks during text generation. Defaults to None.
+            response_cache: Optional cache of non-streaming responses, keyed by model, messages
+                          and sampling parameters. The cache may be shared; each lookup emits an
+                          "llm_cache_hit", "llm_cache_miss" or "llm_cache_bypass" event on this
+                          model's event emitter with the cache counters. Defaults to None.
         """
         logger.debug(f"Initializing GenerativeModel with model={model}, temperature={temperature}")
         self.model = model
         self.temperature = temperature
         self.event_emitter = event_emitter or EventEmitter()  # Initialize event emitter
+        self.response_cache = response_cache
+        self._reply_priming_tokens: int | None = None
 
     # Define retriable exceptions based on LiteLLM's exception mapping
     RETRIABLE_EXCEPTIONS = (
@@ -156,6 +165,12 @@ class GenerativeModel:
             self.event_emitter.emit("stream_start")
             return self._async_stream_response(messages, stop_words)
 
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key, cached = self._lookup_cached_response(messages, stop_words)
+            if cached is not None:
+                return cached
+
         try:
             logger.debug(f"Async generating response for prompt: {prompt} with messages: {messages}")
             response = await acompletion(
@@ -189,18 +204,56 @@ class GenerativeModel:
                 logger.warning(f"Received None content from {self.model}. Raw response: {response}")
                 raise ValueError(f"Model {self.model} returned no content for the given input.")
 
-            return ResponseStats(
+            result = ResponseStats(
                 response=content,
                 usage=token_usage,
                 model=self.model,
                 finish_reason=response.choices[0].finish_reason,
             )
+            if cache_key is not None:
+                self.response_cache.set(cache_key, result.model_dump())
+            return result
         except Exception as e:
             self._handle_generation_exception(e)
             # We should never reach here as _handle_generation_exception always raises
 
+    def _lookup_cached_response(
+        self, messages: list[dict], stop_words: list[str] | None
+    ) -> tuple[str | None, ResponseStats | None]:
+        """Look up a response in the response cache and emit the matching cache event.
+
+        Returns:
+            The cache key (None when the request is not cacheable) and the cached response, if any.
+        """
+        cache = self.response_cache
+        if not cache.is_cacheable(self.temperature):
+            cache.record_bypass(model=self.model)
+            self._emit_cache_event(CACHE_BYPASS_EVENT, None)
+            return None, None
+
+        cache_key = cache.make_key(self.model, messages, {"temperature": self.temperature, "stop": stop_words})
+        cached = cache.get(cache_key, model=self.model)
+        if cached is None:
+            self._emit_cache_event(CACHE_MISS_EVENT, cache_key)
+            return cache_key, None
+
+        self._emit_cache_event(CACHE_HIT_EVENT, cache_key)
+
+        logger.debug(f"Serving response for {self.model} from the response cache")
+        return cache_key, ResponseStats.model_validate(cached)
+
+    def _emit_cache_event(self, event: str, cache_key: str | None) -> None:
+        """Emit a response cache event with the cache counters, without counting the stored entries."""
+        payload = {"key": cache_key, "model": self.model, **self.response_cache.stats(include_size=False).to_dict()}
+        self.event_emitter.emit(event, payload)
+
     async def _async_stream_response(self, messages, stop_words: list[str] | None = None):
-        """Private method to handle asynchronous streaming responses."""
+        """Private method to handle asynchronous streaming responses.
+
+        Closing the generator early (`aclose()`) also closes the provider stream, which stops
+        the generation and the token spend.
+        """
+        response = None
         try:
             response = await acompletion(
                 model=self.model,
@@ -215,6 +268,12 @@ class GenerativeModel:
                     self.event_emitter.emit("stream_chunk", chunk.choices[0].delta.content)
                     yield chunk.choices[0].delta.content
             self.event_emitter.emit("stream_end")
+        except GeneratorExit:
+            logger.debug("Stream closed by the consumer before completion")
+            if response is not None and hasattr(response, "aclose"):
+                await response.aclose()
+            self.event_emitter.emit("stream_end")
+            raise
         except Exception as e:
             logger.error(f"Async streaming error: {str(e)}")
             raise
@@ -294,6 +353,10 @@ class GenerativeModel:
         """Get the maximum number of output tokens for the model."""
         return get_max_output_tokens(self.model)
 
+    def get_model_limits_cache_stats(self) -> ModelLimitsCacheStats:
+        """Get hit/miss statistics of the shared model limits cache."""
+        return get_model_limits_cache_stats()
+
     async def async_generate_image(self, prompt: str, params: Dict[str, Any]) -> ResponseStats:
         """Asynchronously generate an image using the specified model and parameters.
 
@@ -356,6 +419,17 @@ class GenerativeModel:
         litellm_messages = [{"role": msg.role, "content": str(msg.content)} for msg in messages]
         return token_counter(model=self.model, messages=litellm_messages)
 
+    def message_token_counter(self, message: Message) -> int:
+        """Count the number of tokens of a single message.
+
+        Used by AgentMemory to tokenize each message once when it is added. The fixed reply
+        priming overhead is excluded so per-message counts can be summed.
+        """
+        if self._reply_priming_tokens is None:
+            self._reply_priming_tokens = token_counter(model=self.model, messages=[])
+        message_tokens = token_counter(model=self.model, messages=[{"role": message.role, "content": str(message.content)}])
+        return message_tokens - self._reply_priming_tokens
+
     def token_counter_with_history(self, messages_history: list[Message], prompt: str) -> int:
         """Count the number of tokens in a list of messages and a prompt."""
         litellm_messages = [{"role": msg.role, "content": str(msg.content)} for msg in messages_history]
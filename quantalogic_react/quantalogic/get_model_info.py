@@ -1,7 +1,13 @@
+from collections.abc import Callable
+
 import loguru
 
 from quantalogic_react.quantalogic.model_info_list import model_info
-from quantalogic_react.quantalogic.model_info_litellm import litellm_get_model_max_input_tokens, litellm_get_model_max_output_tokens
+from quantalogic_react.quantalogic.model_info_litellm import (
+    litellm_get_model_max_input_tokens,
+    litellm_get_model_max_output_tokens,
+)
+from quantalogic_react.quantalogic.model_limits_cache import model_limits_cache
 from quantalogic_react.quantalogic.utils.lm_studio_model_info import get_model_list
 
 DEFAULT_MAX_OUTPUT_TOKENS = 4 * 1024  # Reasonable default for most models
@@ -20,18 +26,31 @@ def print_model_info():
         print(f"  Max Output Tokens: {info.max_output_tokens:,}")
 
 
-def get_max_output_tokens(model_name: str) -> int:
-    """Get max output tokens with safe fallback"""
-    validate_model_name(model_name)
+def _get_lm_studio_context_length(model_name: str) -> int | None:
+    """Get the context length of an LM Studio model, fetched over HTTP once per TTL.
+
+    A model missing from the list is cached as None. Failed requests are not cached, so the
+    model is looked up again once LM Studio is reachable.
+    """
+
+    def fetch() -> int | None:
+        for model in get_model_list().data:
+            if model.id == model_name[len("lm_studio/") :]:
+                return model.max_context_length
+        return None
+
+    try:
+        return model_limits_cache.get_or_compute("lm_studio_context_length", model_name, fetch)
+    except Exception:
+        loguru.logger.warning(f"Could not fetch LM Studio model info for {model_name}, using default")
+        return None
+
 
+def _resolve_max_output_tokens(model_name: str) -> int:
     if model_name.startswith("lm_studio/"):
-        try:
-            models = get_model_list()
-            for model in models.data:
-                if model.id == model_name[len("lm_studio/") :]:
-                    return model.max_context_length
-        except Exception:
-            loguru.logger.warning(f"Could not fetch LM Studio model info for {model_name}, using default")
+        context_length = _get_lm_studio_context_length(model_name)
+        if context_length is not None:
+            return context_length
 
     if model_name in model_info:
         return model_info[model_name].max_output_tokens
@@ -43,18 +62,11 @@ def get_max_output_tokens(model_name: str) -> int:
         return DEFAULT_MAX_OUTPUT_TOKENS
 
 
-def get_max_input_tokens(model_name: str) -> int:
-    """Get max input tokens with safe fallback"""
-    validate_model_name(model_name)
-
+def _resolve_max_input_tokens(model_name: str) -> int:
     if model_name.startswith("lm_studio/"):
-        try:
-            models = get_model_list()
-            for model in models.data:
-                if model.id == model_name[len("lm_studio/") :]:
-                    return model.max_context_length
-        except Exception:
-            loguru.logger.warning(f"Could not fetch LM Studio model info for {model_name}, using default")
+        context_length = _get_lm_studio_context_length(model_name)
+        if context_length is not None:
+            return context_length
 
     if model_name in model_info:
         return model_info[model_name].max_input_tokens
@@ -66,6 +78,25 @@ def get_max_input_tokens(model_name: str) -> int:
         return DEFAULT_MAX_INPUT_TOKENS
 
 
+def _cached_limit(kind: str, model_name: str, resolve: Callable[[str], int]) -> int:
+    if model_name.startswith("lm_studio/"):
+        # Only the LM Studio lookup is cached, so a default used while LM Studio is unreachable is not kept
+        return resolve(model_name)
+    return model_limits_cache.get_or_compute(kind, model_name, lambda: resolve(model_name))
+
+
+def get_max_output_tokens(model_name: str) -> int:
+    """Get max output tokens with safe fallback (cached per model)"""
+    validate_model_name(model_name)
+    return _cached_limit("max_output_tokens", model_name, _resolve_max_output_tokens)
+
+
+def get_max_input_tokens(model_name: str) -> int:
+    """Get max input tokens with safe fallback (cached per model)"""
+    validate_model_name(model_name)
+    return _cached_limit("max_input_tokens", model_name, _resolve_max_input_tokens)
+
+
 def get_max_tokens(model_name: str) -> int:
     """Get total maximum tokens (input + output)"""
     validate_model_name(model_name)
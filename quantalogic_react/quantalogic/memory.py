@@ -1,6 +1,22 @@
 """Memory for the agent."""
 
-from pydantic import BaseModel
+import hashlib
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+from pydantic import BaseModel, PrivateAttr
+
+# Maximum nesting of variables referencing other variables
+MAX_INTERPOLATION_DEPTH = 10
+
+# Maximum number of characters produced by one interpolation
+MAX_INTERPOLATION_LENGTH = 16 * 1024 * 1024
 
 
 class Message(BaseModel):
@@ -8,14 +24,74 @@ class Message(BaseModel):
 
     role: str
     content: str
+    _token_count: int | None = PrivateAttr(default=None)
 
 
 class AgentMemory:
-    """Memory for the agent."""
+    """Memory for the agent.
+
+    When a token counter is attached, each message is tokenized once when it enters
+    memory and a running total is maintained, so occupancy checks do not need to
+    re-tokenize the whole history.
+    """
+
+    def __init__(self, token_counter: Callable[[Message], int] | None = None):
+        """Initialize the agent memory.
+
+        Args:
+            token_counter (Callable[[Message], int], optional): Function counting the tokens
+                of a single message. Defaults to None (token accounting disabled).
+        """
+        self._memory: list[Message] = []
+        self._token_counter = token_counter
+        self._total_tokens: int = 0
+
+    @property
+    def memory(self) -> list[Message]:
+        """The list of messages held in memory."""
+        return self._memory
+
+    @memory.setter
+    def memory(self, messages: list[Message]):
+        self._memory = list(messages)
+        self._recount_tokens()
+
+    @property
+    def total_tokens(self) -> int:
+        """Running total of the tokens of all messages in memory."""
+        return self._total_tokens
+
+    def set_token_counter(self, token_counter: Callable[[Message], int] | None):
+        """Attach the token counter and recount the messages already in memory.
+
+        Cached per-message counts are discarded because they depend on the tokenizer.
+
+        Args:
+            token_counter (Callable[[Message], int] | None): Function counting the tokens of a message.
+        """
+        self._token_counter = token_counter
+        for message in self._memory:
+            message._token_count = None
+        self._recount_tokens()
 
-    def __init__(self):
-        """Initialize the agent memory."""
-        self.memory: list[Message] = []
+    def message_tokens(self, message: Message) -> int:
+        """Return the token count of a message, computing and caching it on first use.
+
+        Args:
+            message (Message): The message to count.
+
+        Returns:
+            int: The number of tokens, or 0 if no token counter is attached.
+        """
+        if self._token_counter is None:
+            return 0
+        if message._token_count is None:
+            message._token_count = self._token_counter(message)
+        return message._token_count
+
+    def _recount_tokens(self):
+        """Rebuild the running total from the (cached) per-message counts."""
+        self._total_tokens = sum(self.message_tokens(message) for message in self._memory)
 
     def add(self, message: Message):
         """Add a message to the agent memory.
@@ -23,11 +99,13 @@ class AgentMemory:
         Args:
             message (Message): The message to add to memory.
         """
-        self.memory.append(message)
+        self._memory.append(message)
+        self._total_tokens += self.message_tokens(message)
 
     def reset(self):
         """Reset the agent memory."""
-        self.memory.clear()
+        self._memory.clear()
+        self._total_tokens = 0
 
     def compact(self, n: int = 2):
         """Compact the memory to keep only essential messages.
@@ -75,13 +153,140 @@ class AgentMemory:
         self.memory = compacted_memory
 
 
+class SpilledValue(NamedTuple):
+    """Reference to a variable value stored in a `BlobStore`."""
+
+    digest: str
+    length: int
+
+
+class BlobStore:
+    """Session-scoped, content-addressed store for large variable values.
+
+    Values are written once under their SHA-256 digest in a temporary directory that is
+    created on first use and removed when the store is closed or garbage collected.
+    """
+
+    def __init__(self, directory: str | None = None):
+        """Initialize the blob store.
+
+        Args:
+            directory (str, optional): Parent directory for the session directory.
+                Defaults to the system temporary directory.
+        """
+        self._parent = directory
+        self._path: Path | None = None
+        self._finalizer: weakref.finalize | None = None
+
+    @property
+    def path(self) -> Path:
+        """Session directory, created on first access."""
+        if self._path is None:
+            self._path = Path(tempfile.mkdtemp(prefix="quantalogic_variables_", dir=self._parent))
+            self._finalizer = weakref.finalize(self, shutil.rmtree, str(self._path), True)
+        return self._path
+
+    def put(self, value: str) -> SpilledValue:
+        """Store a value and return its reference. Identical values are stored once.
+
+        Args:
+            value (str): The value to store.
+
+        Returns:
+            SpilledValue: Reference to the stored value.
+        """
+        data = value.encode("utf-8", errors="surrogatepass")
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self.path / digest
+        if not blob_path.exists():
+            tmp_path = blob_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(blob_path)
+        return SpilledValue(digest=digest, length=len(value))
+
+    def get(self, ref: SpilledValue) -> str:
+        """Load a stored value.
+
+        Args:
+            ref (SpilledValue): Reference returned by `put`.
+
+        Returns:
+            str: The stored value.
+        """
+        return (self.path / ref.digest).read_bytes().decode("utf-8", errors="surrogatepass")
+
+    def close(self):
+        """Remove the session directory and all stored values."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._path = None
+        self._finalizer = None
+
+
 class VariableMemory:
-    """Memory for a variable."""
+    """Memory for a variable.
+
+    Values longer than `spill_threshold` characters are written to a session-scoped
+    `BlobStore` and loaded lazily on access. Loaded values are kept in an LRU cache bounded
+    to `max_resident_size` characters, so large tool outputs do not stay in RAM for the
+    whole session.
+    """
 
-    def __init__(self):
-        """Initialize the variable memory."""
-        self.memory: dict[str, tuple[str, str]] = {}
+    DEFAULT_SPILL_THRESHOLD = 64 * 1024
+    DEFAULT_MAX_RESIDENT_SIZE = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        spill_threshold: int | None = DEFAULT_SPILL_THRESHOLD,
+        max_resident_size: int = DEFAULT_MAX_RESIDENT_SIZE,
+        blob_store: BlobStore | None = None,
+    ):
+        """Initialize the variable memory.
+
+        Args:
+            spill_threshold (int | None): Size in characters above which string values are
+                spilled to disk. None keeps every value in memory.
+            max_resident_size (int): Maximum characters of spilled values kept loaded.
+            blob_store (BlobStore, optional): Store for spilled values, which may be shared and is
+                left open by `reset`. Defaults to a new session-scoped store owned by this memory.
+        """
+        self.memory: dict[str, tuple[str, str | SpilledValue]] = {}
         self.counter: int = 0
+        self.spill_threshold = spill_threshold
+        self.max_resident_size = max_resident_size
+        self._owns_blob_store = blob_store is None
+        self._blob_store = BlobStore() if blob_store is None else blob_store
+        self._resident: OrderedDict[str, str] = OrderedDict()
+        self._resident_size = 0
+
+    def _store(self, key: str, value: str):
+        """Store a value inline or in the blob store depending on its size."""
+        if self.spill_threshold is not None and isinstance(value, str) and len(value) > self.spill_threshold:
+            self.memory[key] = (key, self._blob_store.put(value))
+        else:
+            self.memory[key] = (key, value)
+
+    def _load(self, stored: str | SpilledValue) -> str:
+        """Return the value of a stored entry, loading spilled values through the LRU cache."""
+        if not isinstance(stored, SpilledValue):
+            return stored
+        value = self._resident.get(stored.digest)
+        if value is not None:
+            self._resident.move_to_end(stored.digest)
+            return value
+        value = self._blob_store.get(stored)
+        if stored.length <= self.max_resident_size:
+            self._resident[stored.digest] = value
+            self._resident_size += stored.length
+            while self._resident_size > self.max_resident_size:
+                _, evicted = self._resident.popitem(last=False)
+                self._resident_size -= len(evicted)
+        return value
+
+    @property
+    def resident_size(self) -> int:
+        """Characters of spilled values currently loaded in memory."""
+        return self._resident_size
 
     def add(self, value: str) -> str:
         """Add a value to the variable memory.
@@ -94,13 +299,17 @@ class VariableMemory:
         """
         self.counter += 1
         key = f"var{self.counter}"
-        self.memory[key] = (key, value)
+        self._store(key, value)
         return key
 
     def reset(self):
-        """Reset the variable memory."""
+        """Reset the variable memory, removing the spilled values if the blob store is owned."""
         self.memory.clear()
         self.counter = 0
+        self._resident.clear()
+        self._resident_size = 0
+        if self._owns_blob_store:
+            self._blob_store.close()
 
     def get(self, key: str, default: str | None = None) -> str | None:
         """Get a value from the variable memory.
@@ -112,7 +321,7 @@ class VariableMemory:
         Returns:
             str | None: The value associated with the key, or default if not found.
         """
-        return self.memory.get(key, default)[1] if key in self.memory else default
+        return self._load(self.memory[key][1]) if key in self.memory else default
 
     def __getitem__(self, key: str) -> str:
         """Get a value using dictionary-style access.
@@ -126,7 +335,7 @@ class VariableMemory:
         Raises:
             KeyError: If the key is not found.
         """
-        return self.memory[key][1]
+        return self._load(self.memory[key][1])
 
     def __setitem__(self, key: str, value: str):
         """Set a value using dictionary-style assignment.
@@ -135,7 +344,7 @@ class VariableMemory:
             key (str): The key to set.
             value (str): The value to associate with the key.
         """
-        self.memory[key] = (key, value)
+        self._store(key, value)
 
     def __delitem__(self, key: str):
         """Delete a key-value pair using dictionary-style deletion.
@@ -176,20 +385,20 @@ class VariableMemory:
         return self.memory.keys()
 
     def values(self):
-        """Return a view of the memory's values.
+        """Return an iterator over the memory's values, loading spilled values lazily.
 
         Returns:
-            dict_values: A view of the memory's values.
+            Iterator[str]: The memory's values.
         """
-        return (value[1] for value in self.memory.values())
+        return (self._load(value[1]) for value in self.memory.values())
 
     def items(self):
-        """Return a view of the memory's items.
+        """Return an iterator over the memory's items, loading spilled values lazily.
 
         Returns:
-            dict_items: A view of the memory's items.
+            Iterator[tuple[str, str]]: The memory's (key, value) pairs.
         """
-        return ((key, value[1]) for key, value in self.memory.items())
+        return ((key, self._load(value[1])) for key, value in self.memory.items())
 
     def pop(self, key: str, default: str | None = None) -> str | None:
         """Remove and return a value for a key.
@@ -201,7 +410,11 @@ class VariableMemory:
         Returns:
             str | None: The value associated with the key, or default if not found.
         """
-        return self.memory.pop(key, (None, default))[1] if default is not None else self.memory.pop(key)[1]
+        if key not in self.memory:
+            if default is not None:
+                return default
+            raise KeyError(key)
+        return self._load(self.memory.pop(key)[1])
 
     def update(self, other: dict[str, str] | None = None, **kwargs):
         """Update the memory with key-value pairs from another dictionary.
@@ -212,6 +425,77 @@ class VariableMemory:
         """
         if other is not None:
             for key, value in other.items():
-                self.memory[key] = (key, value)
+                self._store(key, value)
         for key, value in kwargs.items():
-            self.memory[key] = (key, value)
+            self._store(key, value)
+
+    def interpolate(
+        self,
+        text: str,
+        max_depth: int = MAX_INTERPOLATION_DEPTH,
+        max_length: int = MAX_INTERPOLATION_LENGTH,
+    ) -> str:
+        """Replace `$name$` references with variable values in a single scan.
+
+        References inside values are expanded recursively (each value at most once per call),
+        up to `max_depth` levels. Cyclic references and references that would exceed
+        `max_length` characters are left as is. Unknown names are kept literally.
+
+        Args:
+            text (str): Text containing variable references.
+            max_depth (int): Maximum nesting of references. Defaults to MAX_INTERPOLATION_DEPTH.
+            max_length (int): Expansion budget in characters. Defaults to MAX_INTERPOLATION_LENGTH.
+
+        Returns:
+            str: The text with variables interpolated.
+        """
+        if "$" not in text or not self.memory:
+            return text
+
+        max_key_length = max(len(key) for key in self.memory)
+        expanded: dict[str, str] = {}
+        in_progress: set[str] = set()
+        budget = [max_length]
+
+        def expand(source: str, depth: int) -> str:
+            pieces = []
+            position = 0
+            while True:
+                start = source.find("$", position)
+                if start < 0:
+                    break
+                end = source.find("$", start + 1)
+                if end < 0:
+                    break
+                if end - start - 1 > max_key_length or source[start + 1 : end] not in self.memory:
+                    # Not a reference: the closing '$' may open the next one
+                    pieces.append(source[position:end])
+                    position = end
+                    continue
+                name = source[start + 1 : end]
+                pieces.append(source[position:start])
+                pieces.append(resolve(name, depth, source[start : end + 1]))
+                position = end + 1
+            pieces.append(source[position:])
+            return "".join(pieces)
+
+        def resolve(name: str, depth: int, reference: str) -> str:
+            if name in expanded:
+                value = expanded[name]
+            elif name in in_progress:
+                logger.warning(f"Cyclic variable reference to '{name}', leaving it uninterpolated")
+                return reference
+            else:
+                value = str(self[name])
+                if depth < max_depth and "$" in value:
+                    in_progress.add(name)
+                    value = expand(value, depth + 1)
+                    in_progress.discard(name)
+                expanded[name] = value
+            if len(value) > budget[0]:
+                logger.warning(f"Interpolation budget of {max_length} characters exceeded, leaving '{name}' uninterpolated")
+                return reference
+            budget[0] -= len(value)
+            return value
+
+        return expand(text, 0)
@@ -1,4 +1,4 @@
-import functools
+from quantalogic_react.quantalogic.model_limits_cache import model_limits_cache
 
 # litellm will be imported lazily when needed
 _litellm = None
@@ -15,19 +15,22 @@ def _get_litellm():
         _litellm = litellm
     return _litellm
 
-@functools.lru_cache(maxsize=32)
 def litellm_get_model_info(model_name: str) -> dict | None:
     """Get model information with prefix fallback logic using only litellm.
 
+    Results are kept in the shared model limits cache.
+
     Args:
         model_name: The model identifier to get information for
 
     Returns:
         Dictionary containing model information
-
-    Raises:
-        ValueError: If model info cannot be found after prefix fallbacks
     """
+    return model_limits_cache.get_or_compute("litellm_model_info", model_name, lambda: _litellm_lookup(model_name))
+
+
+def _litellm_lookup(model_name: str) -> dict | None:
+    """Look up model information in the litellm registry, dropping one prefix level at a time."""
     litellm = _get_litellm()
     tried_models = [model_name]
 
@@ -0,0 +1,109 @@
+"""Process-wide cache for model context limits and registry lookups.
+
+Resolving a model's limits can involve the local registry, litellm's model map, or an HTTP
+call to LM Studio. Limits practically never change during a session, so each lookup is
+resolved once and shared by `get_model_info`, `model_info_litellm` and `GenerativeModel`.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class ModelLimitsCacheStats(BaseModel):
+    """Hit/miss counters of the model limits cache."""
+
+    hits: int
+    misses: int
+    size: int
+    ttl: float | None = None
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ModelLimitsCache:
+    """Thread-safe cache of per-model lookups with optional TTL refresh."""
+
+    def __init__(self, ttl: float | None = None):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds after which an entry is resolved again. None keeps entries forever.
+        """
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str], tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compute(self, kind: str, model_name: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for (kind, model_name), computing it on a miss.
+
+        Exceptions raised by `compute` propagate and nothing is cached.
+
+        Args:
+            kind: Category of the lookup, e.g. "max_input_tokens".
+            model_name: The model identifier.
+            compute: Function resolving the value when it is not cached or expired.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        key = (kind, model_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Resolve outside the lock: lookups may block on the network (LM Studio)
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+        return value
+
+    def invalidate(self, model_name: str | None = None) -> None:
+        """Drop cached entries for one model, or all entries when model_name is None."""
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[1] == model_name]:
+                    del self._entries[key]
+
+    def stats(self) -> ModelLimitsCacheStats:
+        """Return the current hit/miss counters."""
+        with self._lock:
+            return ModelLimitsCacheStats(hits=self._hits, misses=self._misses, size=len(self._entries), ttl=self.ttl)
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters."""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+
+model_limits_cache = ModelLimitsCache()
+
+
+def get_model_limits_cache_stats() -> ModelLimitsCacheStats:
+    """Return hit/miss statistics of the shared model limits cache."""
+    return model_limits_cache.stats()
+
+
+def set_model_limits_cache_ttl(ttl: float | None) -> None:
+    """Set the TTL (in seconds) of the shared model limits cache. None disables expiry."""
+    model_limits_cache.ttl = ttl
+
+
+def clear_model_limits_cache(model_name: str | None = None) -> None:
+    """Invalidate the shared model limits cache for one model or for all models."""
+    model_limits_cache.invalidate(model_name)
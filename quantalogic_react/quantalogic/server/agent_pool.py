@@ -0,0 +1,207 @@
+"""Agent pool and task scheduler for the QuantaLogic server.
+
+Each submitted task runs on its own Agent checked out from a per-model pool, so concurrent
+tasks never share memory, variables or token counters. Tasks wait in a bounded queue and
+are picked up by a fixed set of workers.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from loguru import logger
+from pydantic import BaseModel
+
+from quantalogic_react.quantalogic.agent import Agent
+
+# Number of recent queue wait times used for the average
+WAIT_TIME_WINDOW = 100
+
+
+class QueueFullError(Exception):
+    """Raised when a task is submitted while the task queue is full."""
+
+
+class SchedulerMetrics(BaseModel):
+    """Queue and pool metrics reported with task listings."""
+
+    queue_depth: int
+    max_queue_size: int
+    running_tasks: int
+    workers: int
+    pool_size: int
+    agents_created: int
+    agents_in_use: int
+    utilization: float
+    avg_wait_time: float
+    max_wait_time: float
+
+
+class AgentPool:
+    """Per-model pool of isolated Agent instances.
+
+    Agents are created on demand up to `size_per_model` for each model and reused once
+    released. Each agent's memory and variables are cleared when it is checked out again.
+    """
+
+    def __init__(self, agent_factory: Callable[[str], Agent], size_per_model: int = 4):
+        """Initialize the pool.
+
+        Args:
+            agent_factory: Function creating a new agent for a model name.
+            size_per_model: Maximum number of agents per model.
+        """
+        self.agent_factory = agent_factory
+        self.size_per_model = size_per_model
+        self._idle: Dict[str, asyncio.Queue] = {}
+        self._created: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def checkout(self, model_name: str) -> AsyncIterator[Agent]:
+        """Check out an agent for `model_name`, waiting for one to be released if needed."""
+        agent = await self._acquire(model_name)
+        try:
+            yield agent
+        finally:
+            self._in_use[model_name] -= 1
+            self._idle[model_name].put_nowait(agent)
+
+    async def _acquire(self, model_name: str) -> Agent:
+        async with self._lock:
+            idle = self._idle.setdefault(model_name, asyncio.Queue())
+            create = idle.empty() and self._created.get(model_name, 0) < self.size_per_model
+            if create:
+                # Reserve the slot before releasing the lock: creating an agent is slow
+                self._created[model_name] = self._created.get(model_name, 0) + 1
+
+        if create:
+            try:
+                agent = await asyncio.get_running_loop().run_in_executor(None, self.agent_factory, model_name)
+            except Exception:
+                self._created[model_name] -= 1
+                raise
+            logger.debug(f"Created pooled agent {self._created[model_name]}/{self.size_per_model} for {model_name}")
+        else:
+            agent = await idle.get()
+            agent.clear_memory()
+
+        self._in_use[model_name] = self._in_use.get(model_name, 0) + 1
+        return agent
+
+    @property
+    def agents_created(self) -> int:
+        """Total number of agents created across models."""
+        return sum(self._created.values())
+
+    @property
+    def agents_in_use(self) -> int:
+        """Number of agents currently checked out."""
+        return sum(self._in_use.values())
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of agents for the models seen so far."""
+        return self.size_per_model * max(len(self._created), 1)
+
+    def clear(self) -> None:
+        """Drop all idle agents."""
+        for model_name, idle in self._idle.items():
+            while not idle.empty():
+                idle.get_nowait()
+                self._created[model_name] -= 1
+
+
+class TaskScheduler:
+    """Bounded task queue served by a fixed number of workers running on pooled agents."""
+
+    def __init__(
+        self,
+        pool: AgentPool,
+        run_task: Callable[[str, Agent], Awaitable[Any]],
+        workers: int = 4,
+        max_queue_size: int = 100,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            pool: Pool providing the agents.
+            run_task: Coroutine function executing a task id on a checked-out agent.
+            workers: Maximum number of tasks running concurrently.
+            max_queue_size: Maximum number of tasks waiting to run.
+        """
+        self.pool = pool
+        self.run_task = run_task
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._running = 0
+        self._wait_times: deque[float] = deque(maxlen=WAIT_TIME_WINDOW)
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Create the queue and start the workers on the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        return self._queue
+
+    def submit(self, task_id: str, model_name: str) -> int:
+        """Queue a task for execution.
+
+        Returns:
+            The queue depth after submission.
+
+        Raises:
+            QueueFullError: If the task queue is full.
+        """
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait((task_id, model_name, time.monotonic()))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Task queue is full ({self.max_queue_size} tasks waiting)")
+        return queue.qsize()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            task_id, model_name, queued_at = await self._queue.get()
+            try:
+                async with self.pool.checkout(model_name) as agent:
+                    self._wait_times.append(time.monotonic() - queued_at)
+                    self._running += 1
+                    try:
+                        await self.run_task(task_id, agent)
+                    finally:
+                        self._running -= 1
+            except Exception as e:
+                logger.error(f"Worker {index} failed to run task {task_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def shutdown(self) -> None:
+        """Cancel the workers; queued tasks are not run."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def metrics(self) -> SchedulerMetrics:
+        """Return current queue depth, wait times and pool utilization."""
+        waits = list(self._wait_times)
+        return SchedulerMetrics(
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            max_queue_size=self.max_queue_size,
+            running_tasks=self._running,
+            workers=self.workers,
+            pool_size=self.pool.capacity,
+            agents_created=self.pool.agents_created,
+            agents_in_use=self.pool.agents_in_use,
+            utilization=self._running / self.workers if self.workers else 0.0,
+            avg_wait_time=sum(waits) / len(waits) if waits else 0.0,
+            max_wait_time=max(waits, default=0.0),
+        )
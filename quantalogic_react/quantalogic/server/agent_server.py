@@ -4,15 +4,14 @@
 # Standard library imports
 import asyncio
 import functools
-import json
+import os
 import signal
 import sys
 import time
 import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime
-from queue import Empty, Queue
-from threading import Lock
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
 # Third-party imports
@@ -27,13 +26,16 @@ from pydantic import BaseModel
 from rich.console import Console
 
 # Local imports
+from quantalogic_react.quantalogic.agent import Agent
 from quantalogic_react.quantalogic.agent_config import (
     MODEL_NAME,
     create_agent,
     create_basic_agent,  # noqa: F401
-    create_coding_agent,  # noqa: F401
 )
 from quantalogic_react.quantalogic.console_print_events import console_print_events
+from quantalogic_react.quantalogic.server.agent_pool import AgentPool, QueueFullError, SchedulerMetrics, TaskScheduler
+from quantalogic_react.quantalogic.server.event_hub import HEARTBEAT_INTERVAL, EventHub
+from quantalogic_react.quantalogic.server.task_store import SQLiteTaskStore, TaskStore
 
 # Configure logger
 logger.remove()
@@ -46,6 +48,11 @@ logger.add(
 # Constants
 SHUTDOWN_TIMEOUT = 5.0  # seconds
 VALIDATION_TIMEOUT = 30.0  # seconds
+AGENT_POOL_SIZE = 4  # agents per model
+MAX_CONCURRENT_TASKS = 4
+MAX_QUEUED_TASKS = 100
+TASK_DB_PATH = Path(os.environ.get("QUANTALOGIC_TASK_DB", Path.home() / ".quantalogic" / "server_tasks.db"))
+TASK_RETENTION = timedelta(days=30)  # finished tasks older than this are deleted
 
 
 def handle_sigterm(signum, frame):
@@ -100,18 +107,6 @@ class ServerState:
 
 
 # Models
-class EventMessage(BaseModel):
-    """Event message model for SSE."""
-
-    id: str
-    event: str
-    task_id: Optional[str] = None  # Added task_id field
-    data: Dict[str, Any]
-    timestamp: str
-
-    model_config = {"extra": "forbid"}
-
-
 class UserValidationRequest(BaseModel):
     """Request model for user validation."""
 
@@ -151,105 +146,65 @@ class TaskStatus(BaseModel):
     error: Optional[str] = None
     total_tokens: Optional[int] = None
     model_name: Optional[str] = None
+    wait_time: Optional[float] = None  # seconds spent in the queue
+
+
+class TaskList(BaseModel):
+    """Paginated task listing with scheduler metadata.
+
+    Pass `next_cursor` as `cursor` to fetch the next page.
+    """
+
+    tasks: List[TaskStatus]
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+    metadata: SchedulerMetrics
 
 
 class AgentState:
     """Manages agent state and event queues."""
 
-    def __init__(self):
-        """Initialize the agent state."""
-        self.agent = None
-        # Use a nested dictionary to track event queues per client and task
-        self.event_queues: Dict[str, Dict[str, Queue]] = {}
-        # Track active agents per client-task combination
-        self.active_agents: Dict[str, Dict[str, Any]] = {}
-        self.queue_lock = Lock()
-        self.client_counter = 0
+    def __init__(self, task_store: Optional[TaskStore] = None):
+        """Initialize the agent state.
+
+        Args:
+            task_store: Store for submitted tasks; defaults to a SQLite database at TASK_DB_PATH,
+                opened by `open_task_store` when the server starts.
+        """
+        # Push-based SSE delivery with per-channel replay buffers
+        self.event_hub = EventHub()
         self.console = Console()
         self.validation_requests: Dict[str, Dict[str, Any]] = {}
         self.validation_responses: Dict[str, asyncio.Queue] = {}
-        self.tasks: Dict[str, Dict[str, Any]] = {}
-        self.task_queues: Dict[str, asyncio.Queue] = {}
-
-    def add_client(self, task_id: Optional[str] = None) -> str:
-        """Add a new client and return its ID.
+        self.task_store: Optional[TaskStore] = task_store
+        self.agent_pool = AgentPool(self.create_agent_with_sse_validation, size_per_model=AGENT_POOL_SIZE)
+        self.scheduler = TaskScheduler(
+            self.agent_pool, self.run_task, workers=MAX_CONCURRENT_TASKS, max_queue_size=MAX_QUEUED_TASKS
+        )
 
-        Ensures unique client-task combination.
-        """
-        with self.queue_lock:
-            # Generate a unique client ID
-            client_id = f"client_{self.client_counter}"
-            self.client_counter += 1
-
-            # Initialize nested event queue structure
-            if client_id not in self.event_queues:
-                self.event_queues[client_id] = {}
-                self.active_agents[client_id] = {}
-
-            if task_id:
-                # Prevent multiple agents for the same client-task combination
-                if task_id in self.active_agents[client_id]:
-                    raise ValueError(f"An agent already exists for client {client_id} and task {task_id}")
-
-                # Create a specific queue for this client-task combination
-                self.event_queues[client_id][task_id] = Queue()
-                self.active_agents[client_id][task_id] = {
-                    "created_at": datetime.utcnow().isoformat(),
-                    "status": "active",
-                }
-            else:
-                # Global client queue
-                self.event_queues[client_id] = {"global": Queue()}
-
-            return client_id
-
-    def remove_client(self, client_id: str, task_id: Optional[str] = None):
-        """Remove a client's event queue, optionally for a specific task."""
-        with self.queue_lock:
-            if client_id in self.event_queues:
-                if task_id and task_id in self.event_queues[client_id]:
-                    # Remove specific task queue for this client
-                    del self.event_queues[client_id][task_id]
-
-                    # Remove active agent for this client-task
-                    if client_id in self.active_agents and task_id in self.active_agents[client_id]:
-                        del self.active_agents[client_id][task_id]
-                else:
-                    # Remove entire client entry
-                    del self.event_queues[client_id]
-
-                    # Remove all active agents for this client
-                    if client_id in self.active_agents:
-                        del self.active_agents[client_id]
+    def open_task_store(self) -> TaskStore:
+        """Open the task store, creating the SQLite database on first use."""
+        if self.task_store is None:
+            self.task_store = SQLiteTaskStore(TASK_DB_PATH, retention=TASK_RETENTION)
+        # Tasks left pending or running by a previous server process will never finish
+        self.task_store.fail_unfinished("Server restarted before the task finished")
+        return self.task_store
 
     def broadcast_event(
         self, event_type: str, data: Dict[str, Any], task_id: Optional[str] = None, client_id: Optional[str] = None
     ):
-        """Broadcast an event to specific client-task queues or globally.
+        """Broadcast an event to the subscribers of its task and to global subscribers.
 
-        Allows optional filtering by client_id and task_id to prevent event leakage.
+        Events without task_id only reach global subscribers; client_id restricts delivery to one client.
         """
-        event = EventMessage(
-            id=str(uuid.uuid4()), event=event_type, task_id=task_id, data=data, timestamp=datetime.utcnow().isoformat()
-        )
+        self.event_hub.publish(event_type, data, task_id=task_id, client_id=client_id)
 
-        with self.queue_lock:
-            for curr_client_id, client_queues in self.event_queues.items():
-                # Skip if specific client_id is provided and doesn't match
-                if client_id and curr_client_id != client_id:
-                    continue
-
-                if task_id and task_id in client_queues:
-                    # Send to specific task queue
-                    client_queues[task_id].put(event)
-                elif not task_id and "global" in client_queues:
-                    # Send to global queue if no task specified
-                    client_queues["global"].put(event)
-
-    def initialize_agent_with_sse_validation(self, model_name: str = MODEL_NAME):
-        """Initialize agent with SSE-based user validation."""
+    def create_agent_with_sse_validation(self, model_name: str = MODEL_NAME) -> Agent:
+        """Create an agent with SSE-based user validation and event forwarding."""
         try:
-            self.agent = create_agent(model_name, None)
+            agent = create_agent(model_name, None)
 
             # Comprehensive list of agent events to track
             agent_events = [
@@ -275,12 +230,25 @@ class AgentState:
 
             # Setup event handlers
             for event in agent_events:
-                self.agent.event_emitter.on(event, lambda e, d, event=event: self._handle_event(event, d))
+                agent.event_emitter.on(
+                    event,
+                    lambda e, d, event=event, agent=agent: self._handle_event(
+                        event, d, agent.event_emitter.context.get("task_id")
+                    ),
+                )
+            # Token chunks are forwarded without console output; the event hub coalesces them
+            agent.event_emitter.on(
+                "stream_chunk",
+                lambda e, chunk, agent=agent: self.broadcast_event(
+                    "stream_chunk", {"content": chunk}, task_id=agent.event_emitter.context.get("task_id")
+                ),
+            )
 
             # Override ask_for_user_validation with SSE-based method
-            self.agent.ask_for_user_validation = self.sse_ask_for_user_validation
+            agent.ask_for_user_validation = self.sse_ask_for_user_validation
 
             logger.debug(f"Agent initialized with model: {model_name}")
+            return agent
         except Exception as e:
             logger.error(f"Failed to initialize agent: {e}", exc_info=True)
             raise
@@ -324,7 +292,7 @@ class AgentState:
             if validation_id in self.validation_responses:
                 del self.validation_responses[validation_id]
 
-    def _handle_event(self, event_type: str, data: Dict[str, Any]):
+    def _handle_event(self, event_type: str, data: Dict[str, Any], task_id: Optional[str] = None):
         """Enhanced event handling with rich console output."""
         try:
             # Print events to server console
@@ -334,18 +302,12 @@ class AgentState:
             logger.debug(f"Agent Event: {event_type}")
             logger.debug(f"Event Data: {data}")
 
-            # Broadcast to clients
-            self.broadcast_event(event_type, data)
+            # Broadcast to the task's subscribers and to global subscribers
+            self.broadcast_event(event_type, data, task_id=task_id)
 
         except Exception as e:
             logger.error(f"Error in event handling: {e}", exc_info=True)
 
-    def get_current_model_name(self) -> str:
-        """Get the current model name safely."""
-        if self.agent and self.agent.model:
-            return self.agent.model.model
-        return MODEL_NAME
-
     async def cleanup(self):
         """Clean up resources during shutdown."""
         try:
@@ -355,62 +317,76 @@ class AgentState:
                 return
 
             async with asyncio.timeout(SHUTDOWN_TIMEOUT):
-                with self.queue_lock:
-                    # Notify all clients
-                    self.broadcast_event("server_shutdown", {"message": "Server is shutting down"})
-                    # Clear queues
-                    self.event_queues.clear()
-                    self.validation_requests.clear()
-                    self.validation_responses.clear()
-                # Clear agent
-                self.agent = None
+                # Notify all clients and end their streams
+                self.broadcast_event("server_shutdown", {"message": "Server is shutting down"})
+                self.event_hub.close()
+                self.validation_requests.clear()
+                self.validation_responses.clear()
+                # Stop workers and clear agents
+                await self.scheduler.shutdown()
+                self.agent_pool.clear()
+                if self.task_store is not None:
+                    await asyncio.to_thread(self.task_store.close)
                 logger.debug("Cleanup completed")
         except TimeoutError:
             logger.warning(f"Cleanup timed out after {SHUTDOWN_TIMEOUT} seconds")
         except Exception as e:
             logger.error(f"Error during cleanup: {e}", exc_info=True)
         finally:
-            self.agent = None
             if server_state.force_exit:
                 sys.exit(1)
 
     async def submit_task(self, task_request: TaskSubmission) -> str:
-        """Submit a new task and return its ID."""
+        """Submit a new task to the scheduler queue and return its ID.
+
+        Raises:
+            QueueFullError: If the task queue is full.
+        """
         task_id = str(uuid.uuid4())
-        self.tasks[task_id] = {
+        model_name = task_request.model_name or MODEL_NAME
+        task = {
+            "task_id": task_id,
             "status": "pending",
             "created_at": datetime.now().isoformat(),
             "request": task_request.dict(),
+            "model_name": model_name,
         }
-        self.task_queues[task_id] = asyncio.Queue()
+        self.scheduler.submit(task_id, model_name)
+        # Buffered by the store and written by its background writer
+        self.task_store.create(task)
         return task_id
 
-    async def execute_task(self, task_id: str):
-        """Execute a task asynchronously."""
+    async def run_task(self, task_id: str, agent: Agent):
+        """Run a task on a checked-out agent and record its outcome."""
         try:
-            task = self.tasks[task_id]
-            task["status"] = "running"
-            task["started_at"] = datetime.now().isoformat()
-
-            # Initialize agent if needed
-            if not self.agent:
-                self.initialize_agent_with_sse_validation(task["request"]["model_name"])
+            task = await asyncio.to_thread(self.task_store.get, task_id)
+            started_at = datetime.now()
+            self.task_store.update(
+                task_id,
+                status="running",
+                started_at=started_at.isoformat(),
+                wait_time=(started_at - datetime.fromisoformat(task["created_at"])).total_seconds(),
+            )
+            agent.event_emitter.context["task_id"] = task_id
 
             # Execute task
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
                 None,
                 functools.partial(
-                    self.agent.solve_task, task["request"]["task"], max_iterations=task["request"]["max_iterations"]
+                    agent.solve_task, task["request"]["task"], max_iterations=task["request"]["max_iterations"]
                 ),
             )
 
             # Update task status
-            task["status"] = "completed"
-            task["completed_at"] = datetime.now().isoformat()
-            task["result"] = result
-            task["total_tokens"] = self.agent.total_tokens
-            task["model_name"] = self.get_current_model_name()
+            self.task_store.update(
+                task_id,
+                status="completed",
+                completed_at=datetime.now().isoformat(),
+                result=result,
+                total_tokens=agent.total_tokens,
+                model_name=agent.model.model,
+            )
 
             # Broadcast completion event to task-specific queue
             self.broadcast_event(
@@ -418,33 +394,20 @@ class AgentState:
                 {
                     "task_id": task_id,
                     "result": result,
-                    "total_tokens": self.agent.total_tokens,
-                    "model_name": self.get_current_model_name(),
+                    "total_tokens": agent.total_tokens,
+                    "model_name": agent.model.model,
                 },
+                task_id=task_id,
             )
 
         except Exception as e:
             logger.error(f"Task execution failed: {e}", exc_info=True)
-            task["status"] = "failed"
-            task["completed_at"] = datetime.now().isoformat()
-            task["error"] = str(e)
+            self.task_store.update(task_id, status="failed", completed_at=datetime.now().isoformat(), error=str(e))
 
             # Broadcast error event to task-specific queue
-            self.broadcast_event("task_error", {"task_id": task_id, "error": str(e)})
-
-    async def get_task_event_queue(self, task_id: str) -> Queue:
-        """Get or create a task-specific event queue."""
-        with self.queue_lock:
-            if task_id not in self.task_queues:
-                self.task_queues[task_id] = Queue()
-            return self.task_queues[task_id]
-
-    def remove_task_event_queue(self, task_id: str):
-        """Remove a task-specific event queue."""
-        with self.queue_lock:
-            if task_id in self.task_queues:
-                del self.task_queues[task_id]
-                logger.debug(f"Removed event queue for task_id: {task_id}")
+            self.broadcast_event("task_error", {"task_id": task_id, "error": str(e)}, task_id=task_id)
+        finally:
+            agent.event_emitter.context.pop("task_id", None)
 
 
 # Initialize global states
@@ -461,6 +424,8 @@ async def lifespan(app: FastAPI):
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(sig, lambda s=sig: asyncio.create_task(handle_shutdown(s)))
+        # Open the task database on startup rather than when the module is imported
+        await asyncio.to_thread(agent_state.open_task_store)
         yield
     finally:
         logger.debug("Shutting down server gracefully...")
@@ -536,42 +501,35 @@ async def submit_validation_response(validation_id: str, response: UserValidatio
 
 
 @app.get("/events")
-async def event_stream(request: Request, task_id: Optional[str] = None) -> StreamingResponse:
-    """SSE endpoint for streaming agent events."""
+async def event_stream(
+    request: Request, task_id: Optional[str] = None, last_event_id: Optional[int] = None
+) -> StreamingResponse:
+    """SSE endpoint for streaming agent events.
+
+    Reconnecting clients resume after the `Last-Event-ID` header (or `last_event_id` query
+    parameter) from the channel's replay buffer.
+    """
+    header_event_id = request.headers.get("last-event-id")
+    if header_event_id and header_event_id.isdigit():
+        last_event_id = int(header_event_id)
 
     async def event_generator() -> AsyncGenerator[str, None]:
-        # Ensure unique client-task combination
-        client_id = agent_state.add_client(task_id)
+        subscriber = agent_state.event_hub.subscribe(task_id, last_event_id)
+        client_id = subscriber.client_id
         logger.debug(f"Client {client_id} subscribed to {'task_id: ' + task_id if task_id else 'all events'}")
 
         try:
-            while not server_state.is_shutting_down:
-                if await request.is_disconnected():
+            async for frame in agent_state.event_hub.stream(subscriber, HEARTBEAT_INTERVAL):
+                if server_state.is_shutting_down or await request.is_disconnected():
                     break
+                yield frame
 
-                try:
-                    # Prioritize task-specific queue if task_id is provided
-                    if task_id:
-                        event = agent_state.event_queues[client_id][task_id].get_nowait()
-                    else:
-                        # Fall back to global queue if no task_id
-                        event = agent_state.event_queues[client_id]["global"].get_nowait()
-
-                    # Yield the event
-                    yield f"event: {event.event}\ndata: {json.dumps(event.dict())}\n\n"
-
-                except Empty:
-                    # Send keepalive to maintain connection
-                    yield ": keepalive\n\n"
-                    # await asyncio.sleep(0)
-
-                if server_state.is_shutting_down:
-                    yield 'event: shutdown\ndata: {"message": "Server shutting down"}\n\n'
-                    break
+            if server_state.is_shutting_down:
+                yield 'event: shutdown\ndata: {"message": "Server shutting down"}\n\n'
 
         finally:
-            # Clean up the client's event queue
-            agent_state.remove_client(client_id, task_id)
+            # Clean up the client's subscription
+            agent_state.event_hub.unsubscribe(subscriber)
             logger.debug(f"Client {client_id} {'unsubscribed from task_id: ' + task_id if task_id else 'disconnected'}")
 
     return StreamingResponse(
@@ -597,36 +555,46 @@ async def get_index(request: Request) -> HTMLResponse:
 
 @app.post("/tasks")
 async def submit_task(request: TaskSubmission) -> Dict[str, str]:
-    """Submit a new task and return its ID."""
-    task_id = await agent_state.submit_task(request)
-    # Start task execution in background
-    asyncio.create_task(agent_state.execute_task(task_id))
+    """Queue a new task and return its ID."""
+    try:
+        task_id = await agent_state.submit_task(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"task_id": task_id}
 
 
 @app.get("/tasks/{task_id}")
 async def get_task_status(task_id: str) -> TaskStatus:
     """Get the status of a specific task."""
-    if task_id not in agent_state.tasks:
+    task = await asyncio.to_thread(agent_state.task_store.get, task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-
-    task = agent_state.tasks[task_id]
-    return TaskStatus(task_id=task_id, **task)
+    return TaskStatus(**task)
 
 
 @app.get("/tasks")
-async def list_tasks(status: Optional[str] = None, limit: int = 10, offset: int = 0) -> List[TaskStatus]:
-    """List all tasks with optional filtering."""
-    tasks = []
-    for task_id, task in agent_state.tasks.items():
-        if status is None or task["status"] == status:
-            tasks.append(TaskStatus(task_id=task_id, **task))
-
-    return tasks[offset : offset + limit]
-
-
-# Update the Agent initialization to use SSE validation by default
-AgentState.initialize_agent = AgentState.initialize_agent_with_sse_validation
+async def list_tasks(
+    status: Optional[str] = None, limit: int = 10, offset: int = 0, cursor: Optional[str] = None
+) -> TaskList:
+    """List tasks in creation order with optional filtering, with queue and pool metrics.
+
+    `cursor` (the `next_cursor` of the previous page) pages through the tasks without
+    scanning skipped rows; `offset` is used only when no cursor is given.
+    """
+    try:
+        tasks, next_cursor = await asyncio.to_thread(agent_state.task_store.list, status, limit, cursor, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await asyncio.to_thread(agent_state.task_store.count, status)
+
+    return TaskList(
+        tasks=[TaskStatus(**task) for task in tasks],
+        total=total,
+        limit=limit,
+        offset=offset,
+        next_cursor=next_cursor,
+        metadata=agent_state.scheduler.metrics(),
+    )
 
 if __name__ == "__main__":
     config = uvicorn.Config(
@@ -0,0 +1,246 @@
+"""Push-based event delivery for the QuantaLogic server's SSE endpoint.
+
+Subscribers are indexed by channel: a task id, or the global channel which receives every
+event. An event is only pushed to the subscribers of its task and of the global channel,
+and is serialized into an SSE frame at most once, when first delivered or replayed. Idle
+connections only wake up for events or timed heartbeats.
+
+Each subscriber has a bounded buffer: consecutive token-chunk events are coalesced into one,
+and the oldest buffered event is dropped when a slow client falls behind. Each channel keeps
+a bounded replay buffer so a client reconnecting with `Last-Event-ID` receives the events
+it missed.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import OrderedDict, deque
+from datetime import UTC, datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+GLOBAL_CHANNEL = "global"
+REPLAY_BUFFER_SIZE = 500  # events kept per channel for Last-Event-ID resume
+MAX_REPLAY_CHANNELS = 1000  # task channels whose replay buffer is retained
+HEARTBEAT_INTERVAL = 15.0  # seconds between keepalive comments on idle connections
+SUBSCRIBER_BUFFER_SIZE = 1000  # events buffered per subscriber before the oldest is dropped
+COALESCED_EVENTS = frozenset({"stream_chunk"})  # token events merged while buffered
+
+
+class Event:
+    """A published event, serialized on first use."""
+
+    __slots__ = ("id", "type", "task_id", "data", "timestamp", "_frame")
+
+    def __init__(self, event_id: int, event_type: str, task_id: Optional[str], data: Dict[str, Any], timestamp: str):
+        self.id = event_id
+        self.type = event_type
+        self.task_id = task_id
+        self.data = data
+        self.timestamp = timestamp
+        self._frame: Optional[str] = None
+
+    @property
+    def frame(self) -> str:
+        """The SSE frame of the event."""
+        if self._frame is None:
+            payload = {
+                "id": str(self.id),
+                "event": self.type,
+                "task_id": self.task_id,
+                "data": self.data,
+                "timestamp": self.timestamp,
+            }
+            self._frame = f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(payload, default=str)}\n\n"
+        return self._frame
+
+    def coalesce(self, newer: "Event") -> Optional["Event"]:
+        """Merge a following token-chunk event into this one; None when they cannot be merged."""
+        if (
+            self.type != newer.type
+            or self.type not in COALESCED_EVENTS
+            or self.task_id != newer.task_id
+            or not isinstance(self.data.get("content"), str)
+            or not isinstance(newer.data.get("content"), str)
+        ):
+            return None
+        data = {**newer.data, "content": self.data["content"] + newer.data["content"]}
+        return Event(newer.id, newer.type, newer.task_id, data, newer.timestamp)
+
+
+class Subscriber:
+    """A client connection listening to one channel, with a bounded event buffer."""
+
+    def __init__(self, client_id: str, channel: str, max_buffer: int = SUBSCRIBER_BUFFER_SIZE):
+        self.client_id = client_id
+        self.channel = channel
+        self.max_buffer = max_buffer
+        self.buffer: deque[Event] = deque()
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        """Buffer an event for this subscriber. Must run on the event loop thread."""
+        if self.buffer:
+            merged = self.buffer[-1].coalesce(event)
+            if merged is not None:
+                self.buffer[-1] = merged
+                return
+        if len(self.buffer) >= self.max_buffer:
+            self.buffer.popleft()
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning(f"Client {self.client_id} is too slow, dropping oldest events")
+        self.buffer.append(event)
+        self._ready.set()
+
+    def close(self) -> None:
+        """End the subscriber's stream once its buffered events are delivered. Must run on the event loop thread."""
+        self.closed = True
+        self._ready.set()
+
+
+class EventHub:
+    """Publish/subscribe hub turning server events into SSE frames.
+
+    `publish` may be called from any thread (agents run in executor threads); frames are
+    handed to the event loop that owns the subscribers.
+    """
+
+    def __init__(self, replay_buffer_size: int = REPLAY_BUFFER_SIZE, max_replay_channels: int = MAX_REPLAY_CHANNELS):
+        """Initialize the hub.
+
+        Args:
+            replay_buffer_size: Number of events kept per channel for replay.
+            max_replay_channels: Number of channels whose replay buffers are retained.
+        """
+        self.replay_buffer_size = replay_buffer_size
+        self.max_replay_channels = max_replay_channels
+        self._channels: Dict[str, list[Subscriber]] = {}
+        self._replay: OrderedDict[str, deque[Event]] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._client_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        task_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+    ) -> int:
+        """Publish an event to the subscribers of `task_id` and of the global channel.
+
+        Args:
+            event_type: SSE event name.
+            data: JSON-serializable event data.
+            task_id: Task the event belongs to, or None for a global-only event.
+            client_id: Restrict delivery to one client.
+
+        Returns:
+            The id of the published event.
+        """
+        channels = (GLOBAL_CHANNEL, task_id) if task_id else (GLOBAL_CHANNEL,)
+        with self._lock:
+            event = Event(next(self._ids), event_type, task_id, data, datetime.now(UTC).isoformat())
+            targets: list[Subscriber] = []
+            for channel in channels:
+                if client_id is None:
+                    self._remember(channel, event)
+                for subscriber in self._channels.get(channel, ()):
+                    if client_id is None or subscriber.client_id == client_id:
+                        targets.append(subscriber)
+        self._deliver(targets, event)
+        return event.id
+
+    def _remember(self, channel: str, event: Event) -> None:
+        """Append an event to the channel's replay buffer (lock held)."""
+        buffer = self._replay.get(channel)
+        if buffer is None:
+            buffer = self._replay[channel] = deque(maxlen=self.replay_buffer_size)
+            if len(self._replay) > self.max_replay_channels:
+                self._replay.popitem(last=False)
+        else:
+            self._replay.move_to_end(channel)
+        buffer.append(event)
+
+    def _deliver(self, targets: list[Subscriber], event: Event) -> None:
+        """Push an event to subscriber buffers on the event loop thread."""
+        if not targets or self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._push_all(targets, event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._push_all, targets, event)
+
+    @staticmethod
+    def _push_all(targets: list[Subscriber], event: Event) -> None:
+        for subscriber in targets:
+            subscriber.push(event)
+
+    def subscribe(self, task_id: Optional[str] = None, last_event_id: Optional[int] = None) -> Subscriber:
+        """Register a subscriber, buffering the retained events after `last_event_id`.
+
+        Must be called from the event loop serving the subscriber.
+        """
+        self._loop = asyncio.get_running_loop()
+        channel = task_id or GLOBAL_CHANNEL
+        with self._lock:
+            subscriber = Subscriber(f"client_{next(self._client_ids)}", channel)
+            if last_event_id is not None:
+                for event in self._replay.get(channel, ()):
+                    if event.id > last_event_id:
+                        subscriber.push(event)
+            self._channels.setdefault(channel, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber."""
+        with self._lock:
+            subscribers = self._channels.get(subscriber.channel)
+            if subscribers and subscriber in subscribers:
+                subscribers.remove(subscriber)
+                if not subscribers:
+                    del self._channels[subscriber.channel]
+
+    async def stream(
+        self, subscriber: Subscriber, heartbeat_interval: float = HEARTBEAT_INTERVAL
+    ) -> AsyncIterator[str]:
+        """Yield SSE frames for a subscriber, with keepalive comments while idle.
+
+        Stops when the hub is closed, after the events already buffered for the subscriber.
+        """
+        while True:
+            if subscriber.buffer:
+                yield subscriber.buffer.popleft().frame
+                continue
+            if subscriber.closed:
+                return
+            subscriber._ready.clear()
+            try:
+                await asyncio.wait_for(subscriber._ready.wait(), heartbeat_interval)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+
+    def close(self) -> None:
+        """End all subscriber streams once their buffered events are delivered."""
+        with self._lock:
+            targets = [subscriber for subscribers in self._channels.values() for subscriber in subscribers]
+            self._channels.clear()
+        if self._loop is not None and not self._loop.is_closed():
+            for subscriber in targets:
+                self._loop.call_soon_threadsafe(subscriber.close)
+        logger.debug(f"Event hub closed, {len(targets)} subscribers released")
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers."""
+        return sum(len(subscribers) for subscribers in self._channels.values())
@@ -0,0 +1,384 @@
+"""Task storage for the QuantaLogic server.
+
+`TaskStore` is the interface used by the server; `SQLiteTaskStore` persists tasks in a SQLite
+database in WAL mode so task history survives restarts, and `InMemoryTaskStore` keeps them
+in a dict. Listings use keyset pagination on (created_at, task_id).
+
+SQLite writes are buffered and flushed in batches by a background thread, so recording task
+progress, results and token usage never waits on the disk.
+"""
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+FLUSH_INTERVAL = 0.5  # seconds between batched writes
+COMPACT_INTERVAL = 3600.0  # seconds between retention passes
+DEFAULT_RETENTION_DAYS = 30  # finished tasks older than this are deleted
+
+FINISHED_STATUSES = ("completed", "failed")
+TASK_COLUMNS = (
+    "task_id",
+    "status",
+    "created_at",
+    "started_at",
+    "completed_at",
+    "result",
+    "error",
+    "total_tokens",
+    "model_name",
+    "wait_time",
+    "request",
+)
+
+
+def encode_cursor(task: Dict[str, Any]) -> str:
+    """Return the keyset cursor pointing after `task`."""
+    return f"{task['created_at']}|{task['task_id']}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Split a keyset cursor into (created_at, task_id).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    created_at, separator, task_id = cursor.partition("|")
+    if not separator or not created_at or not task_id:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return created_at, task_id
+
+
+class TaskStore(ABC):
+    """Storage interface for server tasks.
+
+    Tasks are dicts with the keys of TASK_COLUMNS; `request` holds the submitted TaskSubmission.
+    """
+
+    @abstractmethod
+    def create(self, task: Dict[str, Any]) -> None:
+        """Store a new task."""
+
+    @abstractmethod
+    def update(self, task_id: str, **fields: Any) -> None:
+        """Update fields of a task."""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return a task, or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, task_id: str) -> None:
+        """Delete a task."""
+
+    @abstractmethod
+    def list(
+        self, status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None, offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List tasks ordered by creation time.
+
+        Args:
+            status: Only return tasks with this status.
+            limit: Maximum number of tasks.
+            cursor: Keyset cursor returned by a previous call; takes precedence over offset.
+            offset: Number of tasks to skip when no cursor is given.
+
+        Returns:
+            The tasks and the cursor of the next page (None on the last page).
+        """
+
+    @abstractmethod
+    def count(self, status: Optional[str] = None) -> int:
+        """Count tasks, optionally with a given status."""
+
+    @abstractmethod
+    def compact(self, retention: timedelta) -> int:
+        """Delete finished tasks completed before now - retention; return the number deleted."""
+
+    @abstractmethod
+    def fail_unfinished(self, error: str) -> int:
+        """Mark pending and running tasks as failed with `error`; return the number updated."""
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+class InMemoryTaskStore(TaskStore):
+    """Non-persistent task store."""
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, task: Dict[str, Any]) -> None:
+        with self._lock:
+            self._tasks[task["task_id"]] = dict(task)
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        with self._lock:
+            if task_id in self._tasks:
+                self._tasks[task_id].update(fields)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def list(
+        self, status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None, offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            tasks = sorted(
+                (t for t in self._tasks.values() if status is None or t["status"] == status),
+                key=lambda t: (t["created_at"], t["task_id"]),
+            )
+        if cursor:
+            after = decode_cursor(cursor)
+            tasks = [t for t in tasks if (t["created_at"], t["task_id"]) > after]
+        else:
+            tasks = tasks[offset:]
+        page = [dict(t) for t in tasks[: limit + 1]]
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return page[:limit], next_cursor
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            return sum(1 for t in self._tasks.values() if status is None or t["status"] == status)
+
+    def compact(self, retention: timedelta) -> int:
+        cutoff = (datetime.now() - retention).isoformat()
+        with self._lock:
+            expired = [
+                task_id
+                for task_id, t in self._tasks.items()
+                if t["status"] in FINISHED_STATUSES and (t.get("completed_at") or t["created_at"]) < cutoff
+            ]
+            for task_id in expired:
+                del self._tasks[task_id]
+        return len(expired)
+
+    def fail_unfinished(self, error: str) -> int:
+        completed_at = datetime.now().isoformat()
+        with self._lock:
+            unfinished = [t for t in self._tasks.values() if t["status"] not in FINISHED_STATUSES]
+            for task in unfinished:
+                task.update(status="failed", completed_at=completed_at, error=error)
+        return len(unfinished)
+
+
+class SQLiteTaskStore(TaskStore):
+    """SQLite task store (WAL mode) with batched background writes and periodic retention."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        retention: timedelta = timedelta(days=DEFAULT_RETENTION_DAYS),
+        flush_interval: float = FLUSH_INTERVAL,
+        compact_interval: float = COMPACT_INTERVAL,
+    ):
+        """Open (or create) the task database and start the writer thread.
+
+        Args:
+            path: Database file path.
+            retention: How long finished tasks are kept.
+            flush_interval: Seconds between batched writes.
+            compact_interval: Seconds between retention passes.
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}  # task_id -> fields waiting to be written
+        self._created: Set[str] = set()  # pending task_ids that have no row yet
+        self._inflight: Dict[str, Dict[str, Any]] = {}  # fields being written by the current flush
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._init_schema()
+        self._writer = threading.Thread(target=self._run_writer, name="task-store-writer", daemon=True)
+        self._writer.start()
+
+    def _init_schema(self) -> None:
+        with self._db_lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "task_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL, "
+                "started_at TEXT, completed_at TEXT, result TEXT, error TEXT, total_tokens INTEGER, "
+                "model_name TEXT, wait_time REAL, request TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_created ON tasks (created_at, task_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status_created ON tasks (status, created_at, task_id)")
+
+    def _run_writer(self) -> None:
+        """Flush pending writes periodically and apply the retention policy."""
+        since_compact = 0.0
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                since_compact += self.flush_interval
+                if since_compact >= self.compact_interval:
+                    since_compact = 0.0
+                    deleted = self.compact(self.retention)
+                    if deleted:
+                        logger.debug(f"Task store compaction removed {deleted} finished tasks")
+            except Exception as e:
+                logger.error(f"Task store writer failed: {e}")
+
+    def flush(self) -> None:
+        """Write all pending changes in one transaction.
+
+        New tasks are inserted and other changes update the existing rows. If the transaction
+        fails, the changes are queued again, under any change made since, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                created, self._created = self._created, set()
+                self._inflight = pending
+            try:
+                with self._db_lock, self._conn:
+                    for task_id, fields in pending.items():
+                        task_id, row = self._to_row(task_id, fields)
+                        if task_id in created:
+                            columns = ["task_id", *row]
+                            self._conn.execute(
+                                f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                [task_id, *row.values()],
+                            )
+                        elif row:
+                            self._conn.execute(
+                                f"UPDATE tasks SET {', '.join(f'{c} = ?' for c in row)} WHERE task_id = ?",
+                                [*row.values(), task_id],
+                            )
+            except Exception:
+                with self._pending_lock:
+                    for task_id, fields in pending.items():
+                        self._pending[task_id] = {**fields, **self._pending.get(task_id, {})}
+                    self._created |= created
+                raise
+            finally:
+                with self._pending_lock:
+                    self._inflight = {}
+
+    @staticmethod
+    def _to_row(task_id: str, fields: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        row = {key: value for key, value in fields.items() if key in TASK_COLUMNS and key != "task_id"}
+        if "request" in row and row["request"] is not None:
+            row["request"] = json.dumps(row["request"])
+        return task_id, row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        task = dict(row)
+        if task.get("request"):
+            task["request"] = json.loads(task["request"])
+        return task
+
+    def create(self, task: Dict[str, Any]) -> None:
+        with self._pending_lock:
+            self._pending[task["task_id"]] = dict(task)
+            self._created.add(task["task_id"])
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        with self._pending_lock:
+            self._pending.setdefault(task_id, {}).update(fields)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._pending_lock:
+            # Changes being flushed may not be committed yet; later changes override them
+            pending = {**self._inflight.get(task_id, {}), **self._pending.get(task_id, {})}
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return {"task_id": task_id, **pending} if "created_at" in pending else None
+        return {**self._from_row(row), **pending}
+
+    def delete(self, task_id: str) -> None:
+        # Wait for a running flush so it cannot write the task back after the delete
+        with self._flush_lock:
+            with self._pending_lock:
+                self._pending.pop(task_id, None)
+                self._created.discard(task_id)
+            with self._db_lock, self._conn:
+                self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def list(
+        self, status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None, offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # Pending status changes must be visible to the status filter
+        self.flush()
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if cursor:
+            conditions.append("(created_at, task_id) > (?, ?)")
+            params.extend(decode_cursor(cursor))
+        query = "SELECT * FROM tasks"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at, task_id LIMIT ?"
+        params.append(limit + 1)
+        if not cursor and offset:
+            query += " OFFSET ?"
+            params.append(offset)
+        with self._db_lock:
+            rows = self._conn.execute(query, params).fetchall()
+        tasks = [self._from_row(row) for row in rows]
+        next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+        return tasks[:limit], next_cursor
+
+    def count(self, status: Optional[str] = None) -> int:
+        self.flush()
+        with self._db_lock:
+            if status is None:
+                return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+
+    def compact(self, retention: timedelta) -> int:
+        cutoff = (datetime.now() - retention).isoformat()
+        placeholders = ", ".join("?" * len(FINISHED_STATUSES))
+        with self._db_lock:
+            with self._conn:
+                deleted = self._conn.execute(
+                    f"DELETE FROM tasks WHERE status IN ({placeholders}) AND COALESCE(completed_at, created_at) < ?",
+                    (*FINISHED_STATUSES, cutoff),
+                ).rowcount
+            if deleted:
+                # Shrink the write-ahead log once the deleted rows are committed
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def fail_unfinished(self, error: str) -> int:
+        self.flush()
+        placeholders = ", ".join("?" * len(FINISHED_STATUSES))
+        with self._db_lock, self._conn:
+            return self._conn.execute(
+                f"UPDATE tasks SET status = 'failed', completed_at = ?, error = ? WHERE status NOT IN ({placeholders})",
+                (datetime.now().isoformat(), error, *FINISHED_STATUSES),
+            ).rowcount
+
+    def close(self) -> None:
+        self._stop.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
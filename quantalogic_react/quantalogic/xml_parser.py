@@ -6,7 +6,10 @@ with support for handling malformed XML and CDATA sections.
 
 import html
 import re
+from bisect import bisect_left
 from collections import defaultdict
+from collections.abc import Iterable
+from typing import NamedTuple
 
 try:
     from typing import Self  # Python 3.11+
@@ -290,6 +293,290 @@ class ToleranceXMLParser:
             raise ValueError(error_msg)
 
 
+# Single scan over a text: CDATA sections (group 1) or opening/closing tags (groups 2-3).
+# Tags inside CDATA sections are consumed by the first alternative and never seen as tags.
+_TOKEN_PATTERN = re.compile(r"<!\[CDATA\[(.*?)(?:]]>|\Z)|<\s*(/?)\s*([^\s/<>!?][^/<>]*?)\s*>", re.DOTALL)
+
+
+class XMLTag(NamedTuple):
+    """An opening or closing tag found by `XMLTokenizer`."""
+
+    name: str
+    closing: bool
+    start: int
+    end: int
+
+
+class ToolCall(NamedTuple):
+    """A tool call found in an LLM response.
+
+    Attributes:
+        name: Name of the tool.
+        content: Raw text between the opening and closing tool tags.
+        start: Position of the opening tag in the response.
+        end: Position right after the closing tag in the response.
+    """
+
+    name: str
+    content: str
+    start: int
+    end: int
+
+
+class XMLTokenizer:
+    """Tolerant single-pass XML tokenizer.
+
+    The text is scanned once; elements are then resolved from the tag list without
+    copying substrings. Matching follows `ToleranceXMLParser`: an opening tag is closed by
+    the next `</name>` or `<name>` tag, unclosed tags are ignored, and CDATA sections are
+    opaque.
+    """
+
+    def __init__(self, text: str) -> None:
+        """Tokenize the text.
+
+        Args:
+            text: Input text containing XML-like elements.
+        """
+        self.text = text
+        self.tags: list[XMLTag] = []
+        self.cdata: list[tuple[int, int, int, int]] = []  # (start, end, inner_start, inner_end)
+        for match in _TOKEN_PATTERN.finditer(text):
+            if match.group(3) is None:
+                self.cdata.append((match.start(), match.end(), match.start(1), match.end(1)))
+            else:
+                self.tags.append(XMLTag(match.group(3), bool(match.group(2)), match.start(), match.end()))
+        self._cdata_starts = [section[0] for section in self.cdata]
+
+        # Index of the tag closing each opening tag (-1 when unclosed), resolved in one reverse pass
+        self.closers: list[int] = [-1] * len(self.tags)
+        next_by_name: dict[str, int] = {}
+        for index in range(len(self.tags) - 1, -1, -1):
+            tag = self.tags[index]
+            if not tag.closing:
+                self.closers[index] = next_by_name.get(tag.name, -1)
+            next_by_name[tag.name] = index
+
+    def children(self, lo: int = 0, hi: int | None = None) -> Iterable[tuple[int, int]]:
+        """Yield (opening, closing) tag indexes of the top-level elements between two tag indexes.
+
+        Args:
+            lo: First tag index to consider.
+            hi: Tag index to stop at (exclusive). Defaults to the end of the text.
+        """
+        hi = len(self.tags) if hi is None else hi
+        index = lo
+        while index < hi:
+            closer = self.closers[index]
+            if not self.tags[index].closing and index < closer < hi:
+                yield index, closer
+                index = closer + 1
+            else:
+                index += 1
+
+    def raw_content(self, opening: int, closing: int) -> str:
+        """Return the raw text between an opening tag and its closing tag."""
+        return self.text[self.tags[opening].end : self.tags[closing].start]
+
+    def content(self, opening: int, closing: int) -> str:
+        """Return the element content with CDATA sections unwrapped and entities unescaped.
+
+        Text inside CDATA sections is kept verbatim.
+        """
+        start, end = self.tags[opening].end, self.tags[closing].start
+        pieces = []
+        position = start
+        for section_index in range(bisect_left(self._cdata_starts, start), len(self.cdata)):
+            section_start, section_end, inner_start, inner_end = self.cdata[section_index]
+            if section_end > end:
+                break
+            pieces.append(html.unescape(self.text[position:section_start]))
+            pieces.append(self.text[inner_start:inner_end])
+            position = section_end
+        pieces.append(html.unescape(self.text[position:end]))
+        return "".join(pieces)
+
+
+class ToolCallParser:
+    """Extract tool calls from LLM responses in a single scan.
+
+    The parser is built once per set of tool names and dispatches tags through a
+    precomputed name set. Tool calls are taken from the last `<action>` block, or from the
+    whole response when there is none. Elements that are not tools are searched for nested
+    tool calls; the content of a tool call is never searched.
+    """
+
+    ACTION_TAG = "action"
+
+    def __init__(self, tool_names: Iterable[str]) -> None:
+        """Initialize the parser.
+
+        Args:
+            tool_names: Names of the registered tools.
+        """
+        self.tool_names = frozenset(tool_names)
+
+    def parse(self, text: str) -> list[ToolCall]:
+        """Return every tool call of the response, in document order.
+
+        Args:
+            text: The LLM response.
+
+        Returns:
+            List of ToolCall, empty if no tool call is found.
+        """
+        if not text or not isinstance(text, str):
+            return []
+
+        tokenizer = XMLTokenizer(text)
+        actions = self._collect(tokenizer, 0, len(tokenizer.tags), frozenset((self.ACTION_TAG,)))
+        if actions:
+            opening, closing = actions[-1]
+            elements = self._collect(tokenizer, opening + 1, closing, self.tool_names)
+        else:
+            elements = self._collect(tokenizer, 0, len(tokenizer.tags), self.tool_names)
+
+        tags = tokenizer.tags
+        return [
+            ToolCall(tags[opening].name, tokenizer.raw_content(opening, closing), tags[opening].start, tags[closing].end)
+            for opening, closing in elements
+        ]
+
+    @staticmethod
+    def _collect(tokenizer: XMLTokenizer, lo: int, hi: int, names: frozenset[str]) -> list[tuple[int, int]]:
+        """Collect elements whose name is in `names`, descending only into other elements."""
+        found: list[tuple[int, int]] = []
+        stack = [(lo, hi)]
+        while stack:
+            range_lo, range_hi = stack.pop()
+            nested = []
+            for opening, closing in tokenizer.children(range_lo, range_hi):
+                if tokenizer.tags[opening].name in names:
+                    found.append((opening, closing))
+                else:
+                    nested.append((opening + 1, closing))
+            stack.extend(reversed(nested))
+        found.sort()
+        return found
+
+
+class StreamingToolCallDetector:
+    """Incrementally detect the end of a tool call while an LLM response is streamed.
+
+    Chunks are fed as they arrive; only the newly received text is scanned. Detection
+    completes when the `<action>` block is closed, or, for responses without an action
+    block, when a tool element is closed. Tags inside CDATA sections are ignored.
+    """
+
+    _STREAM_TOKEN_PATTERN = re.compile(r"<!\[CDATA\[|]]>|<\s*(/?)\s*([A-Za-z_][\w.\-:]*)\s*>")
+
+    def __init__(self, tool_names: Iterable[str]) -> None:
+        """Initialize the detector.
+
+        Args:
+            tool_names: Names of the registered tools.
+        """
+        self.tool_names = frozenset(tool_names)
+        # Longest token that may be split across chunks and must be rescanned
+        self._overlap = max((len(name) for name in self.tool_names | {ToolCallParser.ACTION_TAG}), default=0) + 16
+        self._chunks: list[str] = []
+        self._text = ""
+        self._scan_from = 0
+        self._in_cdata = False
+        self._action_open = False
+        self._open_tools: set[str] = set()
+        self.end_pos: int | None = None
+
+    @property
+    def complete(self) -> bool:
+        """Whether a complete tool call has been received."""
+        return self.end_pos is not None
+
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        if self._chunks:
+            self._text += "".join(self._chunks)
+            self._chunks.clear()
+        return self._text
+
+    def feed(self, chunk: str) -> bool:
+        """Add a chunk of the response and scan it.
+
+        Args:
+            chunk: The next piece of streamed text.
+
+        Returns:
+            True once a complete tool call has been received.
+        """
+        self._chunks.append(chunk)
+        if self.complete:
+            return True
+        if "<" not in chunk and ">" not in chunk:
+            return False
+
+        text = self.text
+        last_end = self._scan_from
+        for match in self._STREAM_TOKEN_PATTERN.finditer(text, self._scan_from):
+            last_end = match.end()
+            token = match.group(0)
+            if self._in_cdata:
+                self._in_cdata = token != "]]>"
+                continue
+            if token.startswith("<![CDATA["):
+                self._in_cdata = True
+                continue
+            name = match.group(2)
+            if name is None:
+                continue
+            closing = bool(match.group(1))
+            if name == ToolCallParser.ACTION_TAG:
+                if not closing:
+                    self._action_open = True
+                elif self._action_open:
+                    self.end_pos = match.end()
+                    return True
+            elif name in self.tool_names and not self._action_open:
+                if not closing:
+                    self._open_tools.add(name)
+                elif name in self._open_tools:
+                    self.end_pos = match.end()
+                    return True
+        self._scan_from = max(last_end, len(text) - self._overlap)
+        return False
+
+
+def parse_xml_arguments(text: str) -> dict[str, str]:
+    """Parse tool arguments from the content of a tool call.
+
+    Top-level elements are the arguments. Elements nested deeper only provide values
+    for names not already defined at a higher level, which tolerates extra wrappers
+    such as `<arguments>`. CDATA sections are unwrapped in place.
+
+    Args:
+        text: Raw content of a tool call.
+
+    Returns:
+        Dictionary mapping element names to their values.
+    """
+    tokenizer = XMLTokenizer(text)
+    result: dict[str, str] = {}
+    level = [(0, len(tokenizer.tags))]
+    while level:
+        next_level = []
+        defined = []
+        for range_lo, range_hi in level:
+            for opening, closing in tokenizer.children(range_lo, range_hi):
+                name = ToleranceXMLParser.DEFAULT_NAME_MAP.get(tokenizer.tags[opening].name, tokenizer.tags[opening].name)
+                if name not in result:
+                    defined.append((name, tokenizer.content(opening, closing)))
+                next_level.append((opening + 1, closing))
+        for name, value in defined:
+            result[name] = value
+        level = next_level
+    return result
+
+
 if __name__ == "__main__":
     xml_content = """
 <action>
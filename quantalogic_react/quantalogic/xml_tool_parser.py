@@ -13,7 +13,7 @@ from loguru import logger
 from pydantic import BaseModel, Field
 
 from quantalogic_react.quantalogic.tools.tool import Tool
-from quantalogic_react.quantalogic.xml_parser import ToleranceXMLParser
+from quantalogic_react.quantalogic.xml_parser import parse_xml_arguments
 
 
 class ToolArguments(BaseModel):
@@ -40,7 +40,6 @@ class ToolParser:
 
     Attributes:
         tool: The tool instance containing argument specifications.
-        xml_parser: Parser for handling XML-like input.
     """
 
     def __init__(self: Self, tool: Tool) -> None:
@@ -50,7 +49,6 @@ class ToolParser:
             tool: Tool instance containing argument specifications.
         """
         self.tool = tool
-        self.xml_parser = ToleranceXMLParser()
 
     def parse(self: Self, xml_string: str) -> dict[str, str]:
         """Parse XML string and return validated tool arguments.
@@ -75,8 +73,8 @@ class ToolParser:
                 logger.error(f"Error extracting XML elements: {error_msg}")
                 raise ValueError(f"Error extracting XML elements: {error_msg}")
 
-            # Parse XML and extract arguments, preserving CDATA content
-            elements = self.xml_parser.extract_elements(xml_string, preserve_cdata=True)
+            # Parse XML and extract arguments in a single scan, unwrapping CDATA content
+            elements = parse_xml_arguments(xml_string)
             logger.debug(f"Extracted elements from XML: {elements}")
 
             arguments = self.tool.get_non_injectable_arguments()
@@ -0,0 +1,115 @@
+"""Unit tests for the server agent pool and task scheduler."""
+
+import asyncio
+
+import pytest
+
+from quantalogic_react.quantalogic.server.agent_pool import AgentPool, QueueFullError, TaskScheduler
+
+
+class FakeAgent:
+    """Agent stand-in counting memory resets."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.clears = 0
+
+    def clear_memory(self):
+        self.clears += 1
+
+
+class TestAgentPool:
+    """Test checking agents out of the pool."""
+
+    @pytest.mark.asyncio
+    async def test_per_model_cap(self):
+        """At most `size_per_model` agents exist per model; extra checkouts wait for a release."""
+        pool = AgentPool(FakeAgent, size_per_model=2)
+        release = asyncio.Event()
+        used = []
+
+        async def use(model_name):
+            async with pool.checkout(model_name) as agent:
+                used.append(agent)
+                await release.wait()
+
+        tasks = [asyncio.create_task(use("m")) for _ in range(3)] + [asyncio.create_task(use("other"))]
+        await asyncio.sleep(0.1)
+
+        assert len(used) == 3
+        assert pool.agents_created == 3 and pool.agents_in_use == 3
+        assert sorted(agent.model_name for agent in used) == ["m", "m", "other"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert len(used) == 4 and pool.agents_created == 3 and pool.agents_in_use == 0
+        assert used[3] in used[:2]
+
+    @pytest.mark.asyncio
+    async def test_released_agent_is_reused_after_a_reset(self):
+        """A released agent is handed out again with its memory cleared."""
+        pool = AgentPool(FakeAgent, size_per_model=2)
+
+        async with pool.checkout("m") as first:
+            assert first.clears == 0
+        async with pool.checkout("m") as second:
+            assert second is first
+            assert second.clears == 1
+
+        assert pool.agents_created == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_creation_releases_the_reserved_slot(self):
+        """An agent factory failure does not consume a slot of the model."""
+        attempts = []
+
+        def factory(model_name):
+            attempts.append(model_name)
+            if len(attempts) == 1:
+                raise RuntimeError("model unavailable")
+            return FakeAgent(model_name)
+
+        pool = AgentPool(factory, size_per_model=1)
+
+        with pytest.raises(RuntimeError):
+            async with pool.checkout("m"):
+                pass
+        assert pool.agents_created == 0
+
+        async def checkout():
+            async with pool.checkout("m") as agent:
+                return agent
+
+        assert (await asyncio.wait_for(checkout(), 1)).model_name == "m"
+        assert pool.agents_created == 1 and pool.agents_in_use == 0
+
+
+class TestTaskScheduler:
+    """Test the bounded task queue."""
+
+    @pytest.mark.asyncio
+    async def test_queue_full_rejection_and_metrics(self):
+        """Submissions beyond the queue size are rejected; queued tasks run once a worker is free."""
+        release = asyncio.Event()
+        ran = []
+
+        async def run_task(task_id, agent):
+            await release.wait()
+            ran.append(task_id)
+
+        scheduler = TaskScheduler(AgentPool(FakeAgent, size_per_model=1), run_task, workers=1, max_queue_size=1)
+        scheduler.submit("t1", "m")
+        await asyncio.sleep(0.05)
+        assert scheduler.submit("t2", "m") == 1
+
+        with pytest.raises(QueueFullError):
+            scheduler.submit("t3", "m")
+        metrics = scheduler.metrics()
+        assert (metrics.queue_depth, metrics.running_tasks, metrics.agents_in_use) == (1, 1, 1)
+        assert metrics.utilization == 1.0
+
+        release.set()
+        await asyncio.wait_for(scheduler._queue.join(), 1)
+        assert ran == ["t1", "t2"]
+        await scheduler.shutdown()
@@ -0,0 +1,42 @@
+"""Unit tests for the async listener backpressure of the event emitter."""
+
+import asyncio
+import threading
+import time
+
+from quantalogic_react.quantalogic.event_emitter import EventEmitter
+
+
+class TestAsyncListenerBackpressure:
+    """Test bounding the in-flight async listener calls."""
+
+    def test_full_queue_drops_without_blocking(self):
+        """Once the queue is full, emit() returns at once and the extra calls are dropped and counted."""
+        release = threading.Event()
+        received = []
+
+        async def listener(event, value):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            received.append(value)
+
+        emitter = EventEmitter(max_pending_async=2)
+        emitter.on("tick", listener)
+
+        start = time.monotonic()
+        for value in range(5):
+            emitter.emit("tick", value)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1
+        assert emitter.dropped_async_calls == 3
+
+        release.set()
+        emitter.close()
+        assert sorted(received) == [0, 1]
+
+        # Slots are released once the listeners complete
+        emitter.emit("tick", 5)
+        emitter.close()
+        assert sorted(received) == [0, 1, 5]
+        assert emitter.dropped_async_calls == 3
@@ -0,0 +1,122 @@
+"""Unit tests for the server event hub."""
+
+import asyncio
+import json
+
+import pytest
+
+from quantalogic_react.quantalogic.server.event_hub import Event, EventHub, Subscriber
+
+
+def _drain(subscriber):
+    events = []
+    while subscriber.buffer:
+        events.append(subscriber.buffer.popleft())
+    return events
+
+
+def _payload(frame):
+    return json.loads(frame.split("data: ", 1)[1])
+
+
+class TestEventHubRouting:
+    """Test delivering events to the subscribers of their channel."""
+
+    @pytest.mark.asyncio
+    async def test_per_task_routing(self):
+        """Task events reach the task's subscribers and the global ones, never other tasks."""
+        hub = EventHub()
+        task_a, task_b, everything = hub.subscribe("a"), hub.subscribe("b"), hub.subscribe()
+
+        hub.publish("task_started", {"n": 1}, task_id="a")
+        hub.publish("server_notice", {"n": 2})
+
+        assert [event.data["n"] for event in _drain(task_a)] == [1]
+        assert _drain(task_b) == []
+        assert [event.data["n"] for event in _drain(everything)] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_per_client_routing(self):
+        """Events for one client are only delivered to that client and are not kept for replay."""
+        hub = EventHub()
+        first, second = hub.subscribe("a"), hub.subscribe("a")
+
+        hub.publish("user_validation_request", {"question": "?"}, task_id="a", client_id=second.client_id)
+
+        assert _drain(first) == []
+        assert [event.type for event in _drain(second)] == ["user_validation_request"]
+        assert _drain(hub.subscribe("a", last_event_id=0)) == []
+
+    @pytest.mark.asyncio
+    async def test_replay_after_last_event_id(self):
+        """A reconnecting client receives the retained events after its last event id."""
+        hub = EventHub()
+        ids = [hub.publish("step", {"n": n}, task_id="a") for n in range(3)]
+
+        replayed = hub.subscribe("a", last_event_id=ids[0])
+
+        assert [event.data["n"] for event in _drain(replayed)] == [1, 2]
+
+
+class TestSubscriberBuffer:
+    """Test buffering events for a subscriber."""
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks_are_coalesced(self):
+        """Consecutive token chunks of a task merge into one frame carrying the latest id."""
+        hub = EventHub()
+        subscriber = hub.subscribe("a")
+        for content in ("Hel", "lo", " world"):
+            last_id = hub.publish("stream_chunk", {"content": content}, task_id="a")
+        hub.publish("stream_chunk", {"content": "other task"}, task_id="b")
+        hub.publish("stream_end", {}, task_id="a")
+        hub.publish("stream_chunk", {"content": "!"}, task_id="a")
+
+        events = _drain(subscriber)
+
+        assert [(event.type, event.data.get("content")) for event in events] == [
+            ("stream_chunk", "Hello world"),
+            ("stream_end", None),
+            ("stream_chunk", "!"),
+        ]
+        assert events[0].id == last_id
+        assert _payload(events[0].frame)["data"]["content"] == "Hello world"
+
+    def test_slow_subscriber_drops_the_oldest_events(self):
+        """A full buffer drops its oldest event and counts the drops."""
+        subscriber = Subscriber("client_1", "a", max_buffer=2)
+        for event_id in range(1, 5):
+            subscriber.push(Event(event_id, "step", "a", {}, "now"))
+
+        assert [event.id for event in subscriber.buffer] == [3, 4]
+        assert subscriber.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_close_delivers_buffered_events(self):
+        """Closing the hub ends the stream after the events already buffered."""
+        hub = EventHub()
+        subscriber = hub.subscribe()
+        hub.publish("task_complete", {"n": 1}, task_id="a")
+        hub.publish("server_shutdown", {"message": "bye"})
+        hub.close()
+
+        frames = [frame async for frame in hub.stream(subscriber, heartbeat_interval=0.01)]
+
+        assert [_payload(frame)["event"] for frame in frames] == ["task_complete", "server_shutdown"]
+        assert hub.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_sends_heartbeats(self):
+        """An idle stream yields keepalive comments until an event arrives."""
+        hub = EventHub()
+        subscriber = hub.subscribe("a")
+        stream = hub.stream(subscriber, heartbeat_interval=0.01)
+
+        assert await anext(stream) == ": keepalive\n\n"
+        asyncio.get_running_loop().call_later(0.02, hub.publish, "step", {"n": 1}, "a")
+        frame = await anext(stream)
+        while frame == ": keepalive\n\n":
+            frame = await anext(stream)
+        await stream.aclose()
+
+        assert _payload(frame)["data"] == {"n": 1}
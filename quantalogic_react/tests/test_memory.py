@@ -0,0 +1,128 @@
+"""Unit tests for the agent and variable memories."""
+
+from quantalogic_react.quantalogic.memory import AgentMemory, BlobStore, Message, SpilledValue, VariableMemory
+
+
+def _counting_tokenizer(calls):
+    def count(message):
+        calls.append(message.content)
+        return len(message.content.split())
+
+    return count
+
+
+class TestAgentMemoryTokens:
+    """Test the running token total of AgentMemory."""
+
+    def test_total_follows_add_remove_and_reset(self):
+        """The total matches the messages in memory, and each message is tokenized once."""
+        calls = []
+        memory = AgentMemory(token_counter=_counting_tokenizer(calls))
+        system = Message(role="system", content="you are helpful")
+        memory.add(system)
+        memory.add(Message(role="user", content="one two"))
+        memory.add(Message(role="assistant", content="three"))
+        assert memory.total_tokens == 6
+
+        # Removing messages goes through the memory setter, which reuses the cached counts
+        memory.memory = [system, *memory.memory[2:]]
+        assert memory.total_tokens == 4
+        assert len(calls) == 3
+
+        memory.reset()
+        assert memory.total_tokens == 0
+        memory.add(Message(role="user", content="again"))
+        assert memory.total_tokens == 1
+
+    def test_compact_and_new_token_counter(self):
+        """Compaction drops the removed messages from the total; a new tokenizer recounts everything."""
+        memory = AgentMemory(token_counter=_counting_tokenizer([]))
+        memory.add(Message(role="system", content="system"))
+        for i in range(6):
+            memory.add(Message(role="user", content=f"question {i}"))
+            memory.add(Message(role="assistant", content=f"answer number {i}"))
+
+        memory.compact(n=1)
+
+        assert memory.total_tokens == sum(len(m.content.split()) for m in memory.memory)
+        memory.set_token_counter(lambda message: 10)
+        assert memory.total_tokens == 10 * len(memory.memory)
+        memory.set_token_counter(None)
+        assert memory.total_tokens == 0
+
+
+class TestVariableMemoryInterpolation:
+    """Test interpolating variable references."""
+
+    def test_nested_references(self):
+        """References inside values are expanded; unknown names and lone dollars are kept."""
+        memory = VariableMemory()
+        memory["path"] = "/tmp/$name$.txt"
+        memory["name"] = "report"
+
+        assert memory.interpolate("cat $path$ costs $5 $unknown$") == "cat /tmp/report.txt costs $5 $unknown$"
+
+    def test_cyclic_references_stop(self):
+        """A cycle is left as a literal reference instead of recursing forever."""
+        memory = VariableMemory()
+        memory["a"] = "A($b$)"
+        memory["b"] = "B($a$)"
+        memory["self"] = "[$self$]"
+
+        assert memory.interpolate("$a$") == "A(B($a$))"
+        assert memory.interpolate("$self$ $self$") == "[$self$] [$self$]"
+
+    def test_expansion_is_bounded(self):
+        """Exponentially growing references stop at the depth and length budgets."""
+        memory = VariableMemory()
+        memory["v0"] = "x" * 10
+        for i in range(1, 30):
+            memory[f"v{i}"] = f"$v{i - 1}$" * 2
+
+        assert memory.interpolate("$v3$") == "x" * 80
+        assert len(memory.interpolate("$v29$", max_length=1000)) <= 1000 + len("$v29$")
+        assert "$v" in memory.interpolate("$v20$", max_depth=5)
+
+
+class TestBlobSpill:
+    """Test spilling large variable values to the blob store."""
+
+    def test_spill_and_reread(self, tmp_path):
+        """Large values are written once to disk, re-read on access and cached within the resident bound."""
+        memory = VariableMemory(spill_threshold=10, max_resident_size=25, blob_store=BlobStore(str(tmp_path)))
+        small = memory.add("short")
+        first = memory.add("a" * 20)
+        same = memory.add("a" * 20)
+        second = memory.add("b" * 20)
+
+        assert memory.memory[small][1] == "short"
+        assert isinstance(memory.memory[first][1], SpilledValue)
+        assert len(list(memory._blob_store.path.iterdir())) == 2
+        assert memory.resident_size == 0
+
+        assert memory[first] == "a" * 20 and memory[same] == "a" * 20
+        assert memory.resident_size == 20
+        assert memory[second] == "b" * 20
+        assert memory.resident_size == 20
+        assert dict(memory.items())[first] == "a" * 20
+
+    def test_reset_closes_only_an_owned_store(self, tmp_path):
+        """Resetting removes the blobs of the memory's own store but leaves a shared store open."""
+        owned = VariableMemory(spill_threshold=10)
+        owned.add("o" * 20)
+        owned_path = owned._blob_store.path
+        owned.reset()
+        assert not owned_path.exists()
+
+        shared_store = BlobStore(str(tmp_path))
+        first = VariableMemory(spill_threshold=10, blob_store=shared_store)
+        second = VariableMemory(spill_threshold=10, blob_store=shared_store)
+        first.add("f" * 20)
+        key = second.add("s" * 20)
+
+        first.reset()
+
+        assert len(first) == 0
+        assert second[key] == "s" * 20
+        shared_store.close()
+        assert not any(tmp_path.iterdir())
@@ -0,0 +1,99 @@
+"""Unit tests for the model limits cache."""
+
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from quantalogic_react.quantalogic import get_model_info
+from quantalogic_react.quantalogic.model_limits_cache import ModelLimitsCache, model_limits_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    """Start every test with an empty shared cache."""
+    model_limits_cache.invalidate()
+    model_limits_cache.reset_stats()
+    yield
+    model_limits_cache.invalidate()
+
+
+class TestModelLimitsCache:
+    """Test caching per-model lookups."""
+
+    def test_value_computed_once(self):
+        """A cached value is returned without calling compute again."""
+        cache = ModelLimitsCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 128_000
+
+        assert cache.get_or_compute("max_input_tokens", "gpt-4o", compute) == 128_000
+        assert cache.get_or_compute("max_input_tokens", "gpt-4o", compute) == 128_000
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+    def test_ttl_expiry_and_invalidate(self, monkeypatch):
+        """Expired and invalidated entries are computed again."""
+        now = [100.0]
+        limits_module = importlib.import_module("quantalogic_react.quantalogic.model_limits_cache")
+        monkeypatch.setattr(limits_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+        cache = ModelLimitsCache(ttl=10)
+        values = iter([1, 2, 3])
+
+        assert cache.get_or_compute("kind", "model", lambda: next(values)) == 1
+        now[0] += 11
+        assert cache.get_or_compute("kind", "model", lambda: next(values)) == 2
+        cache.invalidate("model")
+        assert cache.get_or_compute("kind", "model", lambda: next(values)) == 3
+
+    def test_exceptions_are_not_cached(self):
+        """A failed compute is retried on the next lookup; a None result is cached."""
+        cache = ModelLimitsCache()
+
+        def fail():
+            raise ConnectionError("unreachable")
+
+        with pytest.raises(ConnectionError):
+            cache.get_or_compute("kind", "model", fail)
+        assert cache.stats().size == 0
+        assert cache.get_or_compute("kind", "model", lambda: None) is None
+        assert cache.get_or_compute("kind", "model", lambda: 7) is None
+
+    def test_lm_studio_failure_is_retried(self, monkeypatch):
+        """An unreachable LM Studio is queried again on the next lookup; a successful answer is cached."""
+        fetches = []
+        responses = [ConnectionError("LM Studio is not running"), [SimpleNamespace(id="qwen", max_context_length=32768)]]
+
+        def get_model_list():
+            fetches.append(1)
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return SimpleNamespace(data=response)
+
+        monkeypatch.setattr(get_model_info, "get_model_list", get_model_list)
+
+        get_model_info.get_max_input_tokens("lm_studio/qwen")
+        assert len(fetches) == 1
+        assert get_model_info.get_max_input_tokens("lm_studio/qwen") == 32768
+        assert get_model_info.get_max_output_tokens("lm_studio/qwen") == 32768
+        assert len(fetches) == 2
+
+    def test_lm_studio_unlisted_model_is_cached(self, monkeypatch):
+        """A model LM Studio does not list is fetched once and then served from the cache."""
+        fetches = []
+
+        def get_model_list():
+            fetches.append(1)
+            return SimpleNamespace(data=[SimpleNamespace(id="other", max_context_length=4096)])
+
+        monkeypatch.setattr(get_model_info, "get_model_list", get_model_list)
+
+        first = get_model_info.get_max_input_tokens("lm_studio/qwen")
+        assert get_model_info.get_max_input_tokens("lm_studio/qwen") == first
+        get_model_info.get_max_output_tokens("lm_studio/qwen")
+        assert len(fetches) == 1
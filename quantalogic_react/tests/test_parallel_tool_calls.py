@@ -0,0 +1,117 @@
+"""Unit tests for running the tool calls of one response concurrently."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from quantalogic_react.quantalogic.agent import Agent
+from quantalogic_react.quantalogic.tools.tool import Tool, ToolArgument
+
+
+class SleepTool(Tool):
+    """Blocking tool recording how many calls overlap."""
+
+    name: str = "sleep"
+    description: str = "Sleep then echo the text"
+    arguments: list = [ToolArgument(name="text", arg_type="string", description="Text", required=True)]
+    calls: list = []
+
+    def execute(self, text: str) -> str:
+        self.calls.append(text)
+        time.sleep(0.2)
+        return f"slept {text}"
+
+
+class ValidatedTool(Tool):
+    """Tool requiring the user's permission."""
+
+    name: str = "guarded"
+    description: str = "Needs validation"
+    need_validation: bool = True
+    arguments: list = [ToolArgument(name="text", arg_type="string", description="Text", required=True)]
+
+    def execute(self, text: str) -> str:
+        return f"guarded {text}"
+
+
+def _action(*calls):
+    body = "".join(f"<{name}><text>{text}</text></{name}>" for name, text in calls)
+    return f"<action>{body}</action>"
+
+
+@pytest.fixture
+def agent():
+    agent = Agent(
+        model_name="gpt-4o-mini", tools=[SleepTool(calls=[]), ValidatedTool()], parallel_tool_calls=True
+    )
+    agent.task_to_solve = "Run the tools"
+    return agent
+
+
+class TestParallelToolCalls:
+    """Test executing a batch of tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_sync_tools_overlap_and_results_are_stored(self, agent):
+        """Synchronous tools run in threads at the same time; each result gets its own stored variable."""
+        start = time.monotonic()
+        result = await agent._async_observe_response(_action(("sleep", "a"), ("sleep", "b")))
+
+        assert time.monotonic() - start < 0.35
+        assert result.executed_tool == "sleep, sleep"
+        assert sorted(agent.variable_store.values()) == ["slept a", "slept b"]
+        for name in agent.variable_store.keys():
+            assert f'<{name} tool="sleep">' in result.next_prompt
+        assert "<results>" not in result.next_prompt
+        assert "Select exactly ONE tool" not in result.next_prompt
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_repeated_calls_are_reported_per_call(self, agent):
+        """An unknown tool and a repeated call get their own result while the other calls run."""
+        result = await agent._async_execute_tool_calls(
+            [("sleep", "<text>a</text>"), ("sleep", "<text>a</text>"), ("missing", "<text>b</text>")]
+        )
+
+        assert agent.tools.get("sleep").calls == ["a"]
+        assert "Error: Tool 'missing' not found" in result.next_prompt
+        assert "slept a" in result.next_prompt
+        assert len(agent.variable_store) == 3
+
+    @pytest.mark.asyncio
+    async def test_validation_prompts_are_serialized(self, agent, monkeypatch):
+        """Tools requiring validation ask the user one at a time."""
+        active, overlaps = [], []
+
+        async def ask_for_user_validation(validation_id, question):
+            active.append(validation_id)
+            overlaps.append(len(active))
+            await asyncio.sleep(0.05)
+            active.remove(validation_id)
+            return True
+
+        monkeypatch.setattr(agent, "ask_for_user_validation", ask_for_user_validation)
+        result = await agent._async_execute_tool_calls(
+            [("guarded", "<text>a</text>"), ("guarded", "<text>b</text>"), ("sleep", "<text>c</text>")]
+        )
+
+        assert overlaps == [1, 1]
+        assert "guarded a" in result.next_prompt and "guarded b" in result.next_prompt
+
+    @pytest.mark.asyncio
+    async def test_sync_tool_runs_off_the_event_loop_thread(self, agent):
+        """A synchronous tool does not block the event loop while it runs."""
+        loop_thread = threading.get_ident()
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(threading.get_ident())
+                await asyncio.sleep(0.02)
+
+        tick_task = asyncio.create_task(ticker())
+        await agent._async_execute_tool("sleep", agent.tools.get("sleep"), {"text": "x"})
+        await tick_task
+
+        assert len(ticks) == 5 and set(ticks) == {loop_thread}
@@ -0,0 +1,55 @@
+"""Unit tests for the response cache events of the generative model."""
+
+from types import SimpleNamespace
+
+import pytest
+from quantalogic_flow.flow.llm_cache import ResponseCache
+
+from quantalogic_react.quantalogic import generative_model
+from quantalogic_react.quantalogic.event_emitter import EventEmitter
+from quantalogic_react.quantalogic.generative_model import GenerativeModel
+
+
+def _recording_emitter(events):
+    emitter = EventEmitter()
+    emitter.on(
+        ["llm_cache_hit", "llm_cache_miss", "llm_cache_bypass"],
+        lambda event, payload: events.append((event, payload)),
+    )
+    return emitter
+
+
+class TestResponseCacheEvents:
+    """Test the cache events emitted by models sharing a response cache."""
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_events_stay_with_their_model(self, monkeypatch):
+        """Each model emits the events of its own lookups only, and registers nothing on the cache."""
+
+        async def fake_acompletion(**kwargs):
+            return SimpleNamespace(
+                error=None,
+                usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+                choices=[SimpleNamespace(message=SimpleNamespace(content="answer"), finish_reason="stop")],
+            )
+
+        monkeypatch.setattr(generative_model, "acompletion", fake_acompletion)
+        cache = ResponseCache()
+        first_events, second_events = [], []
+        first = GenerativeModel(
+            model="m", temperature=0, event_emitter=_recording_emitter(first_events), response_cache=cache
+        )
+        second = GenerativeModel(
+            model="m", temperature=0, event_emitter=_recording_emitter(second_events), response_cache=cache
+        )
+        sampled = GenerativeModel(model="m", temperature=0.5, event_emitter=first.event_emitter, response_cache=cache)
+
+        await first.async_generate("question")
+        await second.async_generate("question")
+        await sampled.async_generate("question")
+
+        assert cache._listeners == []
+        assert [event for event, _ in first_events] == ["llm_cache_miss", "llm_cache_bypass"]
+        assert [event for event, _ in second_events] == ["llm_cache_hit"]
+        assert second_events[0][1]["hits"] == 1 and second_events[0][1]["key"] is not None
+        assert second_events[0][1]["size"] is None
@@ -0,0 +1,120 @@
+"""Unit tests for detecting complete tool calls while a response is streamed."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from quantalogic_react.quantalogic import generative_model
+from quantalogic_react.quantalogic.agent import Agent
+from quantalogic_react.quantalogic.xml_parser import StreamingToolCallDetector
+
+RESPONSE = (
+    "<thinking>Compare <![CDATA[</action> and <read_file>]]> first</thinking>\n"
+    "<action>\n<read_file>\n<path>a.txt</path>\n</read_file>\n< /action >"
+)
+TRAILER = "\nThe model keeps talking after the action block."
+
+
+def _split(text, *positions):
+    bounds = [0, *positions, len(text)]
+    return [text[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+
+
+class FakeProviderStream:
+    """Provider stream yielding one chunk per piece and recording whether it was closed."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        """Return the stream itself."""
+        return self
+
+    async def __anext__(self):
+        """Return the next chunk."""
+        if self.sent == len(self.pieces):
+            raise StopAsyncIteration
+        self.sent += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.pieces[self.sent - 1]))])
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestStreamingToolCallDetector:
+    """Test incremental detection of the end of a tool call."""
+
+    def test_every_chunk_boundary(self):
+        """The action block is detected wherever the response is split, and not before it closes."""
+        end = len(RESPONSE)
+        for first in range(1, end):
+            for second in (first + 1, first + 7, end - 1):
+                if not first < second < end:
+                    continue
+                detector = StreamingToolCallDetector(["read_file"])
+                results = [detector.feed(chunk) for chunk in _split(RESPONSE + TRAILER, first, second, end)]
+
+                assert results[-2:] == [True, True], (first, second)
+                assert detector.end_pos == end
+                assert not any(results[:-2]), (first, second)
+
+    def test_single_characters(self):
+        """Feeding one character at a time completes exactly on the closing bracket."""
+        detector = StreamingToolCallDetector(["read_file"])
+        results = [detector.feed(char) for char in RESPONSE]
+
+        assert results.index(True) == len(RESPONSE) - 1
+        assert detector.complete and detector.text == RESPONSE
+
+    def test_tool_without_action_block(self):
+        """Without an action block, detection completes when an opened tool element closes."""
+        detector = StreamingToolCallDetector(["read_file"])
+
+        assert not detector.feed("</read_file><read_")
+        assert not detector.feed("file><path>a</path></read")
+        assert detector.feed("_file> trailing")
+        assert detector.text[: detector.end_pos].endswith("</read_file>")
+
+
+class TestConsumeStream:
+    """Test closing the stream once the tool call is complete."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "positions", [(5, 40, len(RESPONSE) + 5), (len(RESPONSE) - 3, len(RESPONSE) + 2), (len(RESPONSE),)]
+    )
+    async def test_stream_is_closed_after_the_action_block(self, monkeypatch, positions):
+        """The generator and the provider stream are closed, and the text ends with the action block."""
+        provider = FakeProviderStream(_split(RESPONSE + TRAILER, *positions))
+
+        async def fake_acompletion(**kwargs):
+            return provider
+
+        monkeypatch.setattr(generative_model, "acompletion", fake_acompletion)
+        agent = Agent(model_name="gpt-4o-mini")
+        agent.tools.tools["read_file"] = SimpleNamespace(name="read_file")
+        events = []
+        agent.model.event_emitter.on("stream_end", lambda event, data=None: events.append(event))
+
+        text = await agent._async_consume_stream("Read a.txt")
+
+        assert text == RESPONSE
+        assert provider.closed
+        assert provider.sent < len(provider.pieces)
+        assert events == ["stream_end"]
+
+    @pytest.mark.asyncio
+    async def test_stream_runs_to_the_end_without_cancellation(self, monkeypatch):
+        """With cancellation disabled, the whole response is consumed."""
+        provider = FakeProviderStream(_split(RESPONSE + TRAILER, 10, 60))
+
+        async def fake_acompletion(**kwargs):
+            return provider
+
+        monkeypatch.setattr(generative_model, "acompletion", fake_acompletion)
+        agent = Agent(model_name="gpt-4o-mini", cancel_stream_after_action=False)
+
+        assert await agent._async_consume_stream("Read a.txt") == RESPONSE + TRAILER
+        assert not provider.closed
@@ -0,0 +1,120 @@
+"""Unit tests for the SQLite task store."""
+
+import sqlite3
+
+import pytest
+
+from quantalogic_react.quantalogic.server.task_store import SQLiteTaskStore
+
+
+def _task(task_id, status="pending", created_at="2026-01-01T00:00:00"):
+    return {
+        "task_id": task_id,
+        "status": status,
+        "created_at": created_at,
+        "request": {"task": f"solve {task_id}", "max_iterations": 3},
+        "model_name": "m",
+    }
+
+
+class FailingConnection:
+    """SQLite connection proxy failing the next `failures` writes."""
+
+    def __init__(self, conn, failures=1):
+        self.conn = conn
+        self.failures = failures
+
+    def execute(self, sql, *args):
+        if self.failures and sql.startswith(("INSERT", "UPDATE")):
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        """Delegate to the real connection."""
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        """Begin a transaction on the real connection."""
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        """Commit or roll back the transaction."""
+        return self.conn.__exit__(*exc_info)
+
+
+@pytest.fixture
+def store(tmp_path):
+    # The writer thread never wakes up during a test; flushes are explicit
+    store = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=3600)
+    yield store
+    store.close()
+
+
+class TestSQLiteTaskStore:
+    """Test buffered writes of the SQLite task store."""
+
+    def test_read_your_writes(self, store):
+        """Created and updated tasks are visible before and after the buffered writes are flushed."""
+        store.create(_task("t1"))
+        assert store.get("t1")["request"] == {"task": "solve t1", "max_iterations": 3}
+
+        store.update("t1", status="running", started_at="2026-01-01T00:00:01")
+        assert store.get("t1")["status"] == "running"
+
+        store.flush()
+        store.update("t1", status="completed", result="42")
+        task = store.get("t1")
+        assert (task["status"], task["started_at"], task["result"]) == ("completed", "2026-01-01T00:00:01", "42")
+        assert store.get("missing") is None
+
+        store.update("missing", status="running")
+        assert store.get("missing") is None
+
+    def test_failed_flush_is_retried(self, store):
+        """Changes of a failed flush are queued again under the changes made since."""
+        store.create(_task("t1"))
+        real_conn = store._conn
+        store._conn = FailingConnection(real_conn)
+
+        with pytest.raises(sqlite3.OperationalError):
+            store.flush()
+        store.update("t1", status="running")
+        assert store.get("t1")["status"] == "running"
+
+        store.flush()
+        store._conn = real_conn
+
+        row = real_conn.execute("SELECT status, model_name FROM tasks WHERE task_id = 't1'").fetchone()
+        assert tuple(row) == ("running", "m")
+        assert store._pending == {} and store._created == set()
+
+    def test_fail_unfinished(self, store):
+        """Pending and running tasks, including buffered ones, are marked as failed."""
+        store.create(_task("pending"))
+        store.create(_task("running", status="running"))
+        store.create(_task("done", status="completed"))
+        store.flush()
+        store.create(_task("buffered"))
+
+        assert store.fail_unfinished("Server restarted") == 3
+
+        assert store.count(status="failed") == 3
+        assert store.get("done")["status"] == "completed"
+        assert store.get("buffered")["error"] == "Server restarted"
+
+    def test_close_drains_the_buffer(self, tmp_path):
+        """Closing the store writes the buffered changes, which survive a reopen."""
+        path = tmp_path / "tasks.db"
+        store = SQLiteTaskStore(path, flush_interval=3600)
+        store.create(_task("t1"))
+        store.update("t1", status="completed", total_tokens=12)
+        store.close()
+
+        reopened = SQLiteTaskStore(path, flush_interval=3600)
+        try:
+            task = reopened.get("t1")
+            assert (task["status"], task["total_tokens"]) == ("completed", 12)
+            assert reopened.list() == ([task], None)
+        finally:
+            reopened.close()
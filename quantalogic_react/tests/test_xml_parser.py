@@ -0,0 +1,98 @@
+"""Unit tests for the single-pass XML tool-call parser."""
+
+from quantalogic_react.quantalogic.xml_parser import ToolCallParser, XMLTokenizer, parse_xml_arguments
+
+
+class TestXMLTokenizer:
+    """Test tokenizing XML-like text."""
+
+    def test_tags_inside_cdata_are_not_tokens(self):
+        """Tags inside a CDATA section are not tokenized; each opening tag knows its closing tag."""
+        tokenizer = XMLTokenizer("<a><![CDATA[<b>not a tag</b>]]></a><c>x")
+
+        assert [(tag.name, tag.closing) for tag in tokenizer.tags] == [("a", False), ("a", True), ("c", False)]
+        assert tokenizer.closers == [1, -1, -1]
+        assert list(tokenizer.children()) == [(0, 1)]
+        assert tokenizer.content(0, 1) == "<b>not a tag</b>"
+
+
+class TestParseXMLArguments:
+    """Test parsing tool arguments."""
+
+    def test_nested_tags_do_not_override_top_level_arguments(self):
+        """A tag nested in an argument value does not replace the top-level argument of the same name."""
+        arguments = parse_xml_arguments(
+            "<content><file_path>nested.txt</file_path> body</content><file_path>real.txt</file_path>"
+        )
+
+        assert arguments["file_path"] == "real.txt"
+        assert arguments["content"] == "<file_path>nested.txt</file_path> body"
+
+    def test_wrapped_arguments(self):
+        """Arguments wrapped in an extra element are found one level down."""
+        arguments = parse_xml_arguments("<arguments><path>a.py</path><limit>10</limit></arguments>")
+
+        assert arguments["path"] == "a.py"
+        assert arguments["limit"] == "10"
+
+    def test_cdata_is_kept_verbatim(self):
+        """CDATA content is unwrapped without unescaping; text outside CDATA is unescaped."""
+        arguments = parse_xml_arguments(
+            "<code><![CDATA[if a < b and c &amp;&amp; d: print('<tag>')]]></code><query>x &lt; 3</query>"
+        )
+
+        assert arguments["code"] == "if a < b and c &amp;&amp; d: print('<tag>')"
+        assert arguments["query"] == "x < 3"
+
+    def test_unclosed_and_malformed_tags(self):
+        """Unclosed tags are not arguments, and a stray tag stays in the value that contains it."""
+        assert parse_xml_arguments("<path>a.py</path><content>never closed") == {"path": "a.py"}
+        assert parse_xml_arguments("<content>1 <b>2</content>") == {"content": "1 <b>2"}
+        assert parse_xml_arguments("no tags </at> all <") == {}
+
+
+class TestToolCallParser:
+    """Test extracting tool calls from responses."""
+
+    def test_multiple_tool_calls_in_order(self):
+        """Every tool call of the action block is returned in document order, repeated tools included."""
+        parser = ToolCallParser(["read_file", "search"])
+        response = (
+            "<thinking>I will use <search>old</search> later</thinking>"
+            "<action><read_file><path>a</path></read_file>"
+            "<search><query>q</query></search>"
+            "<read_file><path>b</path></read_file></action>"
+        )
+
+        calls = parser.parse(response)
+
+        assert [(call.name, call.content) for call in calls] == [
+            ("read_file", "<path>a</path>"),
+            ("search", "<query>q</query>"),
+            ("read_file", "<path>b</path>"),
+        ]
+        assert response[calls[0].start : calls[0].end] == "<read_file><path>a</path></read_file>"
+
+    def test_last_action_block_and_nesting(self):
+        """Only the last action block counts; tool calls inside other tool calls or CDATA are not calls."""
+        parser = ToolCallParser(["write_file", "read_file"])
+        response = (
+            "<action><read_file><path>draft</path></read_file></action>"
+            "<action><wrapper><write_file><content><![CDATA[<read_file>x</read_file>]]></content>"
+            "<note><read_file>y</read_file></note></write_file></wrapper></action>"
+        )
+
+        calls = parser.parse(response)
+
+        assert [call.name for call in calls] == ["write_file"]
+        assert parse_xml_arguments(calls[0].content)["content"] == "<read_file>x</read_file>"
+
+    def test_without_action_block_or_tools(self):
+        """Tool calls are searched in the whole response without an action block; unknown tags are ignored."""
+        parser = ToolCallParser(["task_complete"])
+
+        assert [call.name for call in parser.parse("<task_complete><answer>42</answer></task_complete>")] == [
+            "task_complete"
+        ]
+        assert parser.parse("<unknown>1</unknown><task_complete>unclosed") == []
+        assert parser.parse("") == []